@@ -0,0 +1,46 @@
+"""Memory and time for lexing and parsing a large generated script.
+
+Run with `python benchmarks/ast_memory.py [lines]` (default 100000 lines).
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from minlang.lexer import Lexer
+from minlang.parser import Parser
+
+def generate(lines: int) -> str:
+    chunks = []
+    for i in range(lines // 4):
+        chunks.append(f"var v{i} = {i} * 2 + (3 - {i % 7}) / 4;")
+        chunks.append(f"if (v{i} > 10) {{ print v{i}; }}")
+        chunks.append(f"def f{i}(a, b) {{ return a + b * v{i}; }}")
+        chunks.append(f"f{i}(1, 2);")
+    return "\n".join(chunks)
+
+def measure(label: str, work):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = work()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} {elapsed:8.3f} s  retained {current / 2**20:8.1f} MiB  peak {peak / 2**20:8.1f} MiB")
+    return result
+
+def main(lines: int = 100000):
+    source = generate(lines)
+    print(f"{lines} lines, {len(source) / 2**20:.1f} MiB of source")
+    tokens = measure("lex", lambda: Lexer(source).scan_tokens())
+    print(f"{len(tokens)} tokens")
+    measure("parse", lambda: Parser(tokens).parse())
+
+    start = time.perf_counter()
+    Parser(Lexer(source).scan_tokens()).parse()
+    print(f"untraced lex+parse {time.perf_counter() - start:.3f} s")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,72 @@
+"""Function call overhead: deep recursion through fib(25) and Ackermann,
+plus inherited method calls on one receiver.
+
+Runs each workload on every engine and reports the best of five runs.
+Run with `python benchmarks/calls.py [engine ...]`.
+"""
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from minlang.__main__ import ENGINES, MinLang
+
+WORKLOADS = [
+    ("fib(25)", """
+def fib(n) {
+    if (n < 2) return n;
+    return fib(n - 1) + fib(n - 2);
+}
+print fib(25);
+"""),
+    ("ack(2, 200)", """
+def ack(m, n) {
+    if (m == 0) return n + 1;
+    if (n == 0) return ack(m - 1, 1);
+    return ack(m - 1, ack(m, n - 1));
+}
+print ack(2, 200);
+"""),
+    ("methods", """
+class Shape { init(n) { this.n = n; } size() { return this.n; } }
+class Rectangle < Shape {}
+class Square < Rectangle { area() { return this.size() * this.size(); } }
+var shape = Square(3);
+var total = 0;
+var i = 0;
+while (i < 50000) {
+    total = total + shape.area();
+    i = i + 1;
+}
+print total;
+"""),
+]
+
+def run(engine: str, source: str, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        minlang = MinLang(engine, use_cache=False)
+        output = io.StringIO()
+        start = time.perf_counter()
+        with redirect_stdout(output):
+            minlang.run(source)
+        best = min(best, time.perf_counter() - start)
+    runtime = minlang.vm if engine == "vm" else minlang.interpreter
+    if minlang.had_error or runtime.had_runtime_error:
+        raise SystemExit(f"{engine}: {output.getvalue()}")
+    return best
+
+def main(engines):
+    # Ackermann recurses a few hundred MinLang calls deep and each call
+    # costs several Python frames in the recursive engines.
+    sys.setrecursionlimit(100000)
+    print(f"{'workload':<12}" + "".join(f"{engine:>10}" for engine in engines))
+    for label, source in WORKLOADS:
+        times = [run(engine, source) for engine in engines]
+        print(f"{label:<12}" + "".join(f"{seconds:>9.3f}s" for seconds in times))
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or list(ENGINES))
@@ -0,0 +1,117 @@
+"""Memory kept alive by closures, and the cost of calling them.
+
+For each workload, reports the best of three run times and the memory the
+finished script's globals still keep alive.
+Run with `python benchmarks/closures.py [engine ...]`.
+"""
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from minlang.__main__ import ENGINES, MinLang
+
+WORKLOADS = [
+    # Each closure is created next to a 4 KiB string it never uses.
+    ("retained", """
+class Node { init(value, next) { this.value = value; this.next = next; } }
+def make(i) {
+    var scratch = "x";
+    var j = 0;
+    while (j < 12) { scratch = scratch + scratch; j = j + 1; }
+    var count = i;
+    def get() { return count; }
+    return get;
+}
+var list = nil;
+var i = 0;
+while (i < 3000) {
+    list = Node(make(i), list);
+    i = i + 1;
+}
+var total = 0;
+var node = list;
+while (node != nil) { total = total + node.value(); node = node.next; }
+print total;
+"""),
+    # Closures created in a loop next to a fresh 1 KiB string.
+    ("loop scopes", """
+class Node { init(value, next) { this.value = value; this.next = next; } }
+def build(n) {
+    var pad = "x";
+    var j = 0;
+    while (j < 10) { pad = pad + pad; j = j + 1; }
+    var list = nil;
+    var i = 0;
+    while (i < n) {
+        var a = i; var b = i * 2; var scratch = pad + "!";
+        def pick() { return b; }
+        list = Node(pick, list);
+        i = i + 1;
+    }
+    return list;
+}
+var kept = build(5000);
+print kept.value();
+"""),
+    # A counter bumped through a closure: every access is a captured variable.
+    ("counter", """
+def counter() {
+    var n = 0;
+    def inc() { n = n + 1; return n; }
+    return inc;
+}
+var c = counter();
+var i = 0;
+while (i < 100000) { c(); i = i + 1; }
+print c();
+"""),
+    # Three levels of nesting between the use and the declaration.
+    ("nested", """
+def outer(x) {
+    def middle(y) {
+        def inner(z) { return x + y + z; }
+        return inner;
+    }
+    return middle;
+}
+var f = outer(1)(2);
+var i = 0;
+var total = 0;
+while (i < 50000) { total = total + f(i); i = i + 1; }
+print total;
+"""),
+]
+
+def run(engine: str, source: str, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        minlang = MinLang(engine, use_cache=False)
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            minlang.run(source)
+        best = min(best, time.perf_counter() - start)
+
+    minlang = MinLang(engine, use_cache=False)
+    tracemalloc.start()
+    with redirect_stdout(io.StringIO()):
+        minlang.run(source)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, retained
+
+def main(engines):
+    print(f"{'workload':<12}" + "".join(f"{engine:>20}" for engine in engines))
+    for label, source in WORKLOADS:
+        results = [run(engine, source) for engine in engines]
+        print(f"{label:<12}" + "".join(f"{seconds:>8.3f}s {retained / 2**20:>7.2f} MiB"
+                                       for seconds, retained in results))
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or list(ENGINES))
@@ -0,0 +1,63 @@
+"""Per-node dispatch cost of the tree-walking interpreter.
+
+Times `Interpreter.execute`/`evaluate` on single pre-built nodes so the
+cost of getting from the entry point to the node's handler dominates.
+Run with `python benchmarks/dispatch.py`.
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from minlang.lexer import Lexer
+from minlang.parser import *
+from minlang.resolver import Resolver
+from minlang.interpreter import Interpreter
+
+SETUP = """
+class Point { init() { this.x = 1; } }
+var p = Point();
+var n = 1;
+def noop() {}
+"""
+
+SAMPLES = [
+    ("Expression", "n;"),
+    ("Var", "var v = 1;"),
+    ("If", "if (false) n;"),
+    ("While", "while (false) n;"),
+    ("Function", "def f() {}"),
+    ("Class", "class K {}"),
+    ("Literal", "1;"),
+    ("Variable", "n;"),
+    ("Binary", "n + 1;"),
+    ("Binary (<=)", "n <= 1;"),
+    ("Call", "noop();"),
+    ("Get", "p.x;"),
+    ("Set", "p.x = 1;"),
+]
+
+def parse(source: str):
+    return Parser(Lexer(source).scan_tokens()).parse()
+
+def main(number: int = 200000):
+    interpreter = Interpreter()
+    setup = parse(SETUP)
+    Resolver(interpreter).resolve(setup)
+    interpreter.interpret(setup)
+
+    print(f"{'node':<14} {'ns/dispatch':>12}")
+    for label, source in SAMPLES:
+        statement = parse(source)[0]
+        Resolver(interpreter).resolve([statement])
+        if isinstance(statement, Expression) and label != "Expression":
+            target = statement.expression
+            run = lambda: interpreter.evaluate(target)
+        else:
+            run = lambda: interpreter.execute(statement)
+        seconds = min(timeit.repeat(run, number=number, repeat=5))
+        print(f"{label:<14} {seconds / number * 1e9:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Memory per instance and field access latency.
+
+Builds a linked list of small three-field instances and reports the
+memory each one retains, then times field reads and writes on a single
+instance, net of loop overhead. Run with `python benchmarks/instances.py [engine ...]`.
+"""
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from minlang.__main__ import ENGINES, MinLang
+
+COUNT = 50000
+
+ALLOCATE = """
+class Node { init(value, next) { this.value = value; this.next = next; this.tag = nil; } }
+var head = nil;
+var i = 0;
+while (i < %d) {
+    head = Node(i, head);
+    i = i + 1;
+}
+""" % COUNT
+
+ACCESS = """
+class Point { init() { this.x = 1; this.y = 2; this.z = 3; } }
+var p = Point();
+var i = 0;
+while (i < 20000) {
+    %s
+    i = i + 1;
+}
+"""
+
+READS = "p.x; p.y; p.z; p.x; p.y; p.z; p.x; p.y; p.z; p.z;"
+WRITES = "p.x = 1; p.y = 2; p.z = 3; p.x = 1; p.y = 2; p.z = 3; p.x = 1; p.y = 2; p.z = 3; p.z = 3;"
+
+def run(engine: str, source: str) -> MinLang:
+    minlang = MinLang(engine, use_cache=False)
+    with redirect_stdout(io.StringIO()):
+        minlang.run(source)
+    return minlang
+
+def bytes_per_instance(engine: str) -> float:
+    gc.collect()
+    tracemalloc.start()
+    minlang = run(engine, ALLOCATE)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del minlang
+    return current / COUNT
+
+def best_time(engine: str, source: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(engine, source)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def ns_per_access(engine: str, body: str, repeat: int = 7) -> float:
+    # The empty loop is timed too and subtracted, leaving only the accesses.
+    elapsed = best_time(engine, ACCESS % body, repeat) - best_time(engine, ACCESS % "", repeat)
+    return elapsed / (20000 * 10) * 1e9
+
+def main(engines):
+    print(f"{'engine':<8} {'bytes/instance':>15} {'read ns':>9} {'write ns':>9}")
+    for engine in engines:
+        print(f"{engine:<8} {bytes_per_instance(engine):>15.0f} "
+              f"{ns_per_access(engine, READS):>9.0f} {ns_per_access(engine, WRITES):>9.0f}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or list(ENGINES))
@@ -0,0 +1,29 @@
+"""Lexing throughput in MB/s for each Lexer mode.
+
+Run with `python benchmarks/lexer_throughput.py [lines]`.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from minlang.lexer import Lexer
+from ast_memory import generate
+
+def throughput(source: str, mode: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Lexer(source, mode).scan_tokens()
+        best = min(best, time.perf_counter() - start)
+    return len(source.encode()) / best / 1e6
+
+def main(lines: int = 20000):
+    source = generate(lines)
+    print(f"{lines} lines, {len(source.encode()) / 1e6:.2f} MB")
+    for mode in ("char", "regex"):
+        print(f"{mode:<6} {throughput(source, mode):8.2f} MB/s")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,87 @@
+"""Arithmetic-heavy loops: the cost of Binary evaluation on each engine.
+
+Reports the best of five runs. Run with `python benchmarks/numeric.py [engine ...]`.
+"""
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from minlang.__main__ import ENGINES, MinLang
+
+WORKLOADS = [
+    ("arithmetic", """
+var i = 0;
+var total = 0;
+while (i < 100000) {
+    total = total + i * 2 - i / 4;
+    i = i + 1;
+}
+print total;
+"""),
+    ("counting", """
+var i = 0;
+var count = 0;
+while (i < 200000) {
+    count = count + 1;
+    i = i + 1;
+}
+print count;
+"""),
+    ("gcd", """
+def gcd(a, b) {
+    while (a != b) {
+        if (a > b) a = a - b;
+        else b = b - a;
+    }
+    return a;
+}
+var i = 1;
+var total = 0;
+while (i < 2000) {
+    total = total + gcd(i * 7, 1001);
+    i = i + 1;
+}
+print total;
+"""),
+    ("comparisons", """
+var i = 0;
+var hits = 0;
+while (i < 100000) {
+    if (i >= 50000 and i != 75000) hits = hits + 1;
+    i = i + 1;
+}
+print hits;
+"""),
+    ("strings", """
+var i = 0;
+var text = "";
+while (i < 20000) {
+    text = text + "x";
+    i = i + 1;
+}
+print text == text;
+"""),
+]
+
+def run(engine: str, source: str, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        minlang = MinLang(engine, use_cache=False)
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            minlang.run(source)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(engines):
+    print(f"{'workload':<12}" + "".join(f"{engine:>10}" for engine in engines))
+    for label, source in WORKLOADS:
+        times = [run(engine, source) for engine in engines]
+        print(f"{label:<12}" + "".join(f"{seconds:>9.3f}s" for seconds in times))
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or list(ENGINES))
@@ -0,0 +1,48 @@
+"""Parse throughput on a large, expression-heavy generated file.
+
+Lexes once, then reports the best of five `Parser.parse` runs over the same
+tokens. Run with `python benchmarks/parse.py [lines]`.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from minlang.lexer import Lexer
+from minlang.parser import Parser
+
+OPERATORS = ["+", "-", "*", "/", "==", "!=", "<", "<=", ">", ">=", "and", "or"]
+
+def expression(rng: random.Random, depth: int = 0) -> str:
+    roll = rng.random()
+    if depth > 3 or roll < 0.3:
+        return rng.choice(["a", "b", "1", "2.5", '"s"', "nil", "true"])
+    if roll < 0.4:
+        return "-" + expression(rng, depth + 1)
+    if roll < 0.5:
+        return "(" + expression(rng, depth + 1) + ")"
+    if roll < 0.6:
+        return f"f({expression(rng, depth + 1)}, {expression(rng, depth + 1)})"
+    if roll < 0.7:
+        return expression(rng, depth + 1) + ".x"
+    return f"{expression(rng, depth + 1)} {rng.choice(OPERATORS)} {expression(rng, depth + 1)}"
+
+def generate(lines: int) -> str:
+    rng = random.Random(0)
+    return "\n".join(f"a = {expression(rng)};" for _ in range(lines))
+
+def main(lines: int):
+    source = generate(lines)
+    tokens = Lexer(source).scan_tokens()
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        Parser(tokens).parse()
+        best = min(best, time.perf_counter() - start)
+    print(f"{len(source) / 1e6:.2f} MB, {len(tokens)} tokens")
+    print(f"parse {best:.3f}s  {len(tokens) / best / 1e6:.2f}M tokens/s  {len(source) / best / 1e6:.2f} MB/s")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -1,9 +1,28 @@
-from minlang.lexer import Lexer, Token, TokenType
+__version__ = "0.1.0"
+
+from minlang.lexer import Lexer, LexError, Token, TokenType
 from minlang.parser import Parser, Expr, Stmt
+from minlang.resolver import Resolver
 from minlang.interpreter import Interpreter, Environment, MinLangClass, MinLangInstance, MinLangFunction
+from minlang.closures import ClosureInterpreter
+from minlang.transpiler import PythonInterpreter, Transpiler
+from minlang.compiler import Compiler, Code
+from minlang.cache import CodeCache, ParseCache
+from minlang.output import Output, StreamOutput, MemoryOutput
+from minlang.program import Program, ProgramCache, compile
+from minlang.pool import JobResult, ScriptPool
+from minlang.snapshot import load_snapshot, save_snapshot
+from minlang.vm import VM
 
 __all__ = [
-    'Lexer', 'Token', 'TokenType',
+    'Lexer', 'LexError', 'Token', 'TokenType',
     'Parser', 'Expr', 'Stmt',
-    'Interpreter', 'Environment', 'MinLangClass', 'MinLangInstance', 'MinLangFunction'
+    'Resolver',
+    'Interpreter', 'Environment', 'MinLangClass', 'MinLangInstance', 'MinLangFunction',
+    'ClosureInterpreter', 'PythonInterpreter', 'Transpiler', 'Compiler', 'Code', 'VM',
+    'ParseCache', 'CodeCache',
+    'Output', 'StreamOutput', 'MemoryOutput',
+    'Program', 'ProgramCache', 'compile',
+    'JobResult', 'ScriptPool',
+    'load_snapshot', 'save_snapshot',
 ] 
\ No newline at end of file
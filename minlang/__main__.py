@@ -1,12 +1,37 @@
 import sys
 import os
-from minlang.lexer import Lexer
-from minlang.parser import Parser
+import argparse
+from typing import List, Optional
+from minlang.lexer import Lexer, LexError
+from minlang.parser import Parser, Stmt, walk
+from minlang.resolver import Resolver
+from minlang.optimizer import Optimizer
+from minlang.converter import ClosureConverter
+from minlang.profiler import ProfilingInterpreter
 from minlang.interpreter import Interpreter
+from minlang.compiler import Compiler
+from minlang.vm import DEFAULT_MAX_DEPTH, VM
+from minlang.cache import CodeCache, ParseCache
+from minlang.output import Output, StreamOutput
+from minlang.program import ENGINES, INTERPRETERS
+from minlang.pool import COMPILE_ERROR, TIMEOUT, ScriptPool
+from minlang.snapshot import load_snapshot, save_snapshot
 
 class MinLang:
-    def __init__(self):
-        self.interpreter = Interpreter()
+    def __init__(self, engine: str = "tree", stream: bool = False, use_cache: bool = True,
+                 optimize: bool = True, max_depth: int = DEFAULT_MAX_DEPTH, profile: bool = False,
+                 output: Optional[Output] = None):
+        self.engine = engine
+        self.output = StreamOutput() if output is None else output
+        self.stream = stream
+        self.cache = ParseCache() if use_cache else None
+        self.code_cache = CodeCache(optimize=optimize) if use_cache and engine == "pyc" else None
+        self.optimizer = Optimizer() if optimize else None
+        if profile:
+            self.interpreter = ProfilingInterpreter(output=self.output)
+        else:
+            self.interpreter = INTERPRETERS.get(engine, Interpreter)(self.output)
+        self.vm = VM(max_depth, self.output) if engine == "vm" else None
         self.had_error = False
 
     def run_file(self, path: str):
@@ -16,8 +41,12 @@ class MinLang:
             
         try:
             with open(path, 'r') as file:
-                source = file.read()
-                self.run(source)
+                if self.stream:
+                    self.run_stream(file)
+                elif self.cache is not None:
+                    self.run_cached(path, file.read())
+                else:
+                    self.run(file.read())
                 if self.had_error:
                     sys.exit(65)
         except FileNotFoundError:
@@ -41,26 +70,202 @@ class MinLang:
                 break
 
     def run(self, source: str):
-        lexer = Lexer(source)
-        tokens = lexer.scan_tokens()
-        
-        parser = Parser(tokens)
-        statements = parser.parse()
-        
+        statements = self.parse(source)
         if self.had_error:
             return
         
-        self.interpreter.interpret(statements)
+        self.execute(statements)
+
+    def run_cached(self, path: str, source: str):
+        if self.code_cache is not None:
+            self.run_compiled(path, source)
+            return
+        
+        statements = self.cache.load(path, source)
+        if statements is None:
+            statements = self.parse(source)
+            if self.had_error:
+                return
+            self.cache.store(path, source, statements)
+        
+        self.execute(statements)
+
+    def run_compiled(self, path: str, source: str):
+        # A cached pyc entry skips parsing, resolving and code generation.
+        code = self.code_cache.load(path, source)
+        if code is None:
+            statements = self.parse(source)
+            if self.had_error:
+                return
+            statements = self.analyze(statements, Resolver(self.interpreter))
+            if statements is None:
+                return
+            code = self.interpreter.compile(statements)
+            self.code_cache.store(path, source, code)
+        
+        self.interpreter.run(code)
+
+    def parse(self, source: str) -> Optional[List[Stmt]]:
+        try:
+            lexer = Lexer(source)
+            tokens = lexer.scan_tokens()
+            
+            parser = Parser(tokens)
+            return parser.parse()
+        except LexError as error:
+            print(error)
+            self.had_error = True
+            return None
+
+    def run_stream(self, source):
+        try:
+            parser = Parser(Lexer(source).iter_tokens())
+            for statement in parser.iter_declarations():
+                # Walked before analysis: the optimizer may drop nodes the
+                # resolver has already recorded.
+                nodes = list(walk(statement)) if statement is not None else []
+                if self.execute([statement]) is None:
+                    return
+                self.interpreter.release(nodes)
+        except LexError as error:
+            print(error)
+            self.had_error = True
+
+    def analyze(self, statements: List[Stmt], resolver: Resolver) -> Optional[List[Stmt]]:
+        try:
+            resolver.resolve(statements)
+        except RuntimeError as error:
+            print(error)
+            self.had_error = True
+            return None
+        
+        if self.optimizer is not None:
+            statements = self.optimizer.optimize(statements)
+        if self.engine in ("tree", "closure"):
+            ClosureConverter(self.interpreter).convert(statements)
+        return statements
+
+    def execute(self, statements: List[Stmt]) -> Optional[Resolver]:
+        resolver = Resolver(self.interpreter)
+        statements = self.analyze(statements, resolver)
+        if statements is None:
+            return None
+        
+        if self.engine == "vm":
+            self.vm.interpret(Compiler().compile(statements))
+            if self.vm.had_runtime_error:
+                return None
+        else:
+            self.interpreter.interpret(statements)
+            if self.interpreter.had_runtime_error:
+                return None
+        return resolver
+
+def run_jobs(paths: List[str], jobs: int, engine: str, optimize: bool,
+             timeout: Optional[float]) -> int:
+    # Runs the scripts in parallel and prints their output in the order
+    # given. Returns the exit status: 65 if a script failed to compile, as
+    # for a single script, otherwise 1 if one timed out.
+    sources = []
+    for path in paths:
+        if not path.endswith('.gkg'):
+            print(f"Error: File must have .gkg extension")
+            sys.exit(74)
+        try:
+            with open(path, 'r') as file:
+                sources.append(file.read())
+        except FileNotFoundError:
+            print(f"Error: Could not open file '{path}'")
+            sys.exit(74)
+
+    status = 0
+    with ScriptPool(jobs, engine, optimize, timeout) as pool:
+        for result in pool.map(sources, paths):
+            sys.stdout.write(result.output)
+            sys.stderr.write(result.stderr)
+            if result.status == COMPILE_ERROR:
+                status = 65
+            elif result.status == TIMEOUT:
+                print(f"{result.name}: {result.error}", file=sys.stderr)
+                status = status or 1
+    return status
 
 def main():
-    minlang = MinLang()
-    if len(sys.argv) > 2:
-        print("Usage: python -m minlang [script.gkg]")
-        sys.exit(64)
-    elif len(sys.argv) == 2:
-        minlang.run_file(sys.argv[1])
-    else:
-        minlang.run_prompt()
+    arg_parser = argparse.ArgumentParser(prog="python -m minlang")
+    arg_parser.add_argument("scripts", nargs="*", metavar="script",
+                            help="script to run (.gkg); several need --jobs")
+    arg_parser.add_argument("--engine", choices=ENGINES, default="tree",
+                            help="execution engine (default: tree)")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="parse and execute one top-level declaration at a time")
+    arg_parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                            help="do not read or write __gkgcache__ parse caches")
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=(0, 1), default=1,
+                            help="optimization level: 0 disables constant folding and "
+                                 "dead-branch elimination (default: 1)")
+    arg_parser.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH,
+                            help="deepest MinLang call stack the vm engine allows "
+                                 f"(default: {DEFAULT_MAX_DEPTH})")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="report per-function times and per-line hit counts on stderr "
+                                 "(tree engine only)")
+    arg_parser.add_argument("--profile-output", metavar="FILE", default="profile.folded",
+                            help="where --profile writes collapsed stacks for flame graph tools "
+                                 "(default: profile.folded)")
+    arg_parser.add_argument("--line-buffered", action="store_true",
+                            help="write output a line at a time instead of in large chunks "
+                                 "(always on in the REPL)")
+    arg_parser.add_argument("--jobs", type=int, metavar="N",
+                            help="run the scripts in parallel on N worker processes")
+    arg_parser.add_argument("--timeout", type=float, metavar="SECONDS",
+                            help="with --jobs, stop any script that runs longer than this")
+    arg_parser.add_argument("--snapshot", metavar="FILE",
+                            help="start from the globals saved in FILE by --save-snapshot "
+                                 "(tree engine only)")
+    arg_parser.add_argument("--save-snapshot", metavar="FILE",
+                            help="after the script runs, save its globals to FILE "
+                                 "(tree engine only)")
+    args = arg_parser.parse_args()
+    if args.profile and args.engine != "tree":
+        arg_parser.error("--profile requires --engine=tree")
+    if (args.snapshot or args.save_snapshot) and (args.engine != "tree" or args.profile
+                                                  or args.jobs is not None):
+        arg_parser.error("snapshots require --engine=tree without --profile or --jobs")
+    if args.jobs is not None:
+        if args.stream or args.profile:
+            arg_parser.error("--jobs can't be combined with --stream or --profile")
+        if not args.scripts:
+            arg_parser.error("--jobs requires at least one script")
+        sys.exit(run_jobs(args.scripts, args.jobs, args.engine, args.optimize > 0, args.timeout))
+    if len(args.scripts) > 1:
+        arg_parser.error("running several scripts requires --jobs")
+    script = args.scripts[0] if args.scripts else None
+
+    output = StreamOutput(line_buffered=args.line_buffered or script is None)
+    minlang = MinLang(args.engine, args.stream, args.use_cache, args.optimize > 0,
+                      args.max_depth, args.profile, output)
+    if args.snapshot is not None:
+        try:
+            load_snapshot(args.snapshot, minlang.interpreter)
+        except (OSError, ValueError) as error:
+            print(f"Error: Could not load snapshot: {error}")
+            sys.exit(74)
+    if args.profile:
+        minlang.interpreter.profiler.start()
+    try:
+        if script is not None:
+            minlang.run_file(script)
+        else:
+            minlang.run_prompt()
+        if args.save_snapshot is not None:
+            save_snapshot(minlang.interpreter, args.save_snapshot)
+    finally:
+        if args.profile:
+            profiler = minlang.interpreter.profiler
+            profiler.stop()
+            profiler.report(sys.stderr)
+            with open(args.profile_output, "w") as file:
+                profiler.write_collapsed(file)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
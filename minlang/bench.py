@@ -0,0 +1,184 @@
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Dict, List, Tuple
+from minlang.__main__ import ENGINES, MinLang
+from minlang.lexer import Lexer
+from minlang.output import StreamOutput
+from minlang.parser import Parser
+
+# `python -m minlang.bench`: runs the .gkg workloads in benchmarks/workloads
+# plus a large generated script, and times lexing, parsing and execution
+# separately. Times are the best of several runs; peak memory comes from
+# one more run under tracemalloc, so tracing does not slow the timed runs.
+# Results can be saved as a JSON baseline and later runs compared with it.
+
+WORKLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "benchmarks", "workloads")
+
+PHASES = ("lex", "parse", "exec")
+
+# Phases faster than this are too noisy to count as regressions.
+MIN_SECONDS = 0.005
+
+def generate(lines: int) -> str:
+    # Lexer and parser throughput: many short declarations of every kind.
+    chunks = []
+    for i in range(lines // 4):
+        chunks.append(f"var v{i} = {i} * 2 + (3 - {i % 7}) / 4;")
+        chunks.append(f"if (v{i} > 10) {{ print \"v{i}\" + \" is big\"; }}")
+        chunks.append(f"def f{i}(a, b) {{ return a + b * v{i}; }}")
+        chunks.append(f"f{i}(1, 2);")
+    return "\n".join(chunks)
+
+def load_workloads(paths: List[str], lines: int) -> List[Tuple[str, str]]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.endswith(".gkg"))
+        else:
+            files.append(path)
+    workloads = []
+    for path in files:
+        with open(path) as file:
+            workloads.append((os.path.splitext(os.path.basename(path))[0], file.read()))
+    if lines > 0:
+        workloads.append(("generated", generate(lines)))
+    return workloads
+
+def measure(engine: str, source: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {phase: {"seconds": float("inf")} for phase in PHASES}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = Lexer(source).scan_tokens()
+        lexed = time.perf_counter()
+        statements = Parser(tokens).parse()
+        parsed = time.perf_counter()
+        # Execution includes resolving, optimizing and compiling for the
+        # engines that compile, since a script always pays for them, and
+        # writing out its buffered output.
+        sink = io.StringIO()
+        minlang = MinLang(engine, use_cache=False, output=StreamOutput(sink))
+        started = time.perf_counter()
+        with redirect_stdout(sink):
+            resolver = minlang.execute(statements)
+            minlang.output.flush()
+        finished = time.perf_counter()
+        if resolver is None:
+            raise RuntimeError("workload failed to run")
+        for phase, seconds in zip(PHASES, (lexed - start, parsed - lexed, finished - started)):
+            results[phase]["seconds"] = min(results[phase]["seconds"], seconds)
+    results["lex"]["tokens"] = len(tokens)
+
+    # Tracing starts afresh for each phase, so a phase's peak counts only
+    # what it allocated, not what earlier phases left alive, such as the
+    # token list while parsing.
+    tracemalloc.start()
+    tokens = Lexer(source).scan_tokens()
+    results["lex"]["peak"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    tracemalloc.start()
+    statements = Parser(tokens).parse()
+    results["parse"]["peak"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    sink = io.StringIO()
+    minlang = MinLang(engine, use_cache=False, output=StreamOutput(sink))
+    tracemalloc.start()
+    with redirect_stdout(sink):
+        minlang.execute(statements)
+        minlang.output.flush()
+    results["exec"]["peak"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return results
+
+def report(name: str, size: int, results: Dict[str, Dict[str, float]]):
+    lex, parse, run = (results[phase] for phase in PHASES)
+    print(f"{name:<12} {lex['seconds'] * 1e3:>9.1f} {size / lex['seconds'] / 1e6:>7.2f} "
+          f"{parse['seconds'] * 1e3:>9.1f} {lex['tokens'] / parse['seconds'] / 1e3:>8.0f} "
+          f"{run['seconds'] * 1e3:>9.1f}  "
+          + " ".join(f"{results[phase]['peak'] / 2**20:>7.2f}" for phase in PHASES))
+
+def compare(current: Dict[str, Dict[str, Dict[str, float]]],
+            baseline: Dict[str, Dict[str, Dict[str, float]]], threshold: float) -> int:
+    # A phase regresses when its time or peak memory grows by more than
+    # `threshold` over the baseline. Workloads missing on either side are
+    # skipped, and so are times too short to measure reliably.
+    regressions = 0
+    for name, results in current.items():
+        if name not in baseline:
+            continue
+        for phase in PHASES:
+            for metric in ("seconds", "peak"):
+                old = baseline[name][phase][metric]
+                new = results[phase][metric]
+                if metric == "seconds" and max(old, new) < MIN_SECONDS:
+                    continue
+                if old > 0 and new > old * (1 + threshold):
+                    regressions += 1
+                    print(f"regression: {name} {phase} {metric} "
+                          f"{old:.6g} -> {new:.6g} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m minlang.bench")
+    arg_parser.add_argument("workloads", nargs="*", default=[WORKLOAD_DIR],
+                            help=".gkg files or directories of them (default: benchmarks/workloads)")
+    arg_parser.add_argument("--engine", choices=ENGINES, default="tree",
+                            help="execution engine (default: tree)")
+    arg_parser.add_argument("--repeat", type=int, default=5,
+                            help="timed runs per workload; the best is kept (default: 5)")
+    arg_parser.add_argument("--lines", type=int, default=20000,
+                            help="size of the generated workload, 0 to skip it (default: 20000)")
+    arg_parser.add_argument("--save", metavar="FILE",
+                            help="write the results to FILE as a JSON baseline")
+    arg_parser.add_argument("--baseline", metavar="FILE",
+                            help="compare with a baseline written by --save; exits with "
+                                 "status 1 if anything regressed")
+    arg_parser.add_argument("--threshold", type=float, default=0.1,
+                            help="relative slowdown or memory growth that counts as a "
+                                 "regression (default: 0.1)")
+    args = arg_parser.parse_args()
+    if args.repeat < 1:
+        arg_parser.error("--repeat must be at least 1")
+
+    # The default workloads are part of the source tree, not of an
+    # installed package.
+    for path in args.workloads:
+        if path == WORKLOAD_DIR and not os.path.isdir(path):
+            arg_parser.error(f"{path} not found; the workloads ship with the source "
+                             f"tree only, so pass .gkg files or directories instead")
+        if not os.path.exists(path):
+            arg_parser.error(f"{path} not found")
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline["engine"] != args.engine:
+            arg_parser.error(f"baseline was recorded with --engine={baseline['engine']}")
+
+    print(f"engine {args.engine}, best of {args.repeat}")
+    print(f"{'workload':<12} {'lex ms':>9} {'MB/s':>7} {'parse ms':>9} {'ktok/s':>8} "
+          f"{'exec ms':>9}  {'peak MiB lex / parse / exec':>23}")
+    current = {}
+    for name, source in load_workloads(args.workloads, args.lines):
+        current[name] = measure(args.engine, source, args.repeat)
+        report(name, len(source.encode()), current[name])
+
+    if args.save is not None:
+        with open(args.save, "w") as file:
+            json.dump({"engine": args.engine, "workloads": current}, file, indent=2)
+    if baseline is not None:
+        regressions = compare(current, baseline["workloads"], args.threshold)
+        print(f"{regressions} regression(s) against {args.baseline}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import gc
+import hashlib
+import marshal
+import os
+import pickle
+import sys
+from types import CodeType
+from typing import Any, BinaryIO, List, Optional
+from minlang import __version__
+from minlang.parser import Stmt
+
+CACHE_DIR = "__gkgcache__"
+MAGIC = b"GKGC\x03"
+
+class ParseCache:
+    suffix = "gkgc"
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+
+    def path_for(self, script_path: str) -> str:
+        folder, name = os.path.split(os.path.abspath(script_path))
+        stem = os.path.splitext(name)[0]
+        return os.path.join(folder, self.directory, f"{stem}.{sys.implementation.cache_tag}.{self.suffix}")
+
+    def key(self, source: str) -> bytes:
+        digest = hashlib.sha256()
+        digest.update(MAGIC)
+        digest.update(__version__.encode())
+        digest.update(source.encode())
+        return MAGIC + digest.digest()
+
+    def read(self, file: BinaryIO) -> Any:
+        return pickle.load(file)
+
+    def write(self, value: Any, file: BinaryIO):
+        pickle.dump(value, file, pickle.HIGHEST_PROTOCOL)
+
+    def load(self, script_path: str, source: str) -> Optional[List[Stmt]]:
+        key = self.key(source)
+        # Unpickling allocates one object per node; letting the cyclic GC
+        # rescan the growing tree during the load costs more than the load.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self.path_for(script_path), "rb") as file:
+                if file.read(len(key)) != key:
+                    return None
+                return self.read(file)
+        except Exception:
+            return None
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def store(self, script_path: str, source: str, statements: List[Stmt]):
+        path = self.path_for(script_path)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temporary, "wb") as file:
+                file.write(self.key(source))
+                self.write(statements, file)
+            os.replace(temporary, path)
+        except (OSError, pickle.PicklingError, RecursionError, ValueError):
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+class CodeCache(ParseCache):
+    # The Python code --engine=pyc generates for a script. It depends on the
+    # optimizer having run, so each optimization level has its own entry.
+    def __init__(self, directory: str = CACHE_DIR, optimize: bool = True):
+        super().__init__(directory)
+        self.suffix = "pyc1.gkgc" if optimize else "pyc0.gkgc"
+
+    def read(self, file: BinaryIO) -> CodeType:
+        code = marshal.load(file)
+        if not isinstance(code, CodeType):
+            raise ValueError("not a code object")
+        return code
+
+    def write(self, code: CodeType, file: BinaryIO):
+        marshal.dump(code, file)
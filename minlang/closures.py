@@ -0,0 +1,532 @@
+import operator
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from minlang.lexer import TokenType
+from minlang.parser import *
+from minlang.output import Output, stringify
+from minlang.interpreter import (
+    Interpreter, Environment, MinLangCallable, MinLangClass, MinLangInstance,
+    MinLangFunction, Completion, Cell, ClosureLayout, NO_CELLS,
+)
+
+Thunk = Callable[[Environment], Any]
+
+class CompiledFunction(MinLangFunction):
+    def __init__(self, declaration: Function, closure: Optional[Environment], params: List[str],
+                 body: List[Thunk], is_initializer: bool = False, layout: ClosureLayout = NO_CELLS):
+        super().__init__(declaration, closure, is_initializer, params, layout)
+        self.body = body
+
+    def bind(self, instance: MinLangInstance) -> 'CompiledFunction':
+        environment = Environment(self.closure, {"this": Cell(instance) if self.layout.cell_this else instance})
+        return CompiledFunction(self.declaration, environment, self.params, self.body,
+                                self.is_initializer, self.layout)
+
+    def call(self, interpreter: Interpreter, arguments: List[Any]) -> Any:
+        values = dict(zip(self.params, arguments))
+        if self.layout.cell_params:
+            self.box_params(values)
+        environment = Environment(self.closure, values)
+        for statement in self.body:
+            completion = statement(environment)
+            if completion is not None:
+                if self.is_initializer:
+                    break
+                return completion.value
+
+        if self.is_initializer:
+            instance = self.closure.values["this"]
+            return instance.value if self.layout.cell_this else instance
+        return None
+
+    def invoke(self, interpreter: Interpreter, instance: MinLangInstance, arguments: List[Any]) -> Any:
+        receiver = Environment(self.closure, {"this": Cell(instance) if self.layout.cell_this else instance})
+        values = dict(zip(self.params, arguments))
+        if self.layout.cell_params:
+            self.box_params(values)
+        environment = Environment(receiver, values)
+        for statement in self.body:
+            completion = statement(environment)
+            if completion is not None:
+                if self.is_initializer:
+                    break
+                return completion.value
+
+        if self.is_initializer:
+            return instance
+        return None
+
+class ClosureInterpreter(Interpreter):
+    def __init__(self, output: Optional[Output] = None):
+        super().__init__(output)
+        self.compiled: Dict[object, Any] = {}
+
+    def interpret(self, statements: List[Stmt]):
+        try:
+            for statement in statements:
+                self.build_stmt(statement)(self.globals)
+        except RuntimeError as error:
+            self.output.write_line(f"Runtime error: {error}")
+            self.had_runtime_error = True
+        finally:
+            self.output.flush()
+
+    def execute(self, stmt: Stmt) -> Optional[Completion]:
+        return self.compile_stmt(stmt)(self.environment)
+
+    def release(self, nodes: List[Tuple[Any, Optional[Function]]]):
+        # Thunks read the side tables only while they are built, so nothing
+        # a finished statement left there is needed again.
+        self.forget(node for node, _ in nodes)
+
+    def forget(self, nodes: Iterable[Any]):
+        nodes = list(nodes)
+        super().forget(nodes)
+        for node in nodes:
+            self.compiled.pop(node, None)
+
+    def evaluate(self, expr: Expr) -> Any:
+        return self.compile_expr(expr)(self.environment)
+
+    def compile_stmt(self, stmt: Stmt) -> Thunk:
+        thunk = self.compiled.get(stmt)
+        if thunk is None:
+            thunk = self.build_stmt(stmt)
+            self.compiled[stmt] = thunk
+        return thunk
+
+    def compile_expr(self, expr: Expr) -> Thunk:
+        thunk = self.compiled.get(expr)
+        if thunk is None:
+            thunk = self.build_expr(expr)
+            self.compiled[expr] = thunk
+        return thunk
+
+    def compile_function(self, declaration: Function) -> Tuple[List[str], List[Thunk]]:
+        # Each Function node is built exactly once as part of its parent, so
+        # the thunk that creates CompiledFunctions already shares one body.
+        params = [param.lexeme for param in declaration.params]
+        body = [self.build_stmt(statement) for statement in declaration.body]
+        return params, body
+
+    def build_stmt(self, stmt: Stmt) -> Thunk:
+        # Statement thunks return None, or a Completion when a `return`
+        # leaves the enclosing function.
+        if isinstance(stmt, Expression):
+            expression = self.build_expr(stmt.expression)
+            def run(env):
+                expression(env)
+            return run
+        elif isinstance(stmt, Print):
+            value = self.build_expr(stmt.expression)
+            write_line = self.output.write_line
+            def run(env):
+                write_line(stringify(value(env)))
+            return run
+        elif isinstance(stmt, Var):
+            name = stmt.name.lexeme
+            if stmt.initializer is None:
+                if stmt in self.captured:
+                    def run(env):
+                        env.values[name] = Cell()
+                    return run
+                def run(env):
+                    env.values[name] = None
+                return run
+            initializer = self.build_expr(stmt.initializer)
+            if stmt in self.captured:
+                def run(env):
+                    env.values[name] = Cell(initializer(env))
+                return run
+            def run(env):
+                env.values[name] = initializer(env)
+            return run
+        elif isinstance(stmt, Block):
+            body = [self.build_stmt(statement) for statement in stmt.statements]
+            def run(env):
+                inner = Environment(env)
+                for statement in body:
+                    completion = statement(inner)
+                    if completion is not None:
+                        return completion
+            return run
+        elif isinstance(stmt, If):
+            condition = self.build_expr(stmt.condition)
+            then_branch = self.build_stmt(stmt.then_branch)
+            if stmt.else_branch is None:
+                def run(env):
+                    value = condition(env)
+                    if value is not None and value is not False:
+                        return then_branch(env)
+                return run
+            else_branch = self.build_stmt(stmt.else_branch)
+            def run(env):
+                value = condition(env)
+                if value is not None and value is not False:
+                    return then_branch(env)
+                return else_branch(env)
+            return run
+        elif isinstance(stmt, While):
+            condition = self.build_expr(stmt.condition)
+            body = self.build_stmt(stmt.body)
+            def run(env):
+                while True:
+                    value = condition(env)
+                    if value is None or value is False:
+                        return None
+                    completion = body(env)
+                    if completion is not None:
+                        return completion
+            return run
+        elif isinstance(stmt, Function):
+            name = stmt.name.lexeme
+            params, body = self.compile_function(stmt)
+            conversion = self.layouts.get(stmt)
+            layout = conversion or NO_CELLS
+            capture = self.capture
+            if stmt in self.captured:
+                def run(env):
+                    cell = env.values[name] = Cell()
+                    cell.value = CompiledFunction(stmt, capture(conversion, env), params, body, False, layout)
+                return run
+            def run(env):
+                env.values[name] = CompiledFunction(stmt, capture(conversion, env), params, body, False, layout)
+            return run
+        elif isinstance(stmt, Return):
+            if stmt.value is None:
+                def run(env):
+                    return Completion(None)
+                return run
+            value = self.build_expr(stmt.value)
+            def run(env):
+                return Completion(value(env))
+            return run
+        elif isinstance(stmt, Class):
+            return self.build_class(stmt)
+        return lambda env: None
+
+    def build_class(self, stmt: Class) -> Thunk:
+        name = stmt.name
+        superclass_expr = None
+        if stmt.superclass is not None:
+            superclass_expr = self.build_expr(stmt.superclass)
+        methods = [(method, self.compile_function(method), self.layouts.get(method))
+                   for method in stmt.methods]
+        name_captured = stmt in self.captured
+        super_captured = stmt.superclass in self.captured
+        capture = self.capture
+
+        def run(env):
+            superclass = None
+            if superclass_expr is not None:
+                superclass = superclass_expr(env)
+                if not isinstance(superclass, MinLangClass):
+                    raise RuntimeError("Superclass must be a class.")
+
+            cell = Cell() if name_captured else None
+            env.define(name.lexeme, cell)
+
+            method_env = env
+            if superclass_expr is not None:
+                method_env = Environment(env)
+                method_env.define("super", Cell(superclass) if super_captured else superclass)
+
+            functions = {}
+            for method, (params, body), layout in methods:
+                functions[method.name.lexeme] = CompiledFunction(
+                    method, capture(layout, method_env), params, body,
+                    method.name.lexeme == "init", layout or NO_CELLS)
+
+            klass = MinLangClass(name.lexeme, superclass, functions)
+            if cell is not None:
+                cell.value = klass
+            else:
+                env.assign(name, klass)
+        return run
+
+    def build_expr(self, expr: Expr) -> Thunk:
+        if isinstance(expr, Literal):
+            value = expr.value
+            return lambda env: value
+        elif isinstance(expr, Grouping):
+            return self.build_expr(expr.expression)
+        elif isinstance(expr, Variable):
+            return self.build_lookup(expr, expr.name.lexeme)
+        elif isinstance(expr, This):
+            return self.build_lookup(expr, "this")
+        elif isinstance(expr, Assign):
+            return self.build_assign(expr)
+        elif isinstance(expr, Logical):
+            left = self.build_expr(expr.left)
+            right = self.build_expr(expr.right)
+            if expr.operator.type == TokenType.OR:
+                def run(env):
+                    value = left(env)
+                    if value is not None and value is not False:
+                        return value
+                    return right(env)
+                return run
+            def run(env):
+                value = left(env)
+                if value is None or value is False:
+                    return value
+                return right(env)
+            return run
+        elif isinstance(expr, Binary):
+            return self.build_binary(expr)
+        elif isinstance(expr, Unary):
+            right = self.build_expr(expr.right)
+            if expr.operator.type == TokenType.MINUS:
+                def run(env):
+                    value = right(env)
+                    if not isinstance(value, (int, float)):
+                        raise RuntimeError("Operand must be a number.")
+                    return -value
+                return run
+            def run(env):
+                value = right(env)
+                return value is None or value is False
+            return run
+        elif isinstance(expr, Call):
+            return self.build_call(expr)
+        elif isinstance(expr, Get):
+            return self.build_get(expr)
+        elif isinstance(expr, Set):
+            return self.build_set(expr)
+        elif isinstance(expr, Super):
+            method_name = expr.method.lexeme
+            if expr in self.cells:
+                return self.build_converted_super(expr, method_name)
+            distance = self.locals[expr]
+            def run(env):
+                superclass = env.ancestor(distance).values["super"]
+                instance = env.ancestor(distance - 1).values["this"]
+                method = superclass.find_method(method_name)
+                if method is None:
+                    raise RuntimeError(f"Undefined property '{method_name}'.")
+                return method.bind(instance)
+            return run
+        return lambda env: None
+
+    def build_converted_super(self, expr: Super, method_name: str) -> Thunk:
+        distance = self.cells[expr]
+        receiver_distance, receiver_is_cell = self.receivers[expr]
+        def run(env):
+            superclass = env.ancestor(distance).values["super"].value
+            instance = env.ancestor(receiver_distance).values["this"]
+            if receiver_is_cell:
+                instance = instance.value
+            method = superclass.find_method(method_name)
+            if method is None:
+                raise RuntimeError(f"Undefined property '{method_name}'.")
+            return method.bind(instance)
+        return run
+
+    def build_lookup(self, expr: Expr, name: str) -> Thunk:
+        if expr in self.cells:
+            distance = self.cells[expr]
+            if distance == 0:
+                def run(env):
+                    return env.values[name].value
+            elif distance == 1:
+                def run(env):
+                    return env.enclosing.values[name].value
+            else:
+                def run(env):
+                    return env.ancestor(distance).values[name].value
+            return run
+        distance = self.locals.get(expr)
+        if distance is None:
+            values = self.globals.values
+            def run(env):
+                if name in values:
+                    return values[name]
+                raise RuntimeError(f"Undefined variable '{name}'.")
+        elif distance == 0:
+            def run(env):
+                return env.values[name]
+        elif distance == 1:
+            def run(env):
+                return env.enclosing.values[name]
+        else:
+            def run(env):
+                return env.ancestor(distance).values[name]
+        return run
+
+    def build_assign(self, expr: Assign) -> Thunk:
+        name = expr.name.lexeme
+        value = self.build_expr(expr.value)
+        if expr in self.cells:
+            distance = self.cells[expr]
+            def run(env):
+                result = value(env)
+                env.ancestor(distance).values[name].value = result
+                return result
+            return run
+        distance = self.locals.get(expr)
+        if distance is None:
+            values = self.globals.values
+            def run(env):
+                result = value(env)
+                if name not in values:
+                    raise RuntimeError(f"Undefined variable '{name}'.")
+                values[name] = result
+                return result
+        else:
+            def run(env):
+                result = value(env)
+                env.ancestor(distance).values[name] = result
+                return result
+        return run
+
+    def build_binary(self, expr: Binary) -> Thunk:
+        left = self.build_expr(expr.left)
+        right = self.build_expr(expr.right)
+        token_type = expr.operator.type
+        is_equal = self.is_equal
+
+        if token_type == TokenType.PLUS:
+            def run(env):
+                a = left(env)
+                b = right(env)
+                if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+                    return a + b
+                if isinstance(a, str) and isinstance(b, str):
+                    return a + b
+                raise RuntimeError("Operands must be two numbers or two strings.")
+            return run
+        if token_type == TokenType.EQUALS:
+            return lambda env: is_equal(left(env), right(env))
+        if token_type == TokenType.NOT_EQUALS:
+            return lambda env: not is_equal(left(env), right(env))
+
+        apply = NUMERIC_OPERATORS[token_type]
+        def run(env):
+            a = left(env)
+            b = right(env)
+            if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+                return apply(a, b)
+            raise RuntimeError("Operands must be numbers.")
+        return run
+
+    def build_get(self, expr: Get) -> Thunk:
+        obj = self.build_expr(expr.obj)
+        name = expr.name.lexeme
+        # Inline caches: the last receiver shape that had the field and its
+        # slot, and the last receiver class's method table with the method
+        # it resolved `name` to.
+        cached_shape = None
+        cached_index = 0
+        cached_table = None
+        cached_method = None
+
+        def run(env):
+            nonlocal cached_shape, cached_index, cached_table, cached_method
+            instance = obj(env)
+            if not isinstance(instance, MinLangInstance):
+                raise RuntimeError("Only instances have properties.")
+            shape = instance.shape
+            if shape is cached_shape:
+                return instance.values[cached_index]
+            index = shape.slots.get(name)
+            if index is not None:
+                cached_shape, cached_index = shape, index
+                return instance.values[index]
+            table = instance.klass.method_table
+            if table is not cached_table:
+                method = table.get(name)
+                if method is None:
+                    raise RuntimeError(f"Undefined property '{name}'.")
+                cached_table, cached_method = table, method
+            return cached_method.bind(instance)
+        return run
+
+    def build_set(self, expr: Set) -> Thunk:
+        obj = self.build_expr(expr.obj)
+        value = self.build_expr(expr.value)
+        name = expr.name.lexeme
+        # Inline cache: the last receiver shape seen here, and either the
+        # slot the field lives in or the shape that adding it leads to.
+        cached_shape = None
+        cached_index = 0
+        cached_transition = None
+
+        def run(env):
+            nonlocal cached_shape, cached_index, cached_transition
+            instance = obj(env)
+            if not isinstance(instance, MinLangInstance):
+                raise RuntimeError("Only instances have fields.")
+            result = value(env)
+            shape = instance.shape
+            if shape is not cached_shape:
+                index = shape.slots.get(name)
+                cached_shape = shape
+                if index is None:
+                    cached_transition = shape.with_field(name)
+                else:
+                    cached_index, cached_transition = index, None
+            if cached_transition is None:
+                instance.values[cached_index] = result
+            else:
+                instance.shape = cached_transition
+                instance.values.append(result)
+            return result
+        return run
+
+    def build_invoke(self, expr: Call, get: Get) -> Thunk:
+        obj = self.build_expr(get.obj)
+        name = get.name.lexeme
+        arguments = [self.build_expr(argument) for argument in expr.arguments]
+        count = len(arguments)
+        interpreter = self
+        cached_table = None
+        cached_method = None
+
+        def run(env):
+            nonlocal cached_table, cached_method
+            instance = obj(env)
+            if not isinstance(instance, MinLangInstance):
+                raise RuntimeError("Only instances have properties.")
+            index = instance.shape.slots.get(name)
+            if index is not None:
+                function = instance.values[index]
+                return interpreter.call_value(function, [argument(env) for argument in arguments])
+            table = instance.klass.method_table
+            if table is not cached_table:
+                method = table.get(name)
+                if method is None:
+                    raise RuntimeError(f"Undefined property '{name}'.")
+                cached_table, cached_method = table, method
+            method = cached_method
+            values = [argument(env) for argument in arguments]
+            if count != method.arity():
+                raise RuntimeError(f"Expected {method.arity()} arguments but got {count}.")
+            return method.invoke(interpreter, instance, values)
+        return run
+
+    def build_call(self, expr: Call) -> Thunk:
+        if isinstance(expr.callee, Get):
+            return self.build_invoke(expr, expr.callee)
+        callee = self.build_expr(expr.callee)
+        arguments = [self.build_expr(argument) for argument in expr.arguments]
+        interpreter = self
+
+        def run(env):
+            function = callee(env)
+            values = [argument(env) for argument in arguments]
+            if not isinstance(function, MinLangCallable):
+                raise RuntimeError("Can only call functions and classes.")
+            arity = function.arity()
+            if arity >= 0 and len(values) != arity:
+                raise RuntimeError(f"Expected {arity} arguments but got {len(values)}.")
+            return function.call(interpreter, values)
+        return run
+
+NUMERIC_OPERATORS = {
+    TokenType.MINUS: operator.sub,
+    TokenType.MULTIPLY: operator.mul,
+    TokenType.DIVIDE: operator.truediv,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
@@ -0,0 +1,425 @@
+from typing import Any, Dict, List, Optional, Tuple
+from minlang.lexer import TokenType
+from minlang.parser import *
+
+# Every instruction is two slots wide: an opcode followed by its argument.
+CONSTANT = 0
+NIL = 1
+TRUE = 2
+FALSE = 3
+POP = 4
+NOP = 5
+LOAD_LOCAL = 6
+STORE_LOCAL = 7
+DEFINE_LOCAL = 8
+LOAD_CELL = 9
+STORE_CELL = 10
+DEFINE_CELL = 11
+NEW_CELL = 12
+LOAD_FREE = 13
+STORE_FREE = 14
+LOAD_GLOBAL = 15
+STORE_GLOBAL = 16
+DEFINE_GLOBAL = 17
+GET_PROPERTY = 18
+SET_PROPERTY = 19
+GET_SUPER = 20
+LOAD_METHOD = 21
+ADD = 22
+SUBTRACT = 23
+MULTIPLY = 24
+DIVIDE = 25
+EQUAL = 26
+NOT_EQUAL = 27
+GREATER = 28
+GREATER_EQUAL = 29
+LESS = 30
+LESS_EQUAL = 31
+NEGATE = 32
+NOT = 33
+JUMP = 34
+POP_JUMP_IF_FALSE = 35
+JUMP_IF_FALSE_OR_POP = 36
+JUMP_IF_TRUE_OR_POP = 37
+CALL = 38
+CALL_METHOD = 39
+CLOSURE = 40
+CLASS = 41
+SUBCLASS = 42
+METHOD = 43
+RETURN = 44
+PRINT = 45
+TAIL_CALL = 46
+TAIL_CALL_METHOD = 47
+
+OP_NAMES = {value: name for name, value in list(globals().items())
+            if name.isupper() and isinstance(value, int)}
+
+BINARY_OPS = {
+    TokenType.PLUS: ADD,
+    TokenType.MINUS: SUBTRACT,
+    TokenType.MULTIPLY: MULTIPLY,
+    TokenType.DIVIDE: DIVIDE,
+    TokenType.EQUALS: EQUAL,
+    TokenType.NOT_EQUALS: NOT_EQUAL,
+    TokenType.GREATER: GREATER,
+    TokenType.GREATER_EQUAL: GREATER_EQUAL,
+    TokenType.LESS: LESS,
+    TokenType.LESS_EQUAL: LESS_EQUAL,
+}
+
+CELL_VARIANTS = {
+    LOAD_LOCAL: LOAD_CELL,
+    STORE_LOCAL: STORE_CELL,
+    DEFINE_LOCAL: DEFINE_CELL,
+    NOP: NEW_CELL,
+}
+
+class Code:
+    def __init__(self, name: str, arity: int):
+        self.name = name
+        self.arity = arity
+        self.code: List[int] = []
+        self.constants: List[Any] = []
+        self.slot_count = 0
+        self.padding: List[None] = []
+        self.cell_params: List[int] = []
+        self.free_refs: List[Tuple[bool, int]] = []
+        self.is_initializer = False
+
+    def disassemble(self) -> str:
+        lines = [f"== {self.name} =="]
+        for ip in range(0, len(self.code), 2):
+            op, arg = self.code[ip], self.code[ip + 1]
+            lines.append(f"{ip:04d} {OP_NAMES[op]:<20} {arg}")
+        for constant in self.constants:
+            if isinstance(constant, Code):
+                lines.append(constant.disassemble())
+        return "\n".join(lines)
+
+class PropertyCache:
+    # Inline cache for one GET_PROPERTY, SET_PROPERTY or LOAD_METHOD site:
+    # the last receiver shape with the field's slot (or, for a store that
+    # adds the field, the shape it transitions to), and the method table
+    # of the last receiver's class with the method `name` resolved to.
+    __slots__ = ("name", "shape", "index", "transition", "table", "method")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.shape: Any = None
+        self.index = 0
+        self.transition: Any = None
+        self.table: Optional[Dict[str, Any]] = None
+        self.method: Any = None
+
+class Local:
+    def __init__(self, name: str, slot: int):
+        self.name = name
+        self.slot = slot
+        self.captured = False
+        self.sites: List[int] = []
+
+class FunctionState:
+    def __init__(self, code: Code, enclosing: Optional['FunctionState']):
+        self.code = code
+        self.enclosing = enclosing
+        self.scopes: List[Dict[str, Local]] = []
+        self.locals: List[Local] = []
+        self.params: List[Local] = []
+        self.free: Dict[Local, int] = {}
+        self.constant_index: Dict[Tuple[type, str], int] = {}
+
+class Compiler:
+    def __init__(self):
+        self.state: Optional[FunctionState] = None
+
+    def compile(self, statements: List[Stmt]) -> Code:
+        code = Code("<script>", 0)
+        self.state = FunctionState(code, None)
+        for statement in statements:
+            self.statement(statement)
+        self.emit(NIL)
+        self.emit(RETURN)
+        self.finish_function()
+        self.state = None
+        return code
+
+    def statement(self, stmt: Optional[Stmt]):
+        if isinstance(stmt, Expression):
+            self.expression(stmt.expression)
+            self.emit(POP)
+        elif isinstance(stmt, Print):
+            self.expression(stmt.expression)
+            self.emit(PRINT)
+        elif isinstance(stmt, Var):
+            if stmt.initializer is not None:
+                self.expression(stmt.initializer)
+            else:
+                self.emit(NIL)
+            self.define_variable(stmt.name.lexeme)
+        elif isinstance(stmt, Block):
+            self.begin_scope()
+            for statement in stmt.statements:
+                self.statement(statement)
+            self.end_scope()
+        elif isinstance(stmt, If):
+            self.expression(stmt.condition)
+            else_jump = self.emit(POP_JUMP_IF_FALSE)
+            self.statement(stmt.then_branch)
+            if stmt.else_branch is not None:
+                end_jump = self.emit(JUMP)
+                self.patch_jump(else_jump)
+                self.statement(stmt.else_branch)
+                self.patch_jump(end_jump)
+            else:
+                self.patch_jump(else_jump)
+        elif isinstance(stmt, While):
+            loop_start = len(self.state.code.code)
+            self.expression(stmt.condition)
+            exit_jump = self.emit(POP_JUMP_IF_FALSE)
+            self.statement(stmt.body)
+            self.emit(JUMP, loop_start)
+            self.patch_jump(exit_jump)
+        elif isinstance(stmt, Function):
+            local = self.declare_variable(stmt.name.lexeme)
+            self.function(stmt, False)
+            self.store_declared(stmt.name.lexeme, local)
+        elif isinstance(stmt, Return):
+            if self.state.code.is_initializer:
+                self.load_variable("this")
+            elif isinstance(stmt.value, Call):
+                # The VM reuses the returning frame for the callee; the
+                # RETURN only runs when the callee was not a closure.
+                self.call(stmt.value, True)
+            elif stmt.value is not None:
+                self.expression(stmt.value)
+            else:
+                self.emit(NIL)
+            self.emit(RETURN)
+        elif isinstance(stmt, Class):
+            self.class_declaration(stmt)
+
+    def class_declaration(self, stmt: Class):
+        name = stmt.name.lexeme
+        local = self.declare_variable(name)
+
+        if stmt.superclass is not None:
+            self.begin_scope()
+            self.expression(stmt.superclass)
+            self.define_variable("super")
+            self.load_variable("super")
+            self.emit(SUBCLASS, self.constant(name))
+        else:
+            self.emit(CLASS, self.constant(name))
+
+        for method in stmt.methods:
+            self.function(method, True)
+            self.emit(METHOD, self.constant(method.name.lexeme))
+
+        if stmt.superclass is not None:
+            self.end_scope()
+
+        self.store_declared(name, local)
+
+    def function(self, declaration: Function, is_method: bool):
+        code = Code(declaration.name.lexeme, len(declaration.params))
+        code.is_initializer = is_method and declaration.name.lexeme == "init"
+
+        self.state = FunctionState(code, self.state)
+        self.begin_scope()
+        # Slot 0 holds the callee (or the receiver, for methods) and the
+        # arguments follow it, so a CALL's slice of the operand stack is
+        # already laid out as the new frame.
+        self.state.params.append(self.add_local("this" if is_method else ""))
+        for param in declaration.params:
+            self.state.params.append(self.add_local(param.lexeme))
+        for statement in declaration.body:
+            self.statement(statement)
+        if code.is_initializer:
+            self.load_variable("this")
+        else:
+            self.emit(NIL)
+        self.emit(RETURN)
+        self.finish_function()
+        self.state = self.state.enclosing
+
+        self.emit(CLOSURE, self.add_constant(code))
+
+    def finish_function(self):
+        state = self.state
+        code = state.code
+        for local in state.locals:
+            if not local.captured:
+                continue
+            for site in local.sites:
+                code.code[site] = CELL_VARIANTS[code.code[site]]
+        code.cell_params = [local.slot for local in state.params if local.captured]
+        code.slot_count = len(state.locals)
+        if state.enclosing is not None:
+            code.padding = [None] * (code.slot_count - code.arity - 1)
+
+    def expression(self, expr: Expr):
+        if isinstance(expr, Literal):
+            if expr.value is None:
+                self.emit(NIL)
+            elif expr.value is True:
+                self.emit(TRUE)
+            elif expr.value is False:
+                self.emit(FALSE)
+            else:
+                self.emit(CONSTANT, self.constant(expr.value))
+        elif isinstance(expr, Variable):
+            self.load_variable(expr.name.lexeme)
+        elif isinstance(expr, Assign):
+            self.expression(expr.value)
+            self.store_variable(expr.name.lexeme)
+        elif isinstance(expr, Binary):
+            self.expression(expr.left)
+            self.expression(expr.right)
+            self.emit(BINARY_OPS[expr.operator.type])
+        elif isinstance(expr, Logical):
+            self.expression(expr.left)
+            if expr.operator.type == TokenType.OR:
+                end_jump = self.emit(JUMP_IF_TRUE_OR_POP)
+            else:
+                end_jump = self.emit(JUMP_IF_FALSE_OR_POP)
+            self.expression(expr.right)
+            self.patch_jump(end_jump)
+        elif isinstance(expr, Unary):
+            self.expression(expr.right)
+            if expr.operator.type == TokenType.MINUS:
+                self.emit(NEGATE)
+            else:
+                self.emit(NOT)
+        elif isinstance(expr, Grouping):
+            self.expression(expr.expression)
+        elif isinstance(expr, Call):
+            self.call(expr, False)
+        elif isinstance(expr, Get):
+            self.expression(expr.obj)
+            self.emit(GET_PROPERTY, self.add_constant(PropertyCache(expr.name.lexeme)))
+        elif isinstance(expr, Set):
+            self.expression(expr.obj)
+            self.expression(expr.value)
+            self.emit(SET_PROPERTY, self.add_constant(PropertyCache(expr.name.lexeme)))
+        elif isinstance(expr, This):
+            self.load_variable("this")
+        elif isinstance(expr, Super):
+            self.load_variable("this")
+            self.load_variable("super")
+            self.emit(GET_SUPER, self.constant(expr.method.lexeme))
+
+    def call(self, expr: Call, tail: bool):
+        if isinstance(expr.callee, Get):
+            self.expression(expr.callee.obj)
+            self.emit(LOAD_METHOD, self.add_constant(PropertyCache(expr.callee.name.lexeme)))
+            call_op = TAIL_CALL_METHOD if tail else CALL_METHOD
+        else:
+            self.expression(expr.callee)
+            call_op = TAIL_CALL if tail else CALL
+        for argument in expr.arguments:
+            self.expression(argument)
+        self.emit(call_op, len(expr.arguments))
+
+    def begin_scope(self):
+        self.state.scopes.append({})
+
+    def end_scope(self):
+        self.state.scopes.pop()
+
+    def add_local(self, name: str) -> Local:
+        local = Local(name, len(self.state.locals))
+        self.state.locals.append(local)
+        self.state.scopes[-1][name] = local
+        return local
+
+    def declare_variable(self, name: str) -> Optional[Local]:
+        if not self.state.scopes:
+            return None
+        local = self.add_local(name)
+        self.emit_local(NOP, local)
+        return local
+
+    def store_declared(self, name: str, local: Optional[Local]):
+        if local is None:
+            self.emit(DEFINE_GLOBAL, self.constant(name))
+        else:
+            self.emit_local(STORE_LOCAL, local)
+            self.emit(POP)
+
+    def define_variable(self, name: str):
+        if not self.state.scopes:
+            self.emit(DEFINE_GLOBAL, self.constant(name))
+            return
+        self.emit_local(DEFINE_LOCAL, self.add_local(name))
+
+    def load_variable(self, name: str):
+        self.access_variable(name, LOAD_LOCAL, LOAD_FREE, LOAD_GLOBAL)
+
+    def store_variable(self, name: str):
+        self.access_variable(name, STORE_LOCAL, STORE_FREE, STORE_GLOBAL)
+
+    def access_variable(self, name: str, local_op: int, free_op: int, global_op: int):
+        local = self.find_local(self.state, name)
+        if local is not None:
+            self.emit_local(local_op, local)
+            return
+        free = self.find_free(self.state, name)
+        if free is not None:
+            self.emit(free_op, free[1])
+            return
+        self.emit(global_op, self.constant(name))
+
+    def find_local(self, state: FunctionState, name: str) -> Optional[Local]:
+        for scope in reversed(state.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def find_free(self, state: FunctionState, name: str) -> Optional[Tuple[Local, int]]:
+        enclosing = state.enclosing
+        if enclosing is None:
+            return None
+
+        local = self.find_local(enclosing, name)
+        if local is not None:
+            local.captured = True
+            return local, self.add_free(state, local, (True, local.slot))
+
+        found = self.find_free(enclosing, name)
+        if found is not None:
+            local, index = found
+            return local, self.add_free(state, local, (False, index))
+        return None
+
+    def add_free(self, state: FunctionState, key: Local, ref: Tuple[bool, int]) -> int:
+        if key in state.free:
+            return state.free[key]
+        state.code.free_refs.append(ref)
+        state.free[key] = len(state.code.free_refs) - 1
+        return state.free[key]
+
+    def constant(self, value: Any) -> int:
+        # repr keeps 0.0 and -0.0 apart; they compare (and hash) equal.
+        key = (type(value), repr(value))
+        index = self.state.constant_index.get(key)
+        if index is None:
+            index = self.add_constant(value)
+            self.state.constant_index[key] = index
+        return index
+
+    def add_constant(self, value: Any) -> int:
+        self.state.code.constants.append(value)
+        return len(self.state.code.constants) - 1
+
+    def emit(self, op: int, arg: int = 0) -> int:
+        code = self.state.code.code
+        code.append(op)
+        code.append(arg)
+        return len(code) - 2
+
+    def emit_local(self, op: int, local: Local):
+        local.sites.append(self.emit(op, local.slot))
+
+    def patch_jump(self, site: int):
+        self.state.code.code[site + 1] = len(self.state.code.code)
@@ -0,0 +1,195 @@
+from typing import Dict, List, Optional, Tuple
+from minlang.parser import *
+from minlang.interpreter import ClosureLayout, Interpreter
+
+# Closure conversion for the engines that run on Environments (tree and
+# closure). Without it a function keeps its whole defining Environment and,
+# through `enclosing`, every scope around it. This pass finds the variables
+# each function uses from enclosing functions (its free variables) and
+# records, on the interpreter, everything needed to capture just those:
+# captured variables live in Cells shared by the declaring scope and every
+# closure that uses them, and a function's closure becomes one Environment
+# holding the cells of its free variables.
+#
+# Inside a function the environment chain is unchanged, so the resolver's
+# distances stay valid for everything but captured variables. The pass
+# moves references to those from `locals` to `cells`, with the distance to
+# the environment that holds the cell. Runs after the resolver and the
+# optimizer, on the tree that will be executed.
+
+class Binding:
+    # One local variable declaration. `references` collects the uses in
+    # the declaring function, which only become cell lookups if some
+    # nested function turns out to capture the variable.
+    __slots__ = ("name", "function", "declaration", "captured", "references")
+
+    def __init__(self, name: str, function: Optional['FunctionScope'], declaration: Optional[object]):
+        self.name = name
+        self.function = function
+        self.declaration = declaration
+        self.captured = False
+        self.references: List[Tuple[Expr, int]] = []
+
+class FunctionScope:
+    # `base` is the index of the function's outermost scope (its `this`
+    # scope for a method, otherwise its parameters); the closure
+    # environment sits just outside it.
+    __slots__ = ("parent", "base", "free")
+
+    def __init__(self, parent: Optional['FunctionScope'], base: int):
+        self.parent = parent
+        self.base = base
+        self.free: Dict[Binding, None] = {}
+
+class ClosureConverter:
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+        self.locals = interpreter.locals
+        self.scopes: List[Dict[str, Binding]] = []
+        self.function: Optional[FunctionScope] = None
+
+    def convert(self, statements: List[Stmt]):
+        for statement in statements:
+            self.convert_stmt(statement)
+
+    def convert_stmt(self, stmt: Optional[Stmt]):
+        if isinstance(stmt, (Expression, Print)):
+            self.convert_expr(stmt.expression)
+        elif isinstance(stmt, Var):
+            if stmt.initializer is not None:
+                self.convert_expr(stmt.initializer)
+            self.declare(stmt.name.lexeme, stmt)
+        elif isinstance(stmt, Block):
+            self.scopes.append({})
+            self.convert(stmt.statements)
+            self.end_scope()
+        elif isinstance(stmt, If):
+            self.convert_expr(stmt.condition)
+            self.convert_stmt(stmt.then_branch)
+            self.convert_stmt(stmt.else_branch)
+        elif isinstance(stmt, While):
+            self.convert_expr(stmt.condition)
+            self.convert_stmt(stmt.body)
+        elif isinstance(stmt, Function):
+            self.declare(stmt.name.lexeme, stmt)
+            self.convert_function(stmt, False)
+        elif isinstance(stmt, Return):
+            if stmt.value is not None:
+                self.convert_expr(stmt.value)
+        elif isinstance(stmt, Class):
+            self.declare(stmt.name.lexeme, stmt)
+            if stmt.superclass is not None:
+                self.convert_expr(stmt.superclass)
+                self.scopes.append({"super": Binding("super", self.function, stmt.superclass)})
+            for method in stmt.methods:
+                self.convert_function(method, True)
+            if stmt.superclass is not None:
+                self.end_scope()
+
+    def convert_function(self, function: Function, is_method: bool):
+        scope = FunctionScope(self.function, len(self.scopes))
+        self.function = scope
+        receiver = None
+        if is_method:
+            receiver = Binding("this", scope, None)
+            self.scopes.append({"this": receiver})
+        params = [Binding(param.lexeme, scope, None) for param in function.params]
+        self.scopes.append({binding.name: binding for binding in params})
+        self.convert(function.body)
+        self.end_scope()
+        if is_method:
+            self.end_scope()
+        self.function = scope.parent
+
+        # Back at the point where the function value is created: find each
+        # free variable's cell from here.
+        free = [(binding.name, self.cell_distance(binding)) for binding in scope.free]
+        cell_params = [binding.name for binding in params if binding.captured]
+        self.interpreter.layouts[function] = ClosureLayout(
+            free, cell_params, receiver is not None and receiver.captured)
+
+    def declare(self, name: str, declaration: Stmt):
+        if not self.scopes:
+            return
+        self.scopes[-1][name] = Binding(name, self.function, declaration)
+
+    def end_scope(self):
+        for binding in self.scopes.pop().values():
+            if not binding.captured:
+                continue
+            if binding.declaration is not None:
+                self.interpreter.captured.add(binding.declaration)
+            for expr, distance in binding.references:
+                if isinstance(expr, Super):
+                    self.interpreter.receivers[expr] = (distance, True)
+                else:
+                    self.interpreter.resolve_cell(expr, distance)
+
+    def convert_expr(self, expr: Expr):
+        if isinstance(expr, Variable):
+            self.reference(expr, expr.name.lexeme)
+        elif isinstance(expr, Assign):
+            self.convert_expr(expr.value)
+            self.reference(expr, expr.name.lexeme)
+        elif isinstance(expr, (Binary, Logical)):
+            self.convert_expr(expr.left)
+            self.convert_expr(expr.right)
+        elif isinstance(expr, Unary):
+            self.convert_expr(expr.right)
+        elif isinstance(expr, Grouping):
+            self.convert_expr(expr.expression)
+        elif isinstance(expr, Call):
+            self.convert_expr(expr.callee)
+            for argument in expr.arguments:
+                self.convert_expr(argument)
+        elif isinstance(expr, Get):
+            self.convert_expr(expr.obj)
+        elif isinstance(expr, Set):
+            self.convert_expr(expr.obj)
+            self.convert_expr(expr.value)
+        elif isinstance(expr, This):
+            self.reference(expr, "this")
+        elif isinstance(expr, Super):
+            # `super` is always declared outside the method, so it is always
+            # captured; `this` may belong to the method using it or, inside
+            # a nested function, be captured as well.
+            distance = self.locals[expr]
+            self.capture(self.scopes[-1 - distance]["super"])
+            self.interpreter.resolve_cell(expr, self.free_distance())
+            receiver = self.scopes[-distance]["this"]
+            if receiver.function is self.function:
+                self.interpreter.receivers[expr] = (distance - 1, False)
+                receiver.references.append((expr, distance - 1))
+            else:
+                self.capture(receiver)
+                self.interpreter.receivers[expr] = (self.free_distance(), True)
+
+    def reference(self, expr: Expr, name: str):
+        distance = self.locals.get(expr)
+        if distance is None:
+            return
+        binding = self.scopes[-1 - distance][name]
+        if binding.function is self.function:
+            binding.references.append((expr, distance))
+        else:
+            self.capture(binding)
+            self.interpreter.resolve_cell(expr, self.free_distance())
+
+    def capture(self, binding: Binding):
+        binding.captured = True
+        function = self.function
+        while function is not binding.function:
+            function.free[binding] = None
+            function = function.parent
+
+    def free_distance(self) -> int:
+        # From the innermost scope to the current function's closure.
+        return len(self.scopes) - self.function.base
+
+    def cell_distance(self, binding: Binding) -> int:
+        if binding.function is not self.function:
+            return self.free_distance()
+        distance = 0
+        while self.scopes[-1 - distance].get(binding.name) is not binding:
+            distance += 1
+        return distance
@@ -1,10 +1,49 @@
-from typing import Dict, List, Optional, Any
+import operator
+import weakref
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Any, Tuple
 from minlang.lexer import Token, TokenType
 from minlang.parser import *
+from minlang.output import Output, StreamOutput, stringify
+
+# Quickened Binary evaluation. The first time the tree walker evaluates a
+# Binary node, it looks its operator and operand types up in this table
+# and, if both operands have the same listed type, records the Python
+# operator for the node. Later evaluations only guard the types and apply
+# it. A failed guard marks the node GENERIC, which never specializes
+# again. The records live in the interpreter, not on the node, so running
+# a shared tree never changes it.
+QUICKENED_BINARY = {
+    (TokenType.PLUS, int): operator.add,
+    (TokenType.MINUS, int): operator.sub,
+    (TokenType.MULTIPLY, int): operator.mul,
+    (TokenType.DIVIDE, int): operator.truediv,
+    (TokenType.LESS, int): operator.lt,
+    (TokenType.LESS_EQUAL, int): operator.le,
+    (TokenType.GREATER, int): operator.gt,
+    (TokenType.GREATER_EQUAL, int): operator.ge,
+    (TokenType.EQUALS, int): operator.eq,
+    (TokenType.NOT_EQUALS, int): operator.ne,
+    (TokenType.PLUS, float): operator.add,
+    (TokenType.MINUS, float): operator.sub,
+    (TokenType.MULTIPLY, float): operator.mul,
+    (TokenType.DIVIDE, float): operator.truediv,
+    (TokenType.LESS, float): operator.lt,
+    (TokenType.LESS_EQUAL, float): operator.le,
+    (TokenType.GREATER, float): operator.gt,
+    (TokenType.GREATER_EQUAL, float): operator.ge,
+    (TokenType.EQUALS, float): operator.eq,
+    (TokenType.NOT_EQUALS, float): operator.ne,
+    (TokenType.PLUS, str): operator.add,
+}
+
+# The record of a node whose guard failed, or whose operands had no
+# specialization: no operand's type is None, so the guard never passes.
+GENERIC = (None, None)
 
 class Environment:
-    def __init__(self, enclosing: Optional['Environment'] = None):
-        self.values: Dict[str, Any] = {}
+    def __init__(self, enclosing: Optional['Environment'] = None, values: Optional[Dict[str, Any]] = None):
+        self.values: Dict[str, Any] = {} if values is None else values
         self.enclosing = enclosing
 
     def define(self, name: str, value: Any):
@@ -42,245 +81,693 @@ class Environment:
             environment = environment.enclosing
         return environment
 
-class MinLangClass:
+class Cell:
+    # A variable that a nested function captures. The declaring scope and
+    # every closure using the variable share the cell, so a closure keeps
+    # only the variables it uses instead of its whole defining Environment.
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any = None):
+        self.value = value
+
+class ClosureLayout:
+    # Filled in by ClosureConverter for each Function node: the cells a new
+    # function copies out of its defining environment, as (name, distance)
+    # pairs, and which of its parameters (and, for a method, `this`) are
+    # stored in cells because functions nested in it capture them.
+    __slots__ = ("free", "cell_params", "cell_this")
+
+    def __init__(self, free: List[Tuple[str, int]], cell_params: List[str], cell_this: bool):
+        self.free = free
+        self.cell_params = cell_params
+        self.cell_this = cell_this
+
+NO_CELLS = ClosureLayout([], [], False)
+
+class MinLangCallable(ABC):
+    @abstractmethod
+    def call(self, interpreter: 'Interpreter', arguments: List[Any]) -> Any:
+        ...
+
+    @abstractmethod
+    def arity(self) -> int:
+        ...
+
+class MinLangClass(MinLangCallable):
     def __init__(self, name: str, superclass: Optional['MinLangClass'], methods: Dict[str, 'MinLangFunction']):
         self.name = name
         self.superclass = superclass
         self.methods = methods
+        self.subclasses: List[weakref.ref] = []
+        if superclass is not None:
+            superclass.subclasses.append(weakref.ref(self))
+        self.method_table = self.flatten()
+
+    def flatten(self) -> Dict[str, 'MinLangFunction']:
+        # Every method the class responds to, inherited ones included, so
+        # a lookup is one dict probe instead of a walk up the superclass
+        # chain. Inline caches key on this dict: invalidate() replaces it
+        # rather than mutating it, which makes every cached entry miss.
+        if self.superclass is None:
+            return dict(self.methods)
+        table = dict(self.superclass.method_table)
+        table.update(self.methods)
+        return table
+
+    def add_method(self, name: str, method: 'MinLangFunction'):
+        self.methods[name] = method
+        self.invalidate()
+
+    def invalidate(self):
+        self.method_table = self.flatten()
+        for reference in self.subclasses:
+            subclass = reference()
+            if subclass is not None:
+                subclass.invalidate()
 
     def find_method(self, name: str) -> Optional['MinLangFunction']:
-        if name in self.methods:
-            return self.methods[name]
-        
+        return self.method_table.get(name)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Weak references don't pickle. An unpickled class has an empty
+        # method table until relink() runs, which must happen for each
+        # superclass before its subclasses (see minlang.snapshot).
+        return {"name": self.name, "superclass": self.superclass, "methods": self.methods}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self.subclasses = []
+        self.method_table = {}
+
+    def relink(self):
         if self.superclass is not None:
-            return self.superclass.find_method(name)
-        
-        return None
+            self.superclass.subclasses.append(weakref.ref(self))
+        self.method_table = self.flatten()
+
+    def call(self, interpreter: 'Interpreter', arguments: List[Any]) -> Any:
+        instance = MinLangInstance(self)
+        initializer = self.method_table.get("init")
+        if initializer is not None:
+            initializer.invoke(interpreter, instance, arguments)
+        return instance
+
+    def arity(self) -> int:
+        initializer = self.method_table.get("init")
+        if initializer is None:
+            return 0
+        return initializer.arity()
 
     def __str__(self):
         return self.name
 
+class Shape:
+    # A hidden class: the field layout shared by every instance that added
+    # the same fields in the same order. Instances store only a list of
+    # values; `slots` maps each field name to its index in that list.
+    # Adding a field moves an instance along a cached transition, so all
+    # instances built the same way end up on the same Shape object.
+    __slots__ = ("slots", "transitions")
+
+    def __init__(self, slots: Dict[str, int]):
+        self.slots = slots
+        self.transitions: Dict[str, 'Shape'] = {}
+
+    def with_field(self, name: str) -> 'Shape':
+        shape = self.transitions.get(name)
+        if shape is None:
+            slots = dict(self.slots)
+            slots[name] = len(slots)
+            shape = Shape(slots)
+            self.transitions[name] = shape
+        return shape
+
+    def __reduce__(self):
+        # Unpickled shapes are looked up from EMPTY_SHAPE again, so restored
+        # instances share shapes with the ones created afterwards.
+        return (shape_for, (tuple(self.slots),))
+
+EMPTY_SHAPE = Shape({})
+
+def shape_for(fields: Tuple[str, ...]) -> Shape:
+    shape = EMPTY_SHAPE
+    for name in fields:
+        shape = shape.with_field(name)
+    return shape
+
 class MinLangInstance:
+    __slots__ = ("klass", "shape", "values")
+
     def __init__(self, klass: MinLangClass):
         self.klass = klass
-        self.fields: Dict[str, Any] = {}
+        self.shape = EMPTY_SHAPE
+        self.values: List[Any] = []
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        return dict(zip(self.shape.slots, self.values))
 
     def get(self, name: Token) -> Any:
-        if name.lexeme in self.fields:
-            return self.fields[name.lexeme]
+        index = self.shape.slots.get(name.lexeme)
+        if index is not None:
+            return self.values[index]
         
-        method = self.klass.find_method(name.lexeme)
+        method = self.klass.method_table.get(name.lexeme)
         if method is not None:
             return method.bind(self)
         
         raise RuntimeError(f"Undefined property '{name.lexeme}'.")
 
     def set(self, name: Token, value: Any):
-        self.fields[name.lexeme] = value
+        index = self.shape.slots.get(name.lexeme)
+        if index is None:
+            self.shape = self.shape.with_field(name.lexeme)
+            self.values.append(value)
+        else:
+            self.values[index] = value
 
     def __str__(self):
         return f"{self.klass.name} instance"
 
-class MinLangFunction:
-    def __init__(self, declaration: Function, closure: Environment, is_initializer: bool = False):
+class MinLangFunction(MinLangCallable):
+    def __init__(self, declaration: Function, closure: Optional[Environment], is_initializer: bool = False,
+                 params: Optional[List[str]] = None, layout: ClosureLayout = NO_CELLS):
         self.declaration = declaration
         self.closure = closure
         self.is_initializer = is_initializer
+        self.params = [param.lexeme for param in declaration.params] if params is None else params
+        self.layout = layout
 
     def bind(self, instance: MinLangInstance) -> 'MinLangFunction':
-        environment = Environment(self.closure)
-        environment.define("this", instance)
-        return MinLangFunction(self.declaration, environment, self.is_initializer)
+        environment = Environment(self.closure, {"this": Cell(instance) if self.layout.cell_this else instance})
+        return type(self)(self.declaration, environment, self.is_initializer, self.params, self.layout)
+
+    def box_params(self, values: Dict[str, Any]):
+        for name in self.layout.cell_params:
+            values[name] = Cell(values[name])
 
     def call(self, interpreter: 'Interpreter', arguments: List[Any]) -> Any:
-        environment = Environment(self.closure)
-        for i in range(len(self.declaration.params)):
-            environment.define(self.declaration.params[i].lexeme, arguments[i])
+        values = dict(zip(self.params, arguments))
+        if self.layout.cell_params:
+            self.box_params(values)
+        environment = Environment(self.closure, values)
+        completion = interpreter.execute_block(self.declaration.body, environment)
         
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except ReturnException as return_value:
-            if self.is_initializer:
-                return self.closure.get_at(0, "this")
-            return return_value.value
+        if self.is_initializer:
+            instance = self.closure.values["this"]
+            return instance.value if self.layout.cell_this else instance
+        if completion is not None:
+            return completion.value
+        return None
+
+    def invoke(self, interpreter: 'Interpreter', instance: MinLangInstance, arguments: List[Any]) -> Any:
+        # Same as bind(instance).call(...) without building the bound function.
+        receiver = Environment(self.closure, {"this": Cell(instance) if self.layout.cell_this else instance})
+        values = dict(zip(self.params, arguments))
+        if self.layout.cell_params:
+            self.box_params(values)
+        environment = Environment(receiver, values)
+        completion = interpreter.execute_block(self.declaration.body, environment)
         
         if self.is_initializer:
-            return self.closure.get_at(0, "this")
+            return instance
+        if completion is not None:
+            return completion.value
         return None
 
     def arity(self) -> int:
-        return len(self.declaration.params)
+        return len(self.params)
 
     def __str__(self):
         return f"<fn {self.declaration.name.lexeme}>"
 
-class ReturnException(Exception):
+class Completion:
+    # Returned by a statement that leaves the enclosing function; statements
+    # that complete normally return None. Unwinding through return values is
+    # much cheaper in CPython than raising an exception per `return`.
+    __slots__ = ("value",)
+
     def __init__(self, value: Any):
         self.value = value
 
 class Interpreter:
-    def __init__(self):
+    # The class of the function objects `def` and `class` create.
+    function_class = MinLangFunction
+
+    stringify = staticmethod(stringify)
+
+    def __init__(self, output: Optional[Output] = None):
+        self.output = StreamOutput() if output is None else output
         self.globals = Environment()
         self.environment = self.globals
         self.locals: Dict[Expr, int] = {}
+        # Closure conversion's side tables (see ClosureConverter): references
+        # to captured variables with the distance to the environment holding
+        # their cell, the receiver lookup of each converted `super`, the
+        # layout of each converted function, and the declarations (Var,
+        # Function and Class statements, or a superclass expression for its
+        # class's `super`) whose variable is stored in a cell.
+        self.cells: Dict[Expr, int] = {}
+        self.receivers: Dict[Super, Tuple[int, bool]] = {}
+        self.layouts: Dict[Function, ClosureLayout] = {}
+        self.captured: set = set()
+        # Each evaluated Binary node's operand type and operator, or GENERIC.
+        self.quickened: Dict[Binary, Tuple[Optional[type], Optional[Callable]]] = {}
+        self.had_runtime_error = False
 
         # Define native functions
         self.globals.define("clock", ClockFunction())
         self.globals.define("print", PrintFunction())
 
+        self.stmt_handlers = {
+            Expression: self.visit_expression_stmt,
+            Print: self.visit_print_stmt,
+            Var: self.visit_var_stmt,
+            Block: self.visit_block_stmt,
+            If: self.visit_if_stmt,
+            While: self.visit_while_stmt,
+            Function: self.visit_function_stmt,
+            Return: self.visit_return_stmt,
+            Class: self.visit_class_stmt,
+            type(None): self.visit_missing_stmt,
+        }
+        self.expr_handlers = {
+            Assign: self.visit_assign_expr,
+            Logical: self.visit_logical_expr,
+            Binary: self.visit_binary_expr,
+            Unary: self.visit_unary_expr,
+            Literal: self.visit_literal_expr,
+            Grouping: self.visit_grouping_expr,
+            Variable: self.visit_variable_expr,
+            Call: self.visit_call_expr,
+            Get: self.visit_get_expr,
+            Set: self.visit_set_expr,
+            This: self.visit_this_expr,
+            Super: self.visit_super_expr,
+        }
+        self.binary_handlers = {
+            TokenType.PLUS: self.binary_plus,
+            TokenType.MINUS: self.binary_minus,
+            TokenType.MULTIPLY: self.binary_multiply,
+            TokenType.DIVIDE: self.binary_divide,
+            TokenType.EQUALS: self.binary_equals,
+            TokenType.NOT_EQUALS: self.binary_not_equals,
+            TokenType.GREATER: self.binary_greater,
+            TokenType.GREATER_EQUAL: self.binary_greater_equal,
+            TokenType.LESS: self.binary_less,
+            TokenType.LESS_EQUAL: self.binary_less_equal,
+        }
+
+    def resolve(self, expr: Expr, depth: int):
+        self.locals[expr] = depth
+
+    def resolve_cell(self, expr: Expr, depth: int):
+        self.locals.pop(expr, None)
+        self.cells[expr] = depth
+
+    def capture(self, layout: Optional[ClosureLayout], environment: Environment) -> Optional[Environment]:
+        # The closure for a function declared in `environment` with this
+        # layout. Functions closure conversion has not seen (no layout) keep
+        # the whole environment.
+        if layout is None:
+            return environment
+        if not layout.free:
+            return None
+        return Environment(None, {name: environment.ancestor(distance).values[name]
+                                  for name, distance in layout.free})
+
+    def release(self, nodes: List[Tuple[Any, Optional[Function]]]):
+        # Called by --stream once a top-level statement has run, with the
+        # statement's nodes as parser.walk lists them. Drops their side-table
+        # entries except those of functions that can still run: functions
+        # reachable from the globals, and functions declared inside those.
+        parents = {node: function for node, function in nodes if isinstance(node, Function)}
+        reachable = self.reachable_functions() if parents else set()
+        live: Dict[Optional[Function], bool] = {None: False}
+        for function in parents:
+            chain = []
+            while function not in live:
+                if function in reachable:
+                    live[function] = True
+                    break
+                chain.append(function)
+                function = parents[function]
+            for inner in chain:
+                live[inner] = live[function]
+        self.forget(node for node, function in nodes if not live[function])
+
+    def reachable_functions(self) -> set:
+        # The declarations of every function object reachable from the globals.
+        declarations = set()
+        seen = set()
+        pending: List[Any] = [self.globals]
+        while pending:
+            value = pending.pop()
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+            if isinstance(value, Environment):
+                pending.extend(value.values.values())
+                if value.enclosing is not None:
+                    pending.append(value.enclosing)
+            elif isinstance(value, Cell):
+                pending.append(value.value)
+            elif isinstance(value, MinLangFunction):
+                declarations.add(value.declaration)
+                if value.closure is not None:
+                    pending.append(value.closure)
+            elif isinstance(value, MinLangClass):
+                pending.extend(value.methods.values())
+                if value.superclass is not None:
+                    pending.append(value.superclass)
+            elif isinstance(value, MinLangInstance):
+                pending.append(value.klass)
+                pending.extend(value.values)
+        return declarations
+
+    def forget(self, nodes: Iterable[Any]):
+        for node in nodes:
+            self.locals.pop(node, None)
+            self.cells.pop(node, None)
+            self.receivers.pop(node, None)
+            self.layouts.pop(node, None)
+            self.captured.discard(node)
+            self.quickened.pop(node, None)
+
     def interpret(self, statements: List[Stmt]):
         try:
             for statement in statements:
                 self.execute(statement)
         except RuntimeError as error:
-            print(f"Runtime error: {error}")
-
-    def execute(self, stmt: Stmt):
-        if isinstance(stmt, Expression):
-            self.evaluate(stmt.expression)
-        elif isinstance(stmt, Print):
-            value = self.evaluate(stmt.expression)
-            print(self.stringify(value))
-        elif isinstance(stmt, Var):
-            value = None
-            if stmt.initializer is not None:
-                value = self.evaluate(stmt.initializer)
-            self.environment.define(stmt.name.lexeme, value)
-        elif isinstance(stmt, Block):
-            self.execute_block(stmt.statements, Environment(self.environment))
-        elif isinstance(stmt, If):
-            if self.is_truthy(self.evaluate(stmt.condition)):
-                self.execute(stmt.then_branch)
-            elif stmt.else_branch is not None:
-                self.execute(stmt.else_branch)
-        elif isinstance(stmt, While):
-            while self.is_truthy(self.evaluate(stmt.condition)):
-                self.execute(stmt.body)
-        elif isinstance(stmt, Function):
-            function = MinLangFunction(stmt, self.environment)
-            self.environment.define(stmt.name.lexeme, function)
-        elif isinstance(stmt, Return):
-            value = None
-            if stmt.value is not None:
-                value = self.evaluate(stmt.value)
-            raise ReturnException(value)
-        elif isinstance(stmt, Class):
-            superclass = None
-            if stmt.superclass is not None:
-                superclass = self.evaluate(stmt.superclass)
-                if not isinstance(superclass, MinLangClass):
-                    raise RuntimeError("Superclass must be a class.")
-            
-            self.environment.define(stmt.name.lexeme, None)
-            
-            if stmt.superclass is not None:
-                self.environment = Environment(self.environment)
-                self.environment.define("super", superclass)
-            
-            methods = {}
-            for method in stmt.methods:
-                function = MinLangFunction(method, self.environment, method.name.lexeme == "init")
-                methods[method.name.lexeme] = function
-            
-            klass = MinLangClass(stmt.name.lexeme, superclass, methods)
-            
-            if stmt.superclass is not None:
-                self.environment = self.environment.enclosing
-            
-            self.environment.assign(stmt.name, klass)
+            self.output.write_line(f"Runtime error: {error}")
+            self.had_runtime_error = True
+        finally:
+            self.output.flush()
 
-    def execute_block(self, statements: List[Stmt], environment: Environment):
+    def execute(self, stmt: Stmt) -> Optional[Completion]:
+        return self.stmt_handlers[type(stmt)](stmt)
+
+    def execute_block(self, statements: List[Stmt], environment: Environment) -> Optional[Completion]:
         previous = self.environment
         try:
             self.environment = environment
             for statement in statements:
-                self.execute(statement)
+                completion = self.stmt_handlers[type(statement)](statement)
+                if completion is not None:
+                    return completion
+            return None
         finally:
             self.environment = previous
 
     def evaluate(self, expr: Expr) -> Any:
-        if isinstance(expr, Binary):
-            left = self.evaluate(expr.left)
-            right = self.evaluate(expr.right)
-            
-            if expr.operator.type == TokenType.PLUS:
-                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                    return left + right
-                if isinstance(left, str) and isinstance(right, str):
-                    return left + right
-                raise RuntimeError("Operands must be two numbers or two strings.")
-            elif expr.operator.type == TokenType.MINUS:
-                self.check_number_operands(expr.operator, left, right)
-                return left - right
-            elif expr.operator.type == TokenType.MULTIPLY:
-                self.check_number_operands(expr.operator, left, right)
-                return left * right
-            elif expr.operator.type == TokenType.DIVIDE:
-                self.check_number_operands(expr.operator, left, right)
-                return left / right
-            elif expr.operator.type == TokenType.EQUALS:
-                return self.is_equal(left, right)
-            elif expr.operator.type == TokenType.NOT_EQUALS:
-                return not self.is_equal(left, right)
-            elif expr.operator.type == TokenType.GREATER:
-                self.check_number_operands(expr.operator, left, right)
-                return left > right
-            elif expr.operator.type == TokenType.GREATER_EQUAL:
-                self.check_number_operands(expr.operator, left, right)
-                return left >= right
-            elif expr.operator.type == TokenType.LESS:
-                self.check_number_operands(expr.operator, left, right)
-                return left < right
-            elif expr.operator.type == TokenType.LESS_EQUAL:
-                self.check_number_operands(expr.operator, left, right)
-                return left <= right
-        elif isinstance(expr, Unary):
-            right = self.evaluate(expr.right)
-            
-            if expr.operator.type == TokenType.MINUS:
-                self.check_number_operand(expr.operator, right)
-                return -right
-            elif expr.operator.type == TokenType.BANG:
-                return not self.is_truthy(right)
-        elif isinstance(expr, Literal):
-            return expr.value
-        elif isinstance(expr, Grouping):
-            return self.evaluate(expr.expression)
-        elif isinstance(expr, Variable):
-            return self.look_up_variable(expr.name, expr)
-        elif isinstance(expr, Call):
-            callee = self.evaluate(expr.callee)
-            
-            arguments = []
-            for argument in expr.arguments:
-                arguments.append(self.evaluate(argument))
-            
-            if not isinstance(callee, MinLangFunction):
-                raise RuntimeError("Can only call functions and classes.")
-            
-            if len(arguments) != callee.arity():
-                raise RuntimeError(f"Expected {callee.arity()} arguments but got {len(arguments)}.")
-            
-            return callee.call(self, arguments)
-        elif isinstance(expr, Get):
-            obj = self.evaluate(expr.obj)
-            if isinstance(obj, MinLangInstance):
-                return obj.get(expr.name)
-            raise RuntimeError("Only instances have properties.")
-        elif isinstance(expr, Set):
-            obj = self.evaluate(expr.obj)
-            if not isinstance(obj, MinLangInstance):
-                raise RuntimeError("Only instances have fields.")
-            value = self.evaluate(expr.value)
-            obj.set(expr.name, value)
+        return self.expr_handlers[type(expr)](expr)
+
+    def visit_expression_stmt(self, stmt: Expression):
+        self.evaluate(stmt.expression)
+
+    def visit_print_stmt(self, stmt: Print):
+        value = self.evaluate(stmt.expression)
+        self.output.write_line(stringify(value))
+
+    def visit_var_stmt(self, stmt: Var):
+        value = None
+        if stmt.initializer is not None:
+            value = self.evaluate(stmt.initializer)
+        if stmt in self.captured:
+            value = Cell(value)
+        self.environment.define(stmt.name.lexeme, value)
+
+    def visit_block_stmt(self, stmt: Block) -> Optional[Completion]:
+        return self.execute_block(stmt.statements, Environment(self.environment))
+
+    def visit_if_stmt(self, stmt: If) -> Optional[Completion]:
+        if self.is_truthy(self.evaluate(stmt.condition)):
+            return self.execute(stmt.then_branch)
+        elif stmt.else_branch is not None:
+            return self.execute(stmt.else_branch)
+        return None
+
+    def visit_while_stmt(self, stmt: While) -> Optional[Completion]:
+        while self.is_truthy(self.evaluate(stmt.condition)):
+            completion = self.execute(stmt.body)
+            if completion is not None:
+                return completion
+        return None
+
+    def visit_function_stmt(self, stmt: Function):
+        layout = self.layouts.get(stmt)
+        if stmt in self.captured:
+            # Defined before the closure is built so that the function can
+            # capture its own cell and call itself.
+            cell = Cell()
+            self.environment.define(stmt.name.lexeme, cell)
+            cell.value = self.function_class(stmt, self.capture(layout, self.environment),
+                                             layout=layout or NO_CELLS)
+            return
+        function = self.function_class(stmt, self.capture(layout, self.environment), layout=layout or NO_CELLS)
+        self.environment.define(stmt.name.lexeme, function)
+
+    def visit_return_stmt(self, stmt: Return) -> Completion:
+        value = None
+        if stmt.value is not None:
+            value = self.evaluate(stmt.value)
+        return Completion(value)
+
+    def visit_class_stmt(self, stmt: Class):
+        superclass = None
+        if stmt.superclass is not None:
+            superclass = self.evaluate(stmt.superclass)
+            if not isinstance(superclass, MinLangClass):
+                raise RuntimeError("Superclass must be a class.")
+        
+        cell = Cell() if stmt in self.captured else None
+        self.environment.define(stmt.name.lexeme, cell)
+        
+        if stmt.superclass is not None:
+            self.environment = Environment(self.environment)
+            if stmt.superclass in self.captured:
+                self.environment.define("super", Cell(superclass))
+            else:
+                self.environment.define("super", superclass)
+        
+        methods = {}
+        for method in stmt.methods:
+            layout = self.layouts.get(method)
+            function = self.function_class(method, self.capture(layout, self.environment),
+                                           method.name.lexeme == "init", layout=layout or NO_CELLS)
+            methods[method.name.lexeme] = function
+        
+        if stmt.superclass is not None:
+            self.environment = self.environment.enclosing
+        
+        klass = MinLangClass(stmt.name.lexeme, superclass, methods)
+        if cell is not None:
+            cell.value = klass
+        else:
+            self.environment.assign(stmt.name, klass)
+
+    def visit_missing_stmt(self, stmt: None):
+        pass
+
+    def visit_assign_expr(self, expr: Assign) -> Any:
+        value = self.evaluate(expr.value)
+        distance = self.locals.get(expr)
+        if distance is not None:
+            self.environment.assign_at(distance, expr.name, value)
             return value
+        distance = self.cells.get(expr)
+        if distance is not None:
+            self.environment.get_at(distance, expr.name.lexeme).value = value
+        else:
+            self.globals.assign(expr.name, value)
+        return value
+
+    def visit_logical_expr(self, expr: Logical) -> Any:
+        left = self.evaluate(expr.left)
+        if expr.operator.type == TokenType.OR:
+            if self.is_truthy(left):
+                return left
+        elif not self.is_truthy(left):
+            return left
+        return self.evaluate(expr.right)
+
+    def visit_binary_expr(self, expr: Binary) -> Any:
+        # Evaluates the operands without going through evaluate(): Binary
+        # nodes are the most common, and the extra calls cost more than
+        # the quickened operators themselves.
+        handlers = self.expr_handlers
+        left = expr.left
+        left = handlers[type(left)](left)
+        right = expr.right
+        right = handlers[type(right)](right)
+        record = self.quickened.get(expr)
+        if record is None:
+            record = GENERIC
+            if type(left) is type(right):
+                operation = QUICKENED_BINARY.get((expr.operator.type, type(left)))
+                if operation is not None:
+                    record = (type(left), operation)
+            self.quickened[expr] = record
+        else:
+            kind, operation = record
+            if type(left) is kind and type(right) is kind:
+                return operation(left, right)
+            if record is not GENERIC:
+                self.quickened[expr] = GENERIC
+        return self.binary_handlers[expr.operator.type](expr.operator, left, right)
+
+    def binary_plus(self, operator: Token, left: Any, right: Any) -> Any:
+        if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+            return left + right
+        if isinstance(left, str) and isinstance(right, str):
+            return left + right
+        raise RuntimeError("Operands must be two numbers or two strings.")
+
+    def binary_minus(self, operator: Token, left: Any, right: Any) -> Any:
+        self.check_number_operands(operator, left, right)
+        return left - right
+
+    def binary_multiply(self, operator: Token, left: Any, right: Any) -> Any:
+        self.check_number_operands(operator, left, right)
+        return left * right
+
+    def binary_divide(self, operator: Token, left: Any, right: Any) -> Any:
+        self.check_number_operands(operator, left, right)
+        return left / right
+
+    def binary_equals(self, operator: Token, left: Any, right: Any) -> bool:
+        return self.is_equal(left, right)
+
+    def binary_not_equals(self, operator: Token, left: Any, right: Any) -> bool:
+        return not self.is_equal(left, right)
+
+    def binary_greater(self, operator: Token, left: Any, right: Any) -> bool:
+        self.check_number_operands(operator, left, right)
+        return left > right
+
+    def binary_greater_equal(self, operator: Token, left: Any, right: Any) -> bool:
+        self.check_number_operands(operator, left, right)
+        return left >= right
+
+    def binary_less(self, operator: Token, left: Any, right: Any) -> bool:
+        self.check_number_operands(operator, left, right)
+        return left < right
+
+    def binary_less_equal(self, operator: Token, left: Any, right: Any) -> bool:
+        self.check_number_operands(operator, left, right)
+        return left <= right
+
+    def visit_unary_expr(self, expr: Unary) -> Any:
+        right = self.evaluate(expr.right)
+        
+        if expr.operator.type == TokenType.MINUS:
+            self.check_number_operand(expr.operator, right)
+            return -right
+        elif expr.operator.type == TokenType.BANG:
+            return not self.is_truthy(right)
+
+    def visit_literal_expr(self, expr: Literal) -> Any:
+        return expr.value
+
+    def visit_grouping_expr(self, expr: Grouping) -> Any:
+        return self.evaluate(expr.expression)
+
+    def visit_variable_expr(self, expr: Variable) -> Any:
+        return self.look_up_variable(expr.name, expr)
+
+    def visit_call_expr(self, expr: Call) -> Any:
+        if type(expr.callee) is Get:
+            return self.invoke_method(expr, expr.callee)
+        
+        callee = self.evaluate(expr.callee)
+        
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append(self.evaluate(argument))
+        
+        if not isinstance(callee, MinLangCallable):
+            raise RuntimeError("Can only call functions and classes.")
+        
+        arity = callee.arity()
+        if arity >= 0 and len(arguments) != arity:
+            raise RuntimeError(f"Expected {arity} arguments but got {len(arguments)}.")
+        
+        return callee.call(self, arguments)
+
+    def invoke_method(self, expr: Call, get: Get) -> Any:
+        obj = self.evaluate(get.obj)
+        if not isinstance(obj, MinLangInstance):
+            raise RuntimeError("Only instances have properties.")
+        
+        name = get.name.lexeme
+        index = obj.shape.slots.get(name)
+        if index is not None:
+            callee = obj.values[index]
+            return self.call_value(callee, [self.evaluate(argument) for argument in expr.arguments])
+        
+        method = obj.klass.method_table.get(name)
+        if method is None:
+            raise RuntimeError(f"Undefined property '{name}'.")
+        
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append(self.evaluate(argument))
+        
+        if len(arguments) != method.arity():
+            raise RuntimeError(f"Expected {method.arity()} arguments but got {len(arguments)}.")
+        
+        return method.invoke(self, obj, arguments)
+
+    def call_value(self, callee: Any, arguments: List[Any]) -> Any:
+        if not isinstance(callee, MinLangCallable):
+            raise RuntimeError("Can only call functions and classes.")
+        
+        arity = callee.arity()
+        if arity >= 0 and len(arguments) != arity:
+            raise RuntimeError(f"Expected {arity} arguments but got {len(arguments)}.")
+        
+        return callee.call(self, arguments)
+
+    def visit_get_expr(self, expr: Get) -> Any:
+        obj = self.evaluate(expr.obj)
+        if isinstance(obj, MinLangInstance):
+            return obj.get(expr.name)
+        raise RuntimeError("Only instances have properties.")
+
+    def visit_set_expr(self, expr: Set) -> Any:
+        obj = self.evaluate(expr.obj)
+        if not isinstance(obj, MinLangInstance):
+            raise RuntimeError("Only instances have fields.")
+        value = self.evaluate(expr.value)
+        obj.set(expr.name, value)
+        return value
+
+    def visit_this_expr(self, expr: This) -> Any:
+        return self.look_up_variable(expr.keyword, expr)
+
+    def visit_super_expr(self, expr: Super) -> Any:
+        distance = self.locals.get(expr)
+        if distance is not None:
+            superclass = self.environment.get_at(distance, "super")
+            obj = self.environment.get_at(distance - 1, "this")
+        else:
+            superclass = self.environment.get_at(self.cells[expr], "super").value
+            distance, is_cell = self.receivers[expr]
+            obj = self.environment.get_at(distance, "this")
+            if is_cell:
+                obj = obj.value
+        method = superclass.find_method(expr.method.lexeme)
+        if method is None:
+            raise RuntimeError(f"Undefined property '{expr.method.lexeme}'.")
+        return method.bind(obj)
 
     def look_up_variable(self, name: Token, expr: Expr) -> Any:
         distance = self.locals.get(expr)
         if distance is not None:
             return self.environment.get_at(distance, name.lexeme)
-        else:
-            return self.globals.get(name)
+        distance = self.cells.get(expr)
+        if distance is not None:
+            return self.environment.get_at(distance, name.lexeme).value
+        return self.globals.get(name)
 
     def is_truthy(self, obj: Any) -> bool:
         if obj is None:
@@ -306,17 +793,7 @@ class Interpreter:
             return
         raise RuntimeError(f"Operands must be numbers.")
 
-    def stringify(self, obj: Any) -> str:
-        if obj is None:
-            return "nil"
-        if isinstance(obj, float):
-            text = str(obj)
-            if text.endswith(".0"):
-                text = text[:-2]
-            return text
-        return str(obj)
-
-class ClockFunction:
+class ClockFunction(MinLangCallable):
     def __init__(self):
         pass
 
@@ -330,12 +807,12 @@ class ClockFunction:
     def __str__(self):
         return "<native fn>"
 
-class PrintFunction:
+class PrintFunction(MinLangCallable):
     def __init__(self):
         pass
 
     def call(self, interpreter: Interpreter, arguments: List[Any]) -> None:
-        print(*arguments)
+        interpreter.output.write_line(" ".join(map(str, arguments)))
 
     def arity(self) -> int:
         return -1  # Variable number of arguments
@@ -1,5 +1,6 @@
+import re
 from enum import Enum, auto
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, TextIO, Union
 
 class TokenType(Enum):
     # Keywords
@@ -10,6 +11,11 @@ class TokenType(Enum):
     WHILE = auto()
     RETURN = auto()
     PRINT = auto()
+    VAR = auto()
+    AND = auto()
+    OR = auto()
+    THIS = auto()
+    SUPER = auto()
     
     # Literals
     IDENTIFIER = auto()
@@ -46,18 +52,70 @@ class TokenType(Enum):
     EOF = auto()
 
 class Token:
+    __slots__ = ("type", "lexeme", "literal", "line")
+
     def __init__(self, type: TokenType, lexeme: str, literal: Optional[object], line: int):
         self.type = type
         self.lexeme = lexeme
         self.literal = literal
         self.line = line
     
+    def __reduce__(self):
+        return (Token, (self.type, self.lexeme, self.literal, self.line))
+    
     def __str__(self):
         return f"{self.type} {self.lexeme} {self.literal}"
 
+class LexError(RuntimeError):
+    pass
+
+PUNCTUATION = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "*": TokenType.MULTIPLY,
+    "/": TokenType.DIVIDE,
+    "!": TokenType.BANG,
+    "!=": TokenType.NOT_EQUALS,
+    "=": TokenType.ASSIGN,
+    "==": TokenType.EQUALS,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+}
+
+# Group numbers of TOKEN_PATTERN, checked through match.lastindex.
+WORD, COMMENT, SYMBOL, NUMBER, NEWLINES, STRING, OTHER = range(1, 8)
+
+# Only ASCII identifiers and numbers and terminated strings are matched
+# here. Anything else falls through to OTHER and is handed back to
+# scan_token, so errors and Unicode handling stay exactly the same.
+TOKEN_PATTERN = re.compile(r'''
+    [ \t\r]*
+    (?:
+        ([A-Za-z][A-Za-z0-9]*)
+      | (//[^\n]*)
+      | ([!=<>]=|[(){},.\-+;*/!=<>])
+      | ([0-9]+(?:\.[0-9]+)?)
+      | (\n+)
+      | ("[^"]*")
+      | (.)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
 class Lexer:
-    def __init__(self, source: str):
+    def __init__(self, source: Union[str, TextIO, Iterable[str]], mode: str = "regex"):
         self.source = source
+        self.mode = mode
         self.tokens: List[Token] = []
         self.start = 0
         self.current = 0
@@ -71,11 +129,24 @@ class Lexer:
             "while": TokenType.WHILE,
             "return": TokenType.RETURN,
             "print": TokenType.PRINT,
+            "var": TokenType.VAR,
+            "and": TokenType.AND,
+            "or": TokenType.OR,
+            "this": TokenType.THIS,
+            "super": TokenType.SUPER,
             "true": TokenType.TRUE,
             "false": TokenType.FALSE,
+            "nil": TokenType.NIL,
         }
     
     def scan_tokens(self) -> List[Token]:
+        if not isinstance(self.source, str):
+            self.tokens = list(self.iter_tokens())
+            return self.tokens
+        
+        if self.mode == "regex":
+            self.scan_tokens_regex()
+        
         while not self.is_at_end():
             self.start = self.current
             self.scan_token()
@@ -83,6 +154,95 @@ class Lexer:
         self.tokens.append(Token(TokenType.EOF, "", None, self.line))
         return self.tokens
     
+    def iter_tokens(self, chunk_size: int = 1 << 16) -> Iterator[Token]:
+        source = self.source
+        if isinstance(source, str):
+            chunks: Iterator[str] = iter([source])
+        elif hasattr(source, "read"):
+            chunks = iter(lambda: source.read(chunk_size), "")
+        else:
+            chunks = iter(source)
+        
+        self.source = ""
+        self.current = 0
+        pending: List[str] = []
+        pending_size = 0
+        newline = False
+        final = False
+        while not final:
+            chunk = next(chunks, "")
+            if chunk:
+                pending.append(chunk)
+                pending_size += len(chunk)
+                newline = newline or "\n" in chunk
+                # Wait for a line break, and for at least as much new text
+                # as the last window left unscanned: a long line or string
+                # is then copied and rescanned a logarithmic number of
+                # times rather than once per chunk.
+                if not newline or pending_size < len(self.source) - self.current:
+                    continue
+            else:
+                final = True
+            self.source = self.source[self.current:] + "".join(pending)
+            self.current = 0
+            pending = []
+            pending_size = 0
+            newline = False
+            limit = len(self.source) if final else self.source.rfind("\n") + 1
+            yield from self.scan_window(limit, final)
+        
+        yield Token(TokenType.EOF, "", None, self.line)
+    
+    def scan_tokens_regex(self):
+        self.tokens += list(self.scan_window(len(self.source), True))
+    
+    def scan_window(self, limit: int, final: bool) -> Iterator[Token]:
+        source = self.source
+        keywords = self.keywords
+        check_unicode = NON_ASCII.search(source) is not None
+        line = self.line
+        
+        while True:
+            for match in TOKEN_PATTERN.finditer(source, self.current, limit):
+                kind = match.lastindex
+                if kind == WORD:
+                    if check_unicode and NON_ASCII.search(source, match.end(), match.end() + 2):
+                        break
+                    text = match.group(kind)
+                    yield Token(keywords.get(text, TokenType.IDENTIFIER), text, None, line)
+                elif kind == SYMBOL:
+                    text = match.group(kind)
+                    yield Token(PUNCTUATION[text], text, None, line)
+                elif kind == NUMBER:
+                    if check_unicode and NON_ASCII.search(source, match.end(), match.end() + 2):
+                        break
+                    text = match.group(kind)
+                    yield Token(TokenType.NUMBER, text, float(text) if "." in text else int(text), line)
+                elif kind == NEWLINES:
+                    line += match.end() - match.start(kind)
+                elif kind == COMMENT:
+                    continue
+                elif kind == STRING:
+                    text = match.group(kind)
+                    line += text.count("\n")
+                    yield Token(TokenType.STRING, text, text[1:-1], line)
+                else:
+                    break
+            else:
+                self.current = max(self.current, limit)
+                self.line = line
+                return
+            
+            self.line = line
+            self.start = self.current = match.start(kind)
+            if not final and source[self.current] == '"':
+                return
+            mark = len(self.tokens)
+            self.scan_token()
+            yield from self.tokens[mark:]
+            del self.tokens[mark:]
+            line = self.line
+    
     def scan_token(self):
         c = self.advance()
         
@@ -135,7 +295,7 @@ class Lexer:
             elif c.isalpha():
                 self.identifier()
             else:
-                raise RuntimeError(f"Unexpected character: {c} at line {self.line}")
+                raise LexError(f"Unexpected character: {c} at line {self.line}")
     
     def identifier(self):
         while self.peek().isalnum():
@@ -153,8 +313,10 @@ class Lexer:
             self.advance()
             while self.peek().isdigit():
                 self.advance()
+            self.add_token(TokenType.NUMBER, float(self.source[self.start:self.current]))
+            return
         
-        self.add_token(TokenType.NUMBER, float(self.source[self.start:self.current]))
+        self.add_token(TokenType.NUMBER, int(self.source[self.start:self.current]))
     
     def string(self):
         while self.peek() != '"' and not self.is_at_end():
@@ -163,7 +325,7 @@ class Lexer:
             self.advance()
         
         if self.is_at_end():
-            raise RuntimeError("Unterminated string.")
+            raise LexError("Unterminated string.")
         
         self.advance()
         value = self.source[self.start + 1:self.current - 1]
@@ -0,0 +1,109 @@
+from typing import Any, List, Optional
+from minlang.lexer import TokenType
+from minlang.parser import *
+from minlang.interpreter import Interpreter
+
+# Folds constant expressions and prunes dead branches. Runs after the
+# resolver and rewrites the tree in place; Variable, Assign, This and Super
+# nodes are never replaced, so the resolver's side table stays valid.
+# Folding evaluates with the tree walker's own operator handlers and leaves
+# an expression alone when that fails, so type errors (and any other
+# failure) still happen at runtime, at the same point as before.
+class Optimizer:
+    def __init__(self):
+        self.evaluator = Interpreter()
+
+    def optimize(self, statements: List[Stmt]) -> List[Stmt]:
+        result = []
+        for statement in statements:
+            statement = self.optimize_stmt(statement)
+            if statement is not None:
+                result.append(statement)
+        return result
+
+    def optimize_stmt(self, stmt: Optional[Stmt]) -> Optional[Stmt]:
+        # Returns None for statements that can be dropped.
+        if isinstance(stmt, Expression):
+            stmt.expression = self.optimize_expr(stmt.expression)
+            if isinstance(stmt.expression, Literal):
+                return None
+        elif isinstance(stmt, Print):
+            stmt.expression = self.optimize_expr(stmt.expression)
+        elif isinstance(stmt, Var):
+            if stmt.initializer is not None:
+                stmt.initializer = self.optimize_expr(stmt.initializer)
+        elif isinstance(stmt, Block):
+            stmt.statements = self.optimize(stmt.statements)
+        elif isinstance(stmt, If):
+            stmt.condition = self.optimize_expr(stmt.condition)
+            if isinstance(stmt.condition, Literal):
+                if self.evaluator.is_truthy(stmt.condition.value):
+                    return self.optimize_stmt(stmt.then_branch)
+                return self.optimize_stmt(stmt.else_branch)
+            stmt.then_branch = self.optimize_body(stmt.then_branch)
+            if stmt.else_branch is not None:
+                stmt.else_branch = self.optimize_stmt(stmt.else_branch)
+        elif isinstance(stmt, While):
+            stmt.condition = self.optimize_expr(stmt.condition)
+            if isinstance(stmt.condition, Literal) and not self.evaluator.is_truthy(stmt.condition.value):
+                return None
+            stmt.body = self.optimize_body(stmt.body)
+        elif isinstance(stmt, Function):
+            stmt.body = self.optimize(stmt.body)
+        elif isinstance(stmt, Return):
+            if stmt.value is not None:
+                stmt.value = self.optimize_expr(stmt.value)
+        elif isinstance(stmt, Class):
+            for method in stmt.methods:
+                method.body = self.optimize(method.body)
+        return stmt
+
+    def optimize_body(self, stmt: Stmt) -> Stmt:
+        # Branches and loop bodies need a statement even when theirs is dropped.
+        optimized = self.optimize_stmt(stmt)
+        if optimized is None:
+            return Block([])
+        return optimized
+
+    def optimize_expr(self, expr: Expr) -> Expr:
+        if isinstance(expr, Grouping):
+            return self.optimize_expr(expr.expression)
+        elif isinstance(expr, Binary):
+            expr.left = self.optimize_expr(expr.left)
+            expr.right = self.optimize_expr(expr.right)
+            if isinstance(expr.left, Literal) and isinstance(expr.right, Literal):
+                return self.fold(expr)
+        elif isinstance(expr, Unary):
+            expr.right = self.optimize_expr(expr.right)
+            if isinstance(expr.right, Literal):
+                return self.fold(expr)
+        elif isinstance(expr, Logical):
+            expr.left = self.optimize_expr(expr.left)
+            expr.right = self.optimize_expr(expr.right)
+            if isinstance(expr.left, Literal):
+                # `and`/`or` yield the left operand itself when it decides
+                # the result, and the right operand otherwise.
+                truthy = self.evaluator.is_truthy(expr.left.value)
+                if truthy == (expr.operator.type == TokenType.OR):
+                    return expr.left
+                return expr.right
+        elif isinstance(expr, Assign):
+            expr.value = self.optimize_expr(expr.value)
+        elif isinstance(expr, Call):
+            expr.callee = self.optimize_expr(expr.callee)
+            expr.arguments = [self.optimize_expr(argument) for argument in expr.arguments]
+        elif isinstance(expr, Get):
+            expr.obj = self.optimize_expr(expr.obj)
+        elif isinstance(expr, Set):
+            expr.obj = self.optimize_expr(expr.obj)
+            expr.value = self.optimize_expr(expr.value)
+        return expr
+
+    def fold(self, expr: Expr) -> Expr:
+        try:
+            value: Any = self.evaluator.evaluate(expr)
+        except Exception:
+            return expr
+        finally:
+            self.evaluator.quickened.pop(expr, None)
+        return Literal(value)
@@ -0,0 +1,70 @@
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional, TextIO
+
+# Where `print` output goes. Every engine hands finished lines to an Output
+# instead of calling Python's print once per line: StreamOutput collects
+# them and writes them out in large chunks, MemoryOutput keeps them for a
+# program embedding MinLang. Engines flush their output when a run ends,
+# normally or with an error.
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+class Output(ABC):
+    @abstractmethod
+    def write_line(self, text: str):
+        ...
+
+    def flush(self):
+        pass
+
+class StreamOutput(Output):
+    # Without a stream, lines go to whatever sys.stdout is when they are
+    # flushed, so redirect_stdout still captures them. A line-buffered
+    # stream writes and flushes every line, for interactive use.
+    def __init__(self, stream: Optional[TextIO] = None, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 line_buffered: bool = False):
+        self.stream = stream
+        self.buffer_size = 0 if line_buffered else buffer_size
+        self.lines: List[str] = []
+        self.size = 0
+
+    def write_line(self, text: str):
+        self.lines.append(text)
+        self.size += len(text) + 1
+        if self.size > self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        stream = sys.stdout if self.stream is None else self.stream
+        if self.lines:
+            self.lines.append("")
+            stream.write("\n".join(self.lines))
+            self.lines = []
+            self.size = 0
+        stream.flush()
+
+class MemoryOutput(Output):
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def write_line(self, text: str):
+        self.lines.append(text)
+
+    def getvalue(self) -> str:
+        return "".join(line + "\n" for line in self.lines)
+
+def stringify(obj: Any, is_integer=float.is_integer) -> str:
+    # Whole floats print without ".0". Below 1e16 they can be formatted as
+    # integers directly; larger ones, -0.0, inf and nan go through repr.
+    kind = type(obj)
+    if kind is float:
+        if is_integer(obj) and -1e16 < obj < 1e16 and obj:
+            return "%d" % obj
+        text = repr(obj)
+        return text[:-2] if text[-2:] == ".0" else text
+    if kind is str:
+        return obj
+    if obj is None:
+        return "nil"
+    return str(obj)
@@ -1,106 +1,275 @@
-from typing import List, Optional, Union
-from minlang.lexer import Token, TokenType
+from typing import Any, Iterable, Iterator, List, Optional, Tuple, Union
+from minlang.lexer import LexError, Token, TokenType
 
 class Expr:
-    pass
+    __slots__ = ()
+
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, name) for name in self.__slots__))
+
+class Assign(Expr):
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: Token, value: Expr):
+        self.name = name
+        self.value = value
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right")
+
+    def __init__(self, left: Expr, operator: Token, right: Expr):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+class Logical(Expr):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
         self.operator = operator
         self.right = right
 
 class Unary(Expr):
+    __slots__ = ("operator", "right")
+
     def __init__(self, operator: Token, right: Expr):
         self.operator = operator
         self.right = right
 
 class Literal(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value: object):
         self.value = value
 
 class Grouping(Expr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr):
         self.expression = expression
 
 class Variable(Expr):
+    __slots__ = ("name",)
+
     def __init__(self, name: Token):
         self.name = name
 
 class Call(Expr):
+    __slots__ = ("callee", "paren", "arguments")
+
     def __init__(self, callee: Expr, paren: Token, arguments: List[Expr]):
         self.callee = callee
         self.paren = paren
         self.arguments = arguments
 
 class Get(Expr):
+    __slots__ = ("obj", "name")
+
     def __init__(self, obj: Expr, name: Token):
         self.obj = obj
         self.name = name
 
 class Set(Expr):
+    __slots__ = ("obj", "name", "value")
+
     def __init__(self, obj: Expr, name: Token, value: Expr):
         self.obj = obj
         self.name = name
         self.value = value
 
+class This(Expr):
+    __slots__ = ("keyword",)
+
+    def __init__(self, keyword: Token):
+        self.keyword = keyword
+
+class Super(Expr):
+    __slots__ = ("keyword", "method")
+
+    def __init__(self, keyword: Token, method: Token):
+        self.keyword = keyword
+        self.method = method
+
 class Stmt:
-    pass
+    __slots__ = ()
+
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, name) for name in self.__slots__))
 
 class Expression(Stmt):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr):
         self.expression = expression
 
 class Print(Stmt):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr):
         self.expression = expression
 
 class Var(Stmt):
+    __slots__ = ("name", "initializer")
+
     def __init__(self, name: Token, initializer: Optional[Expr]):
         self.name = name
         self.initializer = initializer
 
 class Block(Stmt):
+    __slots__ = ("statements",)
+
     def __init__(self, statements: List[Stmt]):
         self.statements = statements
 
 class If(Stmt):
+    __slots__ = ("condition", "then_branch", "else_branch")
+
     def __init__(self, condition: Expr, then_branch: Stmt, else_branch: Optional[Stmt]):
         self.condition = condition
         self.then_branch = then_branch
         self.else_branch = else_branch
 
 class While(Stmt):
+    __slots__ = ("condition", "body")
+
     def __init__(self, condition: Expr, body: Stmt):
         self.condition = condition
         self.body = body
 
 class Function(Stmt):
+    __slots__ = ("name", "params", "body")
+
     def __init__(self, name: Token, params: List[Token], body: List[Stmt]):
         self.name = name
         self.params = params
         self.body = body
 
 class Return(Stmt):
+    __slots__ = ("keyword", "value")
+
     def __init__(self, keyword: Token, value: Optional[Expr]):
         self.keyword = keyword
         self.value = value
 
 class Class(Stmt):
-    def __init__(self, name: Token, methods: List[Function]):
+    __slots__ = ("name", "superclass", "methods")
+
+    def __init__(self, name: Token, superclass: Optional[Variable], methods: List[Function]):
         self.name = name
+        self.superclass = superclass
         self.methods = methods
 
+def line_of(node: Any) -> Optional[int]:
+    # The line of the first token in a statement or expression, if any.
+    if isinstance(node, (Expression, Print)):
+        return line_of(node.expression)
+    if isinstance(node, (Var, Function, Class)):
+        return node.name.line
+    if isinstance(node, Block):
+        return next((line for line in map(line_of, node.statements) if line is not None), None)
+    if isinstance(node, (If, While)):
+        return line_of(node.condition)
+    if isinstance(node, Return):
+        return node.keyword.line
+    if isinstance(node, (Binary, Logical)):
+        return line_of(node.left) or node.operator.line
+    if isinstance(node, Unary):
+        return node.operator.line
+    if isinstance(node, Grouping):
+        return line_of(node.expression)
+    if isinstance(node, (Variable, Assign)):
+        return node.name.line
+    if isinstance(node, Call):
+        return line_of(node.callee) or node.paren.line
+    if isinstance(node, (Get, Set)):
+        return line_of(node.obj) or node.name.line
+    if isinstance(node, (This, Super)):
+        return node.keyword.line
+    return None
+
+def walk(node: Any) -> Iterator[Tuple[Any, Optional[Function]]]:
+    # Every statement and expression in `node`, itself included, with the
+    # innermost Function whose body or parameters contain it. A Function
+    # node itself belongs to the function declaring it.
+    stack = [(node, None)]
+    while stack:
+        node, function = stack.pop()
+        yield node, function
+        if isinstance(node, Function):
+            function = node
+        for name in node.__slots__:
+            value = getattr(node, name)
+            for child in value if isinstance(value, list) else (value,):
+                if isinstance(child, (Expr, Stmt)):
+                    stack.append((child, function))
+
+# Binding powers for the Pratt expression parser, lowest first. Infix and
+# postfix operators bind with their level's power; prefix operators parse
+# their operand at UNARY.
+ASSIGNMENT, OR, AND, EQUALITY, COMPARISON, TERM, FACTOR, UNARY, CALL = range(1, 10)
+
+BINDING_POWERS = {
+    TokenType.ASSIGN: ASSIGNMENT,
+    TokenType.OR: OR,
+    TokenType.AND: AND,
+    TokenType.EQUALS: EQUALITY,
+    TokenType.NOT_EQUALS: EQUALITY,
+    TokenType.GREATER: COMPARISON,
+    TokenType.GREATER_EQUAL: COMPARISON,
+    TokenType.LESS: COMPARISON,
+    TokenType.LESS_EQUAL: COMPARISON,
+    TokenType.MINUS: TERM,
+    TokenType.PLUS: TERM,
+    TokenType.DIVIDE: FACTOR,
+    TokenType.MULTIPLY: FACTOR,
+    TokenType.LEFT_PAREN: CALL,
+    TokenType.DOT: CALL,
+}
+
 class Parser:
-    def __init__(self, tokens: List[Token]):
-        self.tokens = tokens
-        self.current = 0
+    def __init__(self, tokens: Iterable[Token]):
+        self.tokens = iter(tokens)
+        self.current_token = next(self.tokens)
+        self.previous_token: Optional[Token] = None
+
+        self.prefix_parsers = {
+            TokenType.NUMBER: self.literal,
+            TokenType.STRING: self.literal,
+            TokenType.FALSE: self.false_literal,
+            TokenType.TRUE: self.true_literal,
+            TokenType.NIL: self.nil_literal,
+            TokenType.IDENTIFIER: self.variable,
+            TokenType.THIS: self.this_expr,
+            TokenType.SUPER: self.super_expr,
+            TokenType.LEFT_PAREN: self.grouping,
+            TokenType.BANG: self.unary,
+            TokenType.MINUS: self.unary,
+        }
+        self.infix_parsers = {
+            TokenType.ASSIGN: self.assignment,
+            TokenType.OR: self.logical,
+            TokenType.AND: self.logical,
+            TokenType.EQUALS: self.binary,
+            TokenType.NOT_EQUALS: self.binary,
+            TokenType.GREATER: self.binary,
+            TokenType.GREATER_EQUAL: self.binary,
+            TokenType.LESS: self.binary,
+            TokenType.LESS_EQUAL: self.binary,
+            TokenType.MINUS: self.binary,
+            TokenType.PLUS: self.binary,
+            TokenType.DIVIDE: self.binary,
+            TokenType.MULTIPLY: self.binary,
+            TokenType.LEFT_PAREN: self.call,
+            TokenType.DOT: self.get,
+        }
 
     def parse(self) -> List[Stmt]:
-        statements = []
+        return list(self.iter_declarations())
+
+    def iter_declarations(self) -> Iterator[Stmt]:
         while not self.is_at_end():
-            statements.append(self.declaration())
-        return statements
+            yield self.declaration()
 
     def declaration(self) -> Stmt:
         try:
@@ -111,12 +280,20 @@ class Parser:
             if self.match(TokenType.VAR):
                 return self.var_declaration()
             return self.statement()
+        except LexError:
+            raise
         except RuntimeError as error:
             self.synchronize()
             return None
 
     def class_declaration(self) -> Stmt:
         name = self.consume(TokenType.IDENTIFIER, "Expect class name.")
+        
+        superclass = None
+        if self.match(TokenType.LESS):
+            self.consume(TokenType.IDENTIFIER, "Expect superclass name.")
+            superclass = Variable(self.previous())
+        
         self.consume(TokenType.LEFT_BRACE, "Expect '{' before class body.")
         
         methods = []
@@ -124,7 +301,7 @@ class Parser:
             methods.append(self.function("method"))
         
         self.consume(TokenType.RIGHT_BRACE, "Expect '}' after class body.")
-        return Class(name, methods)
+        return Class(name, superclass, methods)
 
     def function(self, kind: str) -> Function:
         name = self.consume(TokenType.IDENTIFIER, f"Expect {kind} name.")
@@ -215,108 +392,77 @@ class Parser:
         return Expression(expr)
 
     def expression(self) -> Expr:
-        return self.assignment()
-
-    def assignment(self) -> Expr:
-        expr = self.or_expr()
+        return self.parse_precedence(ASSIGNMENT)
+
+    def parse_precedence(self, min_power: int) -> Expr:
+        # Pratt loop: parse one prefix form, then keep folding in infix and
+        # postfix operators for as long as they bind at least as tightly as
+        # min_power.
+        token = self.peek()
+        prefix = self.prefix_parsers.get(token.type)
+        if prefix is None:
+            raise self.error(token, "Expect expression.")
+        self.advance()
+        expr = prefix(token)
         
-        if self.match(TokenType.ASSIGN):
-            equals = self.previous()
-            value = self.assignment()
-            
-            if isinstance(expr, Variable):
-                name = expr.name
-                return Set(name, equals, value)
-            elif isinstance(expr, Get):
-                return Set(expr.obj, expr.name, value)
-            
-            self.error(equals, "Invalid assignment target.")
+        while BINDING_POWERS.get(self.current_token.type, 0) >= min_power:
+            operator = self.advance()
+            expr = self.infix_parsers[operator.type](expr, operator)
         
         return expr
 
-    def or_expr(self) -> Expr:
-        expr = self.and_expr()
-        
-        while self.match(TokenType.OR):
-            operator = self.previous()
-            right = self.and_expr()
-            expr = Binary(expr, operator, right)
-        
-        return expr
+    def literal(self, token: Token) -> Expr:
+        return Literal(token.literal)
 
-    def and_expr(self) -> Expr:
-        expr = self.equality()
-        
-        while self.match(TokenType.AND):
-            operator = self.previous()
-            right = self.equality()
-            expr = Binary(expr, operator, right)
-        
-        return expr
+    def false_literal(self, token: Token) -> Expr:
+        return Literal(False)
 
-    def equality(self) -> Expr:
-        expr = self.comparison()
-        
-        while self.match(TokenType.EQUALS, TokenType.NOT_EQUALS):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Binary(expr, operator, right)
-        
-        return expr
+    def true_literal(self, token: Token) -> Expr:
+        return Literal(True)
 
-    def comparison(self) -> Expr:
-        expr = self.term()
-        
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous()
-            right = self.term()
-            expr = Binary(expr, operator, right)
-        
-        return expr
+    def nil_literal(self, token: Token) -> Expr:
+        return Literal(None)
 
-    def term(self) -> Expr:
-        expr = self.factor()
-        
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.previous()
-            right = self.factor()
-            expr = Binary(expr, operator, right)
-        
-        return expr
+    def variable(self, token: Token) -> Expr:
+        return Variable(token)
 
-    def factor(self) -> Expr:
-        expr = self.unary()
-        
-        while self.match(TokenType.SLASH, TokenType.STAR):
-            operator = self.previous()
-            right = self.unary()
-            expr = Binary(expr, operator, right)
-        
-        return expr
+    def this_expr(self, token: Token) -> Expr:
+        return This(token)
 
-    def unary(self) -> Expr:
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
-        
-        return self.call()
+    def super_expr(self, token: Token) -> Expr:
+        self.consume(TokenType.DOT, "Expect '.' after 'super'.")
+        method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+        return Super(token, method)
 
-    def call(self) -> Expr:
-        expr = self.primary()
+    def grouping(self, token: Token) -> Expr:
+        expr = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return Grouping(expr)
+
+    def unary(self, operator: Token) -> Expr:
+        return Unary(operator, self.parse_precedence(UNARY))
+
+    def binary(self, left: Expr, operator: Token) -> Expr:
+        right = self.parse_precedence(BINDING_POWERS[operator.type] + 1)
+        return Binary(left, operator, right)
+
+    def logical(self, left: Expr, operator: Token) -> Expr:
+        right = self.parse_precedence(BINDING_POWERS[operator.type] + 1)
+        return Logical(left, operator, right)
+
+    def assignment(self, target: Expr, equals: Token) -> Expr:
+        # Right-associative: the value may itself be an assignment.
+        value = self.parse_precedence(ASSIGNMENT)
         
-        while True:
-            if self.match(TokenType.LEFT_PAREN):
-                expr = self.finish_call(expr)
-            elif self.match(TokenType.DOT):
-                name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
-                expr = Get(expr, name)
-            else:
-                break
+        if isinstance(target, Variable):
+            return Assign(target.name, value)
+        elif isinstance(target, Get):
+            return Set(target.obj, target.name, value)
         
-        return expr
+        self.error(equals, "Invalid assignment target.")
+        return target
 
-    def finish_call(self, callee: Expr) -> Expr:
+    def call(self, callee: Expr, left_paren: Token) -> Expr:
         arguments = []
         if not self.check(TokenType.RIGHT_PAREN):
             while True:
@@ -329,26 +475,9 @@ class Parser:
         paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
         return Call(callee, paren, arguments)
 
-    def primary(self) -> Expr:
-        if self.match(TokenType.FALSE):
-            return Literal(False)
-        if self.match(TokenType.TRUE):
-            return Literal(True)
-        if self.match(TokenType.NIL):
-            return Literal(None)
-        
-        if self.match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.previous().literal)
-        
-        if self.match(TokenType.IDENTIFIER):
-            return Variable(self.previous())
-        
-        if self.match(TokenType.LEFT_PAREN):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
-        
-        raise self.error(self.peek(), "Expect expression.")
+    def get(self, obj: Expr, dot: Token) -> Expr:
+        name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+        return Get(obj, name)
 
     def match(self, *types: TokenType) -> bool:
         for type in types:
@@ -364,17 +493,18 @@ class Parser:
 
     def advance(self) -> Token:
         if not self.is_at_end():
-            self.current += 1
+            self.previous_token = self.current_token
+            self.current_token = next(self.tokens)
         return self.previous()
 
     def is_at_end(self) -> bool:
         return self.peek().type == TokenType.EOF
 
     def peek(self) -> Token:
-        return self.tokens[self.current]
+        return self.current_token
 
     def previous(self) -> Token:
-        return self.tokens[self.current - 1]
+        return self.previous_token
 
     def consume(self, type: TokenType, message: str) -> Token:
         if self.check(type):
@@ -0,0 +1,149 @@
+import io
+import math
+import os
+import signal
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import redirect_stderr
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from minlang.output import MemoryOutput
+from minlang.program import Program, ProgramCache
+
+# Runs independent scripts in parallel on a pool of worker processes. Each
+# worker imports MinLang once and keeps a ProgramCache, so a script the
+# worker has seen before is neither parsed nor compiled again. Every job
+# still gets a fresh interpreter, with only the native functions defined,
+# so jobs never see each other's globals.
+#
+# Jobs travel to the workers as plain tuples, sources rather than
+# Programs, so that the worker's cache can serve them. Their output is
+# captured and sent back in a JobResult.
+
+OK = "ok"
+COMPILE_ERROR = "compile error"
+RUNTIME_ERROR = "runtime error"
+TIMEOUT = "timeout"
+
+# (name, source, engine, optimize, globals, timeout)
+Job = Tuple[str, str, str, bool, Optional[Dict[str, Any]], Optional[float]]
+
+class JobResult:
+    # `output` is what the script printed, runtime and compile error
+    # messages included, and `stderr` what the engine wrote to stderr.
+    # `error` is the error message for anything but OK.
+    __slots__ = ("name", "status", "output", "stderr", "error", "elapsed")
+
+    def __init__(self, name: str, status: str, output: str, stderr: str,
+                 error: Optional[str], elapsed: float):
+        self.name = name
+        self.status = status
+        self.output = output
+        self.stderr = stderr
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+    def __repr__(self):
+        return f"<JobResult {self.name} {self.status} {self.elapsed:.3f}s>"
+
+class JobTimeout(Exception):
+    # Not a RuntimeError, so the engines don't report it as a MinLang error.
+    pass
+
+cache: Optional[ProgramCache] = None
+
+def start_worker(cache_size: int):
+    global cache
+    cache = ProgramCache(cache_size)
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, interrupt)
+
+def interrupt(signum, frame):
+    raise JobTimeout()
+
+def run_job(job: Job) -> JobResult:
+    # Timeouts use SIGALRM, which interrupts the job wherever it is; on
+    # platforms without setitimer they are not enforced.
+    name, source, engine, optimize, globals, timeout = job
+    output = MemoryOutput()
+    stderr = io.StringIO()
+    timed = timeout is not None and hasattr(signal, "setitimer")
+    start = time.perf_counter()
+    try:
+        if timed:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            with redirect_stderr(stderr):
+                try:
+                    program = cache.compile(source, engine, optimize)
+                except RuntimeError as error:
+                    output.write_line(str(error))
+                    status, message = COMPILE_ERROR, str(error)
+                else:
+                    interpreter = program.run(globals, output=output)
+                    if interpreter.had_runtime_error:
+                        status, message = RUNTIME_ERROR, output.lines[-1]
+                    else:
+                        status, message = OK, None
+        finally:
+            if timed:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except JobTimeout:
+        status, message = TIMEOUT, f"timed out after {timeout:g} s"
+    return JobResult(name, status, output.getvalue(), stderr.getvalue(), message,
+                     time.perf_counter() - start)
+
+def run_batch(jobs: List[Job]) -> List[JobResult]:
+    return [run_job(job) for job in jobs]
+
+class ScriptPool:
+    # `jobs` worker processes (default: one per CPU). `engine`, `optimize`
+    # and `timeout` (seconds per job) apply to sources; a Program runs on
+    # the engine it was compiled for.
+    def __init__(self, jobs: Optional[int] = None, engine: str = "tree", optimize: bool = True,
+                 timeout: Optional[float] = None, cache_size: int = 128):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.engine = engine
+        self.optimize = optimize
+        self.timeout = timeout
+        self.executor = ProcessPoolExecutor(self.jobs, initializer=start_worker,
+                                            initargs=(cache_size,))
+
+    def job(self, script: Union[str, Program], name: Optional[str], globals: Optional[Dict[str, Any]],
+            timeout: Optional[float]) -> Job:
+        if timeout is None:
+            timeout = self.timeout
+        if isinstance(script, Program):
+            return (name or "<program>", script.source, script.engine, script.optimize, globals, timeout)
+        return (name or "<script>", script, self.engine, self.optimize, globals, timeout)
+
+    def submit(self, script: Union[str, Program], name: Optional[str] = None,
+               globals: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> 'Future[JobResult]':
+        return self.executor.submit(run_job, self.job(script, name, globals, timeout))
+
+    def map(self, scripts: Iterable[Union[str, Program]], names: Optional[Sequence[str]] = None,
+            batch_size: Optional[int] = None) -> List[JobResult]:
+        # Runs every script and returns their results in order. Scripts are
+        # sent to the workers in batches, a few per worker by default, so
+        # that many short scripts don't pay for a round trip each.
+        scripts = list(scripts)
+        if names is None:
+            names = [f"<script {index}>" for index in range(len(scripts))]
+        jobs = [self.job(script, name, None, None) for script, name in zip(scripts, names)]
+        if batch_size is None:
+            batch_size = max(1, math.ceil(len(jobs) / (self.jobs * 4)))
+        futures = [self.executor.submit(run_batch, jobs[start:start + batch_size])
+                   for start in range(0, len(jobs), batch_size)]
+        return [result for future in futures for result in future.result()]
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self) -> 'ScriptPool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,167 @@
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO
+from minlang.parser import *
+from minlang.interpreter import Interpreter, MinLangFunction
+from minlang.output import Output
+
+# `--profile`: a tree walker whose statement handlers and function objects
+# are instrumented. The plain Interpreter is left untouched, so running
+# without the profiler costs nothing.
+
+class FunctionStats:
+    __slots__ = ("calls", "inclusive", "exclusive")
+
+    def __init__(self):
+        self.calls = 0
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+
+class StackNode:
+    # One node of the call tree: the time spent in the function itself on
+    # this particular path from the script, for the collapsed-stack output.
+    __slots__ = ("children", "exclusive")
+
+    def __init__(self):
+        self.children: Dict[str, 'StackNode'] = {}
+        self.exclusive = 0.0
+
+class Frame:
+    __slots__ = ("function", "start", "callees", "node")
+
+    def __init__(self, function: Optional[Function], start: float, node: StackNode):
+        self.function = function
+        self.start = start
+        self.callees = 0.0
+        self.node = node
+
+SCRIPT = "<script>"
+
+class Profiler:
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.functions: Dict[Function, FunctionStats] = {}
+        self.lines: Dict[int, int] = {}
+        self.labels: Dict[Function, str] = {}
+        self.root = StackNode()
+        self.frames: List[Frame] = []
+        # How many calls of each function are running, so that recursive
+        # calls add their inclusive time only once.
+        self.active: Dict[Function, int] = {}
+        self.elapsed = 0.0
+
+    def label(self, function: Function) -> str:
+        label = self.labels.get(function)
+        if label is None:
+            label = f"{function.name.lexeme}:{function.name.line}"
+        return label
+
+    def start(self):
+        self.frames.append(Frame(None, self.clock(), self.root))
+
+    def stop(self):
+        while len(self.frames) > 1:
+            self.leave()
+        frame = self.frames.pop()
+        elapsed = self.clock() - frame.start
+        self.elapsed += elapsed
+        self.root.exclusive += elapsed - frame.callees
+
+    def enter(self, function: Function):
+        children = self.frames[-1].node.children
+        label = self.label(function)
+        node = children.get(label)
+        if node is None:
+            node = children[label] = StackNode()
+        self.frames.append(Frame(function, self.clock(), node))
+        self.active[function] = self.active.get(function, 0) + 1
+
+    def leave(self):
+        frame = self.frames.pop()
+        elapsed = self.clock() - frame.start
+        function = frame.function
+        stats = self.functions.get(function)
+        if stats is None:
+            stats = self.functions[function] = FunctionStats()
+        stats.calls += 1
+        stats.exclusive += elapsed - frame.callees
+        frame.node.exclusive += elapsed - frame.callees
+        self.active[function] -= 1
+        if self.active[function] == 0:
+            stats.inclusive += elapsed
+        self.frames[-1].callees += elapsed
+
+    def report(self, out: TextIO, lines: int = 20):
+        print(f"== profile: {self.elapsed:.3f} s ==", file=out)
+        print(f"{'calls':>9} {'total ms':>10} {'self ms':>10} {'self us/call':>13}  function", file=out)
+        ranked = sorted(self.functions.items(), key=lambda item: item[1].exclusive, reverse=True)
+        for function, stats in ranked:
+            print(f"{stats.calls:>9} {stats.inclusive * 1e3:>10.2f} {stats.exclusive * 1e3:>10.2f} "
+                  f"{stats.exclusive / stats.calls * 1e6:>13.2f}  {self.label(function)}", file=out)
+        print("== hottest lines ==", file=out)
+        print(f"{'line':>9} {'hits':>10}", file=out)
+        for line, hits in sorted(self.lines.items(), key=lambda item: (-item[1], item[0]))[:lines]:
+            print(f"{line:>9} {hits:>10}", file=out)
+
+    def write_collapsed(self, out: TextIO):
+        # One "frame;frame;frame microseconds" line per call path, the
+        # input format of flamegraph.pl, inferno and speedscope.
+        pending = [(SCRIPT, self.root)]
+        while pending:
+            path, node = pending.pop()
+            microseconds = round(node.exclusive * 1e6)
+            if microseconds > 0:
+                out.write(f"{path} {microseconds}\n")
+            for label, child in node.children.items():
+                pending.append((f"{path};{label}", child))
+
+class ProfiledFunction(MinLangFunction):
+    def call(self, interpreter: 'ProfilingInterpreter', arguments: List[Any]) -> Any:
+        profiler = interpreter.profiler
+        profiler.enter(self.declaration)
+        try:
+            return MinLangFunction.call(self, interpreter, arguments)
+        finally:
+            profiler.leave()
+
+    def invoke(self, interpreter: 'ProfilingInterpreter', instance: Any, arguments: List[Any]) -> Any:
+        profiler = interpreter.profiler
+        profiler.enter(self.declaration)
+        try:
+            return MinLangFunction.invoke(self, interpreter, instance, arguments)
+        finally:
+            profiler.leave()
+
+class ProfilingInterpreter(Interpreter):
+    function_class = ProfiledFunction
+
+    def __init__(self, profiler: Optional[Profiler] = None, output: Optional[Output] = None):
+        super().__init__(output)
+        self.profiler = Profiler() if profiler is None else profiler
+        self.statement_lines: Dict[Stmt, Optional[int]] = {}
+        for node_type, handler in list(self.stmt_handlers.items()):
+            self.stmt_handlers[node_type] = self.counting(handler)
+
+    def counting(self, handler: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        hits = self.profiler.lines
+        statement_lines = self.statement_lines
+
+        def run(stmt):
+            if stmt in statement_lines:
+                line = statement_lines[stmt]
+            else:
+                line = statement_lines[stmt] = line_of(stmt)
+            if line is not None:
+                hits[line] = hits.get(line, 0) + 1
+            return handler(stmt)
+        return run
+
+    def forget(self, nodes: Iterable[Any]):
+        nodes = list(nodes)
+        super().forget(nodes)
+        for node in nodes:
+            self.statement_lines.pop(node, None)
+
+    def visit_class_stmt(self, stmt: Class):
+        for method in stmt.methods:
+            self.profiler.labels[method] = f"{stmt.name.lexeme}.{method.name.lexeme}:{method.name.line}"
+        super().visit_class_stmt(stmt)
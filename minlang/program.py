@@ -0,0 +1,151 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+from minlang.lexer import Lexer
+from minlang.parser import Parser, Stmt
+from minlang.resolver import Resolver
+from minlang.optimizer import Optimizer
+from minlang.converter import ClosureConverter
+from minlang.interpreter import Interpreter
+from minlang.closures import ClosureInterpreter
+from minlang.transpiler import PythonInterpreter
+from minlang.compiler import Compiler
+from minlang.output import Output
+from minlang.vm import VM
+
+ENGINES = ("tree", "closure", "vm", "pyc")
+
+INTERPRETERS = {"closure": ClosureInterpreter, "pyc": PythonInterpreter}
+
+# The embedding API: compile(source) lexes, parses, resolves and optimizes
+# a script once, and the Program it returns can be run any number of
+# times, on fresh interpreters or on ones that already hold state.
+#
+# A Program is never modified after compile() builds it, running it
+# included, so one Program can be shared by threads that each run it on
+# their own interpreter. The interpreters keep what the resolver and
+# closure conversion found about the tree, and what the tree walker's
+# quickening learned, in side tables keyed by its nodes; a Program keeps
+# its own copy of the analysis tables and adds them to an interpreter
+# before running on it.
+
+class Program:
+    __slots__ = ("source", "engine", "optimize", "statements", "code",
+                 "locals", "cells", "receivers", "layouts", "captured")
+
+    def __init__(self, source: str, engine: str, optimize: bool, statements: Tuple[Stmt, ...],
+                 code: Any, interpreter: Interpreter):
+        values = {
+            "source": source,
+            "engine": engine,
+            "optimize": optimize,
+            "statements": statements,
+            # What the vm and pyc engines execute instead of the tree.
+            "code": code,
+            "locals": dict(interpreter.locals),
+            "cells": dict(interpreter.cells),
+            "receivers": dict(interpreter.receivers),
+            "layouts": dict(interpreter.layouts),
+            "captured": frozenset(interpreter.captured),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("Program is immutable")
+
+    def __reduce__(self):
+        # Compiled code objects don't pickle, so a Program sent to another
+        # process is compiled again there.
+        return (compile, (self.source, self.engine, self.optimize))
+
+    def new_interpreter(self, output: Optional[Output] = None) -> Union[Interpreter, VM]:
+        if self.engine == "vm":
+            return VM(output=output)
+        return INTERPRETERS.get(self.engine, Interpreter)(output)
+
+    def run(self, globals: Optional[Dict[str, Any]] = None,
+            interpreter: Optional[Union[Interpreter, VM]] = None,
+            output: Optional[Output] = None) -> Union[Interpreter, VM]:
+        # Runs on `interpreter`, or on a new one writing to `output`, after
+        # defining `globals` in it, and returns the interpreter so its
+        # globals and had_runtime_error can be inspected. The interpreter
+        # must belong to the Program's engine: a VM for "vm", a
+        # PythonInterpreter for "pyc" and so on.
+        if interpreter is None:
+            interpreter = self.new_interpreter(output)
+        if self.engine == "vm":
+            if globals:
+                interpreter.globals.update(globals)
+            interpreter.interpret(self.code)
+            return interpreter
+
+        if globals:
+            for name, value in globals.items():
+                interpreter.globals.define(name, value)
+        if self.engine == "pyc":
+            interpreter.run(self.code)
+        else:
+            interpreter.locals.update(self.locals)
+            interpreter.cells.update(self.cells)
+            interpreter.receivers.update(self.receivers)
+            interpreter.layouts.update(self.layouts)
+            interpreter.captured.update(self.captured)
+            interpreter.interpret(self.statements)
+        return interpreter
+
+def compile(source: str, engine: str = "tree", optimize: bool = True) -> Program:
+    # Raises LexError for malformed tokens and RuntimeError for resolver
+    # errors. As when running a script, statements the parser can't make
+    # sense of are skipped.
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'.")
+    statements = Parser(Lexer(source).scan_tokens()).parse()
+    interpreter = INTERPRETERS.get(engine, Interpreter)()
+    Resolver(interpreter).resolve(statements)
+    if optimize:
+        statements = Optimizer().optimize(statements)
+    code = None
+    if engine in ("tree", "closure"):
+        ClosureConverter(interpreter).convert(statements)
+    elif engine == "vm":
+        code = Compiler().compile(statements)
+    else:
+        code = interpreter.compile(statements)
+    return Program(source, engine, optimize, tuple(statements), code, interpreter)
+
+class ProgramCache:
+    # Programs by source text, engine and optimization level, evicting the
+    # least recently used beyond `maxsize`. Safe to share between threads;
+    # two threads missing on the same source may both compile it.
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.programs: 'OrderedDict[Tuple[str, str, bool], Program]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def compile(self, source: str, engine: str = "tree", optimize: bool = True) -> Program:
+        key = (source, engine, optimize)
+        with self.lock:
+            program = self.programs.get(key)
+            if program is not None:
+                self.programs.move_to_end(key)
+                self.hits += 1
+                return program
+            self.misses += 1
+        program = compile(source, engine, optimize)
+        with self.lock:
+            self.programs[key] = program
+            while len(self.programs) > self.maxsize:
+                self.programs.popitem(last=False)
+        return program
+
+    def clear(self):
+        with self.lock:
+            self.programs.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.programs)
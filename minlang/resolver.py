@@ -0,0 +1,169 @@
+from enum import Enum, auto
+from typing import Dict, List, Optional
+from minlang.lexer import Token
+from minlang.parser import *
+
+class FunctionType(Enum):
+    NONE = auto()
+    FUNCTION = auto()
+    INITIALIZER = auto()
+    METHOD = auto()
+
+class ClassType(Enum):
+    NONE = auto()
+    CLASS = auto()
+    SUBCLASS = auto()
+
+class Resolver:
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.scopes: List[Dict[str, bool]] = []
+        self.current_function = FunctionType.NONE
+        self.current_class = ClassType.NONE
+
+    def resolve(self, statements: List[Stmt]):
+        for statement in statements:
+            self.resolve_stmt(statement)
+
+    def resolve_stmt(self, stmt: Optional[Stmt]):
+        if isinstance(stmt, Expression):
+            self.resolve_expr(stmt.expression)
+        elif isinstance(stmt, Print):
+            self.resolve_expr(stmt.expression)
+        elif isinstance(stmt, Var):
+            self.declare(stmt.name)
+            if stmt.initializer is not None:
+                self.resolve_expr(stmt.initializer)
+            self.define(stmt.name)
+        elif isinstance(stmt, Block):
+            self.begin_scope()
+            self.resolve(stmt.statements)
+            self.end_scope()
+        elif isinstance(stmt, If):
+            self.resolve_expr(stmt.condition)
+            self.resolve_stmt(stmt.then_branch)
+            if stmt.else_branch is not None:
+                self.resolve_stmt(stmt.else_branch)
+        elif isinstance(stmt, While):
+            self.resolve_expr(stmt.condition)
+            self.resolve_stmt(stmt.body)
+        elif isinstance(stmt, Function):
+            self.declare(stmt.name)
+            self.define(stmt.name)
+            self.resolve_function(stmt, FunctionType.FUNCTION)
+        elif isinstance(stmt, Return):
+            if self.current_function == FunctionType.NONE:
+                raise self.error(stmt.keyword, "Can't return from top-level code.")
+            if stmt.value is not None:
+                if self.current_function == FunctionType.INITIALIZER:
+                    raise self.error(stmt.keyword, "Can't return a value from an initializer.")
+                self.resolve_expr(stmt.value)
+        elif isinstance(stmt, Class):
+            self.resolve_class(stmt)
+
+    def resolve_class(self, stmt: Class):
+        enclosing_class = self.current_class
+        self.current_class = ClassType.CLASS
+
+        self.declare(stmt.name)
+        self.define(stmt.name)
+
+        if stmt.superclass is not None:
+            if stmt.superclass.name.lexeme == stmt.name.lexeme:
+                raise self.error(stmt.superclass.name, "A class can't inherit from itself.")
+            self.current_class = ClassType.SUBCLASS
+            self.resolve_expr(stmt.superclass)
+            self.begin_scope()
+            self.scopes[-1]["super"] = True
+
+        self.begin_scope()
+        self.scopes[-1]["this"] = True
+
+        for method in stmt.methods:
+            declaration = FunctionType.METHOD
+            if method.name.lexeme == "init":
+                declaration = FunctionType.INITIALIZER
+            self.resolve_function(method, declaration)
+
+        self.end_scope()
+
+        if stmt.superclass is not None:
+            self.end_scope()
+
+        self.current_class = enclosing_class
+
+    def resolve_function(self, function: Function, type: FunctionType):
+        enclosing_function = self.current_function
+        self.current_function = type
+
+        self.begin_scope()
+        for param in function.params:
+            self.declare(param)
+            self.define(param)
+        self.resolve(function.body)
+        self.end_scope()
+
+        self.current_function = enclosing_function
+
+    def resolve_expr(self, expr: Expr):
+        if isinstance(expr, Variable):
+            if self.scopes and self.scopes[-1].get(expr.name.lexeme) is False:
+                raise self.error(expr.name, "Can't read local variable in its own initializer.")
+            self.resolve_local(expr, expr.name)
+        elif isinstance(expr, Assign):
+            self.resolve_expr(expr.value)
+            self.resolve_local(expr, expr.name)
+        elif isinstance(expr, (Binary, Logical)):
+            self.resolve_expr(expr.left)
+            self.resolve_expr(expr.right)
+        elif isinstance(expr, Unary):
+            self.resolve_expr(expr.right)
+        elif isinstance(expr, Grouping):
+            self.resolve_expr(expr.expression)
+        elif isinstance(expr, Call):
+            self.resolve_expr(expr.callee)
+            for argument in expr.arguments:
+                self.resolve_expr(argument)
+        elif isinstance(expr, Get):
+            self.resolve_expr(expr.obj)
+        elif isinstance(expr, Set):
+            self.resolve_expr(expr.value)
+            self.resolve_expr(expr.obj)
+        elif isinstance(expr, This):
+            if self.current_class == ClassType.NONE:
+                raise self.error(expr.keyword, "Can't use 'this' outside of a class.")
+            self.resolve_local(expr, expr.keyword)
+        elif isinstance(expr, Super):
+            if self.current_class == ClassType.NONE:
+                raise self.error(expr.keyword, "Can't use 'super' outside of a class.")
+            if self.current_class != ClassType.SUBCLASS:
+                raise self.error(expr.keyword, "Can't use 'super' in a class with no superclass.")
+            self.resolve_local(expr, expr.keyword)
+
+    def resolve_local(self, expr: Expr, name: Token):
+        for i in range(len(self.scopes) - 1, -1, -1):
+            if name.lexeme in self.scopes[i]:
+                self.interpreter.resolve(expr, len(self.scopes) - 1 - i)
+                return
+
+    def begin_scope(self):
+        self.scopes.append({})
+
+    def end_scope(self):
+        self.scopes.pop()
+
+    def declare(self, name: Token):
+        if not self.scopes:
+            return
+        scope = self.scopes[-1]
+        if name.lexeme in scope:
+            raise self.error(name, "Already a variable with this name in this scope.")
+        scope[name.lexeme] = False
+
+    def define(self, name: Token):
+        if not self.scopes:
+            return
+        self.scopes[-1][name.lexeme] = True
+
+    def error(self, token: Token, message: str) -> RuntimeError:
+        return RuntimeError(f"[line {token.line}] Error: {message}")
@@ -0,0 +1,145 @@
+import gc
+import os
+import pickle
+from typing import Any, BinaryIO, Dict, List, Optional, Set
+from minlang import __version__
+from minlang.parser import Expr, Stmt
+from minlang.interpreter import Interpreter, MinLangClass
+from minlang.output import Output
+
+# Snapshots of a tree-walking interpreter's global state, so that a long
+# prelude of class and function definitions runs once and later processes
+# restore its results instead of running it again.
+#
+# A snapshot pickles the global variables together with the resolver's
+# and closure conversion's side tables: functions keep pointing at their
+# declarations in the syntax tree, and the tables must still find those
+# nodes. One pickler writes the globals, then the table entries for the
+# nodes the globals reached, then the classes seen; its memo preserves the
+# sharing between them, as well as the cells closures share. Entries for
+# the rest of the prelude, such as its finished top-level statements, are
+# left out. The global Environment itself is not copied; references to it
+# are resolved to the restoring interpreter's globals.
+
+MAGIC = b"GKGS\x02"
+
+# The keys of the table record save_snapshot writes after the globals.
+TABLE_KEYS = frozenset(("locals", "cells", "receivers", "layouts", "captured"))
+
+class SnapshotPickler(pickle.Pickler):
+    def __init__(self, file: BinaryIO, interpreter: Interpreter):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.globals = interpreter.globals
+        self.classes: Dict[int, MinLangClass] = {}
+        # The ids of the syntax tree nodes pickled so far.
+        self.nodes: Set[int] = set()
+
+    def persistent_id(self, obj: Any) -> Optional[str]:
+        if obj is self.globals:
+            return "globals"
+        return None
+
+    def reducer_override(self, obj: Any) -> Any:
+        if isinstance(obj, (Expr, Stmt)):
+            self.nodes.add(id(obj))
+        elif isinstance(obj, MinLangClass):
+            self.classes[id(obj)] = obj
+        return NotImplemented
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file: BinaryIO, interpreter: Interpreter):
+        super().__init__(file)
+        self.globals = interpreter.globals
+
+    def persistent_load(self, pid: str) -> Any:
+        if pid == "globals":
+            return self.globals
+        raise pickle.UnpicklingError(f"unknown persistent id {pid!r}")
+
+def header() -> bytes:
+    return MAGIC + __version__.encode() + b"\n"
+
+def check_engine(interpreter: Interpreter):
+    # The other engines keep compiled Python code in their functions, and
+    # the profiler's functions report to the profiler they were made by.
+    if type(interpreter) is not Interpreter:
+        raise ValueError("Snapshots need the tree engine without the profiler.")
+
+def save_snapshot(interpreter: Interpreter, path: str):
+    check_engine(interpreter)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            file.write(header())
+            pickler = SnapshotPickler(file, interpreter)
+            pickler.dump(interpreter.globals.values)
+            nodes = pickler.nodes
+            pickler.dump({
+                "locals": {node: distance for node, distance in interpreter.locals.items()
+                           if id(node) in nodes},
+                "cells": {node: distance for node, distance in interpreter.cells.items()
+                          if id(node) in nodes},
+                "receivers": {node: receiver for node, receiver in interpreter.receivers.items()
+                              if id(node) in nodes},
+                "layouts": {node: layout for node, layout in interpreter.layouts.items()
+                            if id(node) in nodes},
+                "captured": {node for node in interpreter.captured if id(node) in nodes},
+            })
+            # The classes seen in both, which are relinked after loading.
+            pickler.dump(list(pickler.classes.values()))
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+def load_snapshot(path: str, interpreter: Optional[Interpreter] = None,
+                  output: Optional[Output] = None) -> Interpreter:
+    # Restores into `interpreter`, or into a new one writing to `output`,
+    # and returns it. Raises ValueError for a file that isn't a snapshot
+    # written by this version of MinLang, or one that is truncated or
+    # corrupt past its header.
+    if interpreter is None:
+        interpreter = Interpreter(output)
+    check_engine(interpreter)
+    # As in ParseCache.load, the cyclic GC would rescan the growing object
+    # graph many times over during the load.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, "rb") as file:
+            if file.read(len(header())) != header():
+                raise ValueError(f"'{path}' is not a snapshot for MinLang {__version__}.")
+            unpickler = SnapshotUnpickler(file, interpreter)
+            try:
+                values = unpickler.load()
+                tables = unpickler.load()
+                classes: List[MinLangClass] = unpickler.load()
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError,
+                    IndexError, KeyError, TypeError):
+                raise ValueError(f"'{path}' is not a valid snapshot.") from None
+            if not (isinstance(values, dict) and isinstance(tables, dict)
+                    and tables.keys() == TABLE_KEYS and isinstance(classes, list)):
+                raise ValueError(f"'{path}' is not a valid snapshot.")
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    for klass in sorted(classes, key=depth):
+        klass.relink()
+    interpreter.globals.values.update(values)
+    interpreter.locals.update(tables["locals"])
+    interpreter.cells.update(tables["cells"])
+    interpreter.receivers.update(tables["receivers"])
+    interpreter.layouts.update(tables["layouts"])
+    interpreter.captured.update(tables["captured"])
+    return interpreter
+
+def depth(klass: MinLangClass) -> int:
+    count = 0
+    while klass.superclass is not None:
+        klass = klass.superclass
+        count += 1
+    return count
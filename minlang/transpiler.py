@@ -0,0 +1,745 @@
+import ast
+import gc
+import math
+from types import CodeType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from minlang.lexer import TokenType
+from minlang.parser import *
+from minlang.output import Output, stringify
+from minlang.interpreter import Interpreter, MinLangCallable, MinLangClass, MinLangInstance
+
+# Generated code is compiled under this file name, so tracebacks and error
+# reports can tell its frames apart from the runtime's.
+FILENAME = "<minlang>"
+
+class PythonFunction(MinLangCallable):
+    # A MinLang function compiled to a Python function. Call sites check
+    # `type(callee) is PythonFunction` and the argument count, then call
+    # `function` directly.
+    __slots__ = ("name", "function", "n_params")
+
+    def __init__(self, name: str, function: Callable, n_params: int):
+        self.name = name
+        self.function = function
+        self.n_params = n_params
+
+    def call(self, interpreter: Interpreter, arguments: List[Any]) -> Any:
+        return self.function(*arguments)
+
+    def arity(self) -> int:
+        return self.n_params
+
+    def __str__(self):
+        return f"<fn {self.name}>"
+
+class PythonMethod(PythonFunction):
+    # A method in a class's method table. Its Python function takes the
+    # receiver as an extra first argument. Methods never escape the table
+    # unbound: `obj.name` and `super.name` produce a BoundMethod.
+    __slots__ = ()
+
+    def invoke(self, interpreter: Interpreter, instance: MinLangInstance, arguments: List[Any]) -> Any:
+        return self.function(instance, *arguments)
+
+    def bind(self, instance: MinLangInstance) -> 'BoundMethod':
+        return BoundMethod(self, instance)
+
+class PythonInitializer(PythonMethod):
+    # `init` always returns the receiver. A separate type keeps it off the
+    # call sites' fast path, which returns the function's own result.
+    __slots__ = ()
+
+    def invoke(self, interpreter: Interpreter, instance: MinLangInstance, arguments: List[Any]) -> Any:
+        self.function(instance, *arguments)
+        return instance
+
+class BoundMethod(MinLangCallable):
+    __slots__ = ("method", "receiver")
+
+    def __init__(self, method: PythonMethod, receiver: MinLangInstance):
+        self.method = method
+        self.receiver = receiver
+
+    def call(self, interpreter: Interpreter, arguments: List[Any]) -> Any:
+        return self.method.invoke(interpreter, self.receiver, arguments)
+
+    def arity(self) -> int:
+        return self.method.n_params
+
+    def __str__(self):
+        return f"<fn {self.method.name}>"
+
+class Globals(dict):
+    # The global Environment's values. Generated code reads globals by
+    # subscript, and a miss is MinLang's undefined-variable error.
+    def __missing__(self, name: str):
+        raise RuntimeError(f"Undefined variable '{name}'.")
+
+class Binding:
+    # A local variable, with the Python name it compiles to and the function
+    # that declares it. Locals are plain Python locals (cells when a nested
+    # function captures them), except that a captured variable declared in
+    # a loop body needs a fresh binding per iteration, which a Python cell
+    # cannot give: those are boxed in a one-element list instead, and every
+    # function capturing one takes the box as a keyword-only default.
+    __slots__ = ("name", "function", "in_loop", "captured")
+
+    def __init__(self, name: str, function: 'FunctionInfo', in_loop: bool):
+        self.name = name
+        self.function = function
+        self.in_loop = in_loop
+        self.captured = False
+
+    @property
+    def boxed(self) -> bool:
+        return self.in_loop and self.captured
+
+class FunctionInfo:
+    __slots__ = ("parent", "defaults", "nonlocals")
+
+    def __init__(self, parent: Optional['FunctionInfo']):
+        self.parent = parent
+        # Insertion-ordered sets, so the generated source is deterministic.
+        self.defaults: Dict[Binding, None] = {}
+        self.nonlocals: Dict[Binding, None] = {}
+
+COMPARISONS = {
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+}
+
+# Roughly how many lines of Python each top-level `program` function gets.
+CHUNK_LINES = 200
+
+ARITHMETIC = {
+    TokenType.PLUS: "+",
+    TokenType.MINUS: "-",
+    TokenType.DIVIDE: "/",
+}
+
+# Translates a resolved, optimized tree into Python source and compiles it.
+# Operators map onto Python's own wherever Python gives the same result for
+# every MinLang value: `+`, `-`, `/`, `==` and `!=` always, `*` and the
+# comparisons once a string operand is ruled out. Where Python fails instead
+# it raises TypeError, which the interpreter reports as the tree walker's
+# operand error.
+class Transpiler:
+    def __init__(self, locals: Dict[Expr, int]):
+        self.locals = locals
+        self.scopes: List[Dict[str, Binding]] = []
+        self.function = FunctionInfo(None)
+        self.loop_depth = 0
+        self.declarations: Dict[object, Binding] = {}
+        self.references: Dict[Expr, Any] = {}
+        self.params: Dict[Function, List[Binding]] = {}
+        self.receivers: Dict[Function, Binding] = {}
+        self.supers: Dict[Class, Binding] = {}
+        self.functions: Dict[Function, FunctionInfo] = {}
+        self.names = 0
+        self.lines: List[Tuple[str, int]] = []
+        self.indent = 0
+        self.line = 1
+
+    def compile(self, statements: List[Stmt]) -> CodeType:
+        source, lines = self.transpile(statements)
+        tree = ast.parse(source, FILENAME)
+        # Point every node at the MinLang line it came from.
+        for node in ast.walk(tree):
+            if hasattr(node, "lineno"):
+                node.lineno = node.end_lineno = lines[node.lineno - 1]
+        return compile(tree, FILENAME, "exec")
+
+    def transpile(self, statements: List[Stmt]) -> Tuple[str, List[int]]:
+        # Top-level statements share no locals, so they can be split into
+        # several `program` functions, each defined and then called by the
+        # module. CPython takes time quadratic in the size of one function
+        # to compile it, which a long script would otherwise pay in full.
+        self.analyze(statements)
+        start = 0
+        while start < len(statements):
+            self.line = line_of(statements[start]) or self.line
+            self.emit("def program():")
+            self.indent += 1
+            first = len(self.lines)
+            while start < len(statements) and len(self.lines) - first < CHUNK_LINES:
+                self.emit_stmt(statements[start])
+                start += 1
+            if len(self.lines) == first:
+                self.emit("pass")
+            self.indent -= 1
+            self.emit("program()")
+        return "\n".join(text for text, _ in self.lines) + "\n", [line for _, line in self.lines]
+
+    def unique(self, name: str) -> str:
+        # Every local gets a numbered name, which can't collide with another
+        # local, a Python keyword or a runtime helper.
+        self.names += 1
+        return f"{name}_{self.names}"
+
+    # First pass: mirror the resolver's scopes to bind every local reference
+    # to its declaration and find which locals closures capture.
+
+    def analyze(self, statements: List[Stmt]):
+        for statement in statements:
+            self.analyze_stmt(statement)
+
+    def analyze_stmt(self, stmt: Optional[Stmt]):
+        if isinstance(stmt, (Expression, Print)):
+            self.analyze_expr(stmt.expression)
+        elif isinstance(stmt, Var):
+            if stmt.initializer is not None:
+                self.analyze_expr(stmt.initializer)
+            self.declare(stmt, stmt.name.lexeme)
+        elif isinstance(stmt, Block):
+            self.scopes.append({})
+            self.analyze(stmt.statements)
+            self.scopes.pop()
+        elif isinstance(stmt, If):
+            self.analyze_expr(stmt.condition)
+            self.analyze_stmt(stmt.then_branch)
+            self.analyze_stmt(stmt.else_branch)
+        elif isinstance(stmt, While):
+            self.analyze_expr(stmt.condition)
+            self.loop_depth += 1
+            self.analyze_stmt(stmt.body)
+            self.loop_depth -= 1
+        elif isinstance(stmt, Function):
+            self.declare(stmt, stmt.name.lexeme)
+            self.analyze_function(stmt, False)
+        elif isinstance(stmt, Return):
+            if stmt.value is not None:
+                self.analyze_expr(stmt.value)
+        elif isinstance(stmt, Class):
+            self.declare(stmt, stmt.name.lexeme)
+            if stmt.superclass is not None:
+                self.analyze_expr(stmt.superclass)
+                binding = Binding(self.unique("super"), self.function, self.loop_depth > 0)
+                self.scopes.append({"super": binding})
+                self.supers[stmt] = binding
+            for method in stmt.methods:
+                self.analyze_function(method, True)
+            if stmt.superclass is not None:
+                self.scopes.pop()
+
+    def analyze_function(self, function: Function, is_method: bool):
+        info = FunctionInfo(self.function)
+        self.functions[function] = info
+        enclosing, loop_depth = self.function, self.loop_depth
+        self.function, self.loop_depth = info, 0
+        if is_method:
+            receiver = Binding(self.unique("this"), info, False)
+            self.receivers[function] = receiver
+            self.scopes.append({"this": receiver})
+        self.scopes.append({})
+        params = []
+        for param in function.params:
+            binding = Binding(self.unique(param.lexeme), info, False)
+            self.scopes[-1][param.lexeme] = binding
+            params.append(binding)
+        self.params[function] = params
+        self.analyze(function.body)
+        self.scopes.pop()
+        if is_method:
+            self.scopes.pop()
+        self.function, self.loop_depth = enclosing, loop_depth
+
+    def declare(self, stmt: Stmt, name: str):
+        if not self.scopes:
+            return
+        binding = Binding(self.unique(name), self.function, self.loop_depth > 0)
+        self.scopes[-1][name] = binding
+        self.declarations[stmt] = binding
+
+    def analyze_expr(self, expr: Expr):
+        if isinstance(expr, Variable):
+            self.reference(expr, expr.name.lexeme, False)
+        elif isinstance(expr, Assign):
+            self.analyze_expr(expr.value)
+            self.reference(expr, expr.name.lexeme, True)
+        elif isinstance(expr, (Binary, Logical)):
+            self.analyze_expr(expr.left)
+            self.analyze_expr(expr.right)
+        elif isinstance(expr, Unary):
+            self.analyze_expr(expr.right)
+        elif isinstance(expr, Grouping):
+            self.analyze_expr(expr.expression)
+        elif isinstance(expr, Call):
+            self.analyze_expr(expr.callee)
+            for argument in expr.arguments:
+                self.analyze_expr(argument)
+        elif isinstance(expr, Get):
+            self.analyze_expr(expr.obj)
+        elif isinstance(expr, Set):
+            self.analyze_expr(expr.obj)
+            self.analyze_expr(expr.value)
+        elif isinstance(expr, This):
+            self.reference(expr, "this", False)
+        elif isinstance(expr, Super):
+            distance = self.locals[expr]
+            superclass = self.scopes[-1 - distance]["super"]
+            receiver = self.scopes[-distance]["this"]
+            self.capture(superclass, False)
+            self.capture(receiver, False)
+            self.references[expr] = (superclass, receiver)
+
+    def reference(self, expr: Expr, name: str, assign: bool):
+        distance = self.locals.get(expr)
+        if distance is None:
+            return
+        binding = self.scopes[-1 - distance][name]
+        self.capture(binding, assign)
+        self.references[expr] = binding
+
+    def capture(self, binding: Binding, assign: bool):
+        if binding.function is self.function:
+            return
+        binding.captured = True
+        if binding.in_loop:
+            # The box is passed to the function declared directly in the
+            # loop's function; functions nested in that one close over it.
+            info = self.function
+            while info.parent is not binding.function:
+                info = info.parent
+            info.defaults[binding] = None
+        elif assign:
+            self.function.nonlocals[binding] = None
+
+    # Second pass: emit Python source, one list entry per line, each tagged
+    # with the MinLang line it was generated from.
+
+    def emit(self, text: str):
+        self.lines.append(("    " * self.indent + text, self.line))
+
+    def emit_suite(self, statements: List[Stmt]):
+        start = len(self.lines)
+        self.indent += 1
+        for statement in statements:
+            self.emit_stmt(statement)
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.indent -= 1
+
+    def emit_stmt(self, stmt: Optional[Stmt]):
+        line = line_of(stmt)
+        if line is not None:
+            self.line = line
+        if isinstance(stmt, Expression):
+            if isinstance(stmt.expression, Assign):
+                self.emit_assign(stmt.expression)
+            else:
+                self.emit(self.expr(stmt.expression))
+        elif isinstance(stmt, Print):
+            self.emit(f"write_line(stringify({self.expr(stmt.expression)}))")
+        elif isinstance(stmt, Var):
+            value = "None" if stmt.initializer is None else self.expr(stmt.initializer)
+            self.emit_declaration(stmt, stmt.name.lexeme, value)
+        elif isinstance(stmt, Block):
+            for statement in stmt.statements:
+                self.emit_stmt(statement)
+        elif isinstance(stmt, If):
+            self.emit(f"if {self.test(stmt.condition)}:")
+            self.emit_suite([stmt.then_branch])
+            if stmt.else_branch is not None:
+                self.emit("else:")
+                self.emit_suite([stmt.else_branch])
+        elif isinstance(stmt, While):
+            self.emit(f"while {self.test(stmt.condition)}:")
+            self.emit_suite([stmt.body])
+        elif isinstance(stmt, Function):
+            name = self.emit_function(stmt)
+            value = f"PythonFunction({stmt.name.lexeme!r}, {name}, {len(stmt.params)})"
+            self.emit_declaration(stmt, stmt.name.lexeme, value)
+        elif isinstance(stmt, Return):
+            if stmt.value is None:
+                self.emit("return")
+            else:
+                self.emit(f"return {self.expr(stmt.value)}")
+        elif isinstance(stmt, Class):
+            self.emit_class(stmt)
+
+    def emit_declaration(self, stmt: Stmt, name: str, value: str):
+        binding = self.declarations.get(stmt)
+        if binding is None:
+            self.emit(f"GLOBALS[{name!r}] = {value}")
+        elif binding.boxed:
+            self.emit(f"{binding.name} = [{value}]")
+        else:
+            self.emit(f"{binding.name} = {value}")
+
+    def emit_assign(self, expr: Assign):
+        binding = self.references.get(expr)
+        value = self.expr(expr.value)
+        if binding is None:
+            # The value is evaluated before the variable is checked; reading a
+            # missing global raises the undefined-variable error.
+            name = expr.name.lexeme
+            temporary = self.temporary()
+            self.emit(f"{temporary} = {value}")
+            self.emit(f"if {name!r} not in GLOBALS: GLOBALS[{name!r}]")
+            self.emit(f"GLOBALS[{name!r}] = {temporary}")
+        elif binding.boxed:
+            self.emit(f"{binding.name}[0] = {value}")
+        else:
+            self.emit(f"{binding.name} = {value}")
+
+    def emit_function(self, function: Function) -> str:
+        info = self.functions[function]
+        self.line = function.name.line
+        name = self.unique(function.name.lexeme)
+        params = [binding.name for binding in self.params[function]]
+        if function in self.receivers:
+            params.insert(0, self.receivers[function].name)
+        if info.defaults:
+            params.append("*")
+            params.extend(f"{binding.name}={binding.name}" for binding in info.defaults)
+        self.emit(f"def {name}({', '.join(params)}):")
+        if info.nonlocals:
+            self.indent += 1
+            self.emit(f"nonlocal {', '.join(binding.name for binding in info.nonlocals)}")
+            self.indent -= 1
+        self.emit_suite(function.body)
+        return name
+
+    def emit_class(self, stmt: Class):
+        superclass = "None"
+        if stmt.superclass is not None:
+            binding = self.supers[stmt]
+            superclass = binding.name
+            value = f"check_superclass({self.expr(stmt.superclass)})"
+            self.emit(f"{binding.name} = [{value}]" if binding.boxed else f"{binding.name} = {value}")
+            if binding.boxed:
+                superclass += "[0]"
+        self.emit_declaration(stmt, stmt.name.lexeme, "None")
+        methods = []
+        for method in stmt.methods:
+            name = method.name.lexeme
+            kind = "PythonInitializer" if name == "init" else "PythonMethod"
+            methods.append(f"{name!r}: {kind}({name!r}, {self.emit_function(method)}, {len(method.params)})")
+        self.line = stmt.name.line
+        klass = f"MinLangClass({stmt.name.lexeme!r}, {superclass}, {{{', '.join(methods)}}})"
+        binding = self.declarations.get(stmt)
+        if binding is None:
+            self.emit(f"GLOBALS[{stmt.name.lexeme!r}] = {klass}")
+        elif binding.boxed:
+            self.emit(f"{binding.name}[0] = {klass}")
+        else:
+            self.emit(f"{binding.name} = {klass}")
+
+    def temporary(self) -> str:
+        self.names += 1
+        return f"__t{self.names}"
+
+    def load(self, expr: Expr, name: str) -> str:
+        binding = self.references.get(expr)
+        if binding is None:
+            return f"GLOBALS[{name!r}]"
+        if binding.boxed:
+            return f"{binding.name}[0]"
+        return binding.name
+
+    def test(self, expr: Expr) -> str:
+        # A condition in MinLang's truthiness, where only nil and false are
+        # false. Python's `if` agrees when the value is known to be a bool.
+        if is_bool(expr):
+            return self.expr(expr)
+        temporary = self.temporary()
+        return f"(({temporary} := {self.expr(expr)}) is not None and {temporary} is not False)"
+
+    def expr(self, expr: Expr) -> str:
+        if isinstance(expr, Literal):
+            return constant(expr.value)
+        elif isinstance(expr, Grouping):
+            return self.expr(expr.expression)
+        elif isinstance(expr, Variable):
+            return self.load(expr, expr.name.lexeme)
+        elif isinstance(expr, This):
+            return self.load(expr, "this")
+        elif isinstance(expr, Assign):
+            binding = self.references.get(expr)
+            value = self.expr(expr.value)
+            if binding is None:
+                return f"assign_global({expr.name.lexeme!r}, {value})"
+            if binding.boxed:
+                return f"assign_box({binding.name}, {value})"
+            return f"({binding.name} := {value})"
+        elif isinstance(expr, Logical):
+            return self.logical(expr)
+        elif isinstance(expr, Binary):
+            return self.binary(expr)
+        elif isinstance(expr, Unary):
+            if expr.operator.type == TokenType.MINUS:
+                return f"(-{self.expr(expr.right)})"
+            if is_bool(expr.right):
+                return f"(not {self.expr(expr.right)})"
+            temporary = self.temporary()
+            return f"(({temporary} := {self.expr(expr.right)}) is None or {temporary} is False)"
+        elif isinstance(expr, Call):
+            return self.call(expr)
+        elif isinstance(expr, Get):
+            return f"get_property({self.expr(expr.obj)}, {expr.name.lexeme!r})"
+        elif isinstance(expr, Set):
+            obj = self.expr(expr.obj)
+            if not isinstance(expr.obj, This):
+                # The receiver is checked before the value is evaluated;
+                # `this` is always an instance.
+                obj = f"check_fields({obj})"
+            return f"set_property({obj}, {expr.name.lexeme!r}, {self.expr(expr.value)})"
+        elif isinstance(expr, Super):
+            superclass, receiver = self.references[expr]
+            superclass = f"{superclass.name}[0]" if superclass.boxed else superclass.name
+            return f"super_method({superclass}, {receiver.name}, {expr.method.lexeme!r})"
+        return "None"
+
+    def logical(self, expr: Logical) -> str:
+        left = self.expr(expr.left)
+        right = self.expr(expr.right)
+        if is_bool(expr.left):
+            keyword = "or" if expr.operator.type == TokenType.OR else "and"
+            return f"({left} {keyword} {right})"
+        temporary = self.temporary()
+        truthy = f"({temporary} := {left}) is not None and {temporary} is not False"
+        if expr.operator.type == TokenType.OR:
+            return f"({temporary} if {truthy} else {right})"
+        return f"({right} if {truthy} else {temporary})"
+
+    def binary(self, expr: Binary) -> str:
+        token_type = expr.operator.type
+        left = self.expr(expr.left)
+        right = self.expr(expr.right)
+        if token_type in ARITHMETIC:
+            return f"({left} {ARITHMETIC[token_type]} {right})"
+        if token_type == TokenType.EQUALS:
+            return f"({left} == {right})"
+        if token_type == TokenType.NOT_EQUALS:
+            return f"({left} != {right})"
+        if token_type == TokenType.MULTIPLY:
+            # Python repeats a string multiplied by an int or a bool.
+            if is_number(expr.left):
+                if not is_number(expr.right):
+                    right = f"check_string({right})"
+            elif is_number(expr.right) and isinstance(expr.right, Literal):
+                left = f"check_string({left})"
+            else:
+                return f"multiply({left}, {right})"
+            return f"({left} * {right})"
+        # Python orders two strings. With the right operand checked, a string
+        # on the left meets a non-string and raises TypeError.
+        if not (is_string_free(expr.left) or is_string_free(expr.right)):
+            right = f"check_string({right})"
+        return f"({left} {COMPARISONS[token_type]} {right})"
+
+    def call(self, expr: Call) -> str:
+        # Each site picks the Python callable to apply before evaluating the
+        # arguments, so argument expressions appear in the source only once:
+        # the compiled function itself when the callee is a PythonFunction
+        # expecting this many arguments, or a wrapper around the generic
+        # call otherwise.
+        arguments = [self.expr(argument) for argument in expr.arguments]
+        count = len(arguments)
+        callee = self.temporary()
+        if isinstance(expr.callee, Get):
+            receiver = self.temporary()
+            obj = self.expr(expr.callee.obj)
+            lookup = f"find_method({receiver} := {obj}, {expr.callee.name.lexeme!r})"
+            function = (f"({callee}.function if type({callee} := {lookup}) is PythonMethod "
+                        f"and {callee}.n_params == {count} else method_call({callee}))")
+            arguments.insert(0, receiver)
+        else:
+            function = (f"({callee}.function if type({callee} := {self.expr(expr.callee)}) is PythonFunction "
+                        f"and {callee}.n_params == {count} else generic_call({callee}))")
+        return f"{function}({', '.join(arguments)})"
+
+def constant(value: Any) -> str:
+    if isinstance(value, float) and not math.isfinite(value):
+        return f"float({repr(value)!r})"
+    return repr(value)
+
+def is_bool(expr: Expr) -> bool:
+    if isinstance(expr, Grouping):
+        return is_bool(expr.expression)
+    if isinstance(expr, Literal):
+        return isinstance(expr.value, bool)
+    if isinstance(expr, Binary):
+        return expr.operator.type in COMPARISONS or expr.operator.type in (TokenType.EQUALS, TokenType.NOT_EQUALS)
+    if isinstance(expr, Unary):
+        return expr.operator.type == TokenType.BANG
+    if isinstance(expr, Logical):
+        return is_bool(expr.left) and is_bool(expr.right)
+    return False
+
+def is_number(expr: Expr) -> bool:
+    # Evaluates to an int or a float, or raises.
+    if isinstance(expr, Grouping):
+        return is_number(expr.expression)
+    if isinstance(expr, Literal):
+        return type(expr.value) in (int, float)
+    if isinstance(expr, Binary):
+        return expr.operator.type in (TokenType.MINUS, TokenType.MULTIPLY, TokenType.DIVIDE)
+    if isinstance(expr, Unary):
+        return expr.operator.type == TokenType.MINUS
+    return False
+
+def is_string_free(expr: Expr) -> bool:
+    # Never evaluates to a string.
+    if isinstance(expr, Literal):
+        return not isinstance(expr.value, str)
+    if isinstance(expr, Logical):
+        return is_string_free(expr.left) and is_string_free(expr.right)
+    return is_number(expr) or is_bool(expr)
+
+def operand_error(error: TypeError) -> RuntimeError:
+    # The TypeError CPython raises for an operator generated code applied
+    # to the wrong types, as the tree walker's error.
+    message = str(error)
+    if "unary" in message:
+        return RuntimeError("Operand must be a number.")
+    if "for +:" in message or message.startswith("can only concatenate"):
+        return RuntimeError("Operands must be two numbers or two strings.")
+    return RuntimeError("Operands must be numbers.")
+
+def check_string(value: Any) -> Any:
+    if type(value) is str:
+        raise RuntimeError("Operands must be numbers.")
+    return value
+
+def multiply(left: Any, right: Any) -> Any:
+    if type(left) is str or type(right) is str:
+        raise RuntimeError("Operands must be numbers.")
+    return left * right
+
+def check_superclass(value: Any) -> MinLangClass:
+    if not isinstance(value, MinLangClass):
+        raise RuntimeError("Superclass must be a class.")
+    return value
+
+def check_fields(value: Any) -> MinLangInstance:
+    if not isinstance(value, MinLangInstance):
+        raise RuntimeError("Only instances have fields.")
+    return value
+
+def get_property(instance: Any, name: str) -> Any:
+    if not isinstance(instance, MinLangInstance):
+        raise RuntimeError("Only instances have properties.")
+    index = instance.shape.slots.get(name)
+    if index is not None:
+        return instance.values[index]
+    method = instance.klass.method_table.get(name)
+    if method is None:
+        raise RuntimeError(f"Undefined property '{name}'.")
+    return BoundMethod(method, instance)
+
+def find_method(instance: Any, name: str) -> Any:
+    # The callee of `instance.name(...)`: a field's value, or the unbound
+    # method from the class.
+    if not isinstance(instance, MinLangInstance):
+        raise RuntimeError("Only instances have properties.")
+    index = instance.shape.slots.get(name)
+    if index is not None:
+        return instance.values[index]
+    method = instance.klass.method_table.get(name)
+    if method is None:
+        raise RuntimeError(f"Undefined property '{name}'.")
+    return method
+
+def set_property(instance: MinLangInstance, name: str, value: Any) -> Any:
+    index = instance.shape.slots.get(name)
+    if index is None:
+        instance.shape = instance.shape.with_field(name)
+        instance.values.append(value)
+    else:
+        instance.values[index] = value
+    return value
+
+def super_method(superclass: MinLangClass, instance: MinLangInstance, name: str) -> BoundMethod:
+    method = superclass.find_method(name)
+    if method is None:
+        raise RuntimeError(f"Undefined property '{name}'.")
+    return BoundMethod(method, instance)
+
+def assign_box(box: List[Any], value: Any) -> Any:
+    box[0] = value
+    return value
+
+class PythonInterpreter(Interpreter):
+    def __init__(self, output: Optional[Output] = None):
+        super().__init__(output)
+        self.globals.values = Globals(self.globals.values)
+        # The globals generated code runs against; it has no others.
+        self.namespace = {
+            "GLOBALS": self.globals.values,
+            "MinLangClass": MinLangClass,
+            "PythonFunction": PythonFunction,
+            "PythonMethod": PythonMethod,
+            "PythonInitializer": PythonInitializer,
+            "stringify": stringify,
+            "write_line": self.output.write_line,
+            "assign_global": self.assign_global,
+            "generic_call": self.generic_call,
+            "method_call": self.method_call,
+            "assign_box": assign_box,
+            "check_string": check_string,
+            "multiply": multiply,
+            "check_superclass": check_superclass,
+            "check_fields": check_fields,
+            "get_property": get_property,
+            "find_method": find_method,
+            "set_property": set_property,
+            "super_method": super_method,
+        }
+
+    def interpret(self, statements: List[Stmt]):
+        self.run(self.compile(statements))
+
+    def compile(self, statements: List[Stmt]) -> CodeType:
+        # Code generation builds the source, then a Python AST, one object at
+        # a time; as in ParseCache.load, cyclic GC passes over the growing
+        # structures would cost more than the work itself.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return Transpiler(self.locals).compile(statements)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def release(self, nodes: List[Tuple[Any, Optional[Function]]]):
+        # Generated code doesn't read the side tables.
+        self.forget(node for node, _ in nodes)
+
+    def run(self, code: CodeType):
+        try:
+            exec(code, self.namespace)
+        except RuntimeError as error:
+            self.report(error)
+        except TypeError as error:
+            self.report(operand_error(error).with_traceback(error.__traceback__))
+        finally:
+            self.output.flush()
+
+    def report(self, error: RuntimeError):
+        self.output.write_line(f"Runtime error: {error}")
+        self.output.flush()
+        self.had_runtime_error = True
+
+    def assign_global(self, name: str, value: Any) -> Any:
+        if name not in self.globals.values:
+            raise RuntimeError(f"Undefined variable '{name}'.")
+        self.globals.values[name] = value
+        return value
+
+    def generic_call(self, callee: Any) -> Callable:
+        # The slow path of a call site: natives, classes, bound methods,
+        # non-callables and argument count mismatches.
+        return lambda *arguments: self.call_value(callee, list(arguments))
+
+    def method_call(self, callee: Any) -> Callable:
+        # Slow path of `obj.name(...)`; the receiver comes first.
+        def call(instance: MinLangInstance, *arguments: Any) -> Any:
+            if isinstance(callee, PythonMethod):
+                if len(arguments) != callee.n_params:
+                    raise RuntimeError(f"Expected {callee.n_params} arguments but got {len(arguments)}.")
+                return callee.invoke(self, instance, list(arguments))
+            return self.call_value(callee, list(arguments))
+        return call
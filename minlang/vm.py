@@ -0,0 +1,448 @@
+from typing import Any, Dict, List, Optional, Tuple
+from minlang.compiler import *
+from minlang.output import Output, StreamOutput, stringify
+from minlang.interpreter import (
+    MinLangCallable, MinLangClass, MinLangInstance, ClockFunction, PrintFunction,
+)
+
+class Cell:
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any = None):
+        self.value = value
+
+class Closure(MinLangCallable):
+    def __init__(self, code: Code, cells: List[Cell]):
+        self.code = code
+        self.cells = cells
+
+    def bind(self, instance: MinLangInstance) -> 'BoundMethod':
+        return BoundMethod(instance, self)
+
+    def call(self, vm: 'VM', arguments: List[Any]) -> Any:
+        return vm.call_closure(self, None, arguments)
+
+    def arity(self) -> int:
+        return self.code.arity
+
+    def __str__(self):
+        return f"<fn {self.code.name}>"
+
+class BoundMethod(MinLangCallable):
+    def __init__(self, receiver: MinLangInstance, method: Closure):
+        self.receiver = receiver
+        self.method = method
+
+    def call(self, vm: 'VM', arguments: List[Any]) -> Any:
+        return vm.call_closure(self.method, self.receiver, arguments)
+
+    def arity(self) -> int:
+        return self.method.code.arity
+
+    def __str__(self):
+        return f"<fn {self.method.code.name}>"
+
+DEFAULT_MAX_DEPTH = 10000
+
+class VM:
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH, output: Optional[Output] = None):
+        self.max_depth = max_depth
+        self.output = StreamOutput() if output is None else output
+        self.globals: Dict[str, Any] = {}
+        self.globals["clock"] = ClockFunction()
+        self.globals["print"] = PrintFunction()
+        self.had_runtime_error = False
+
+    def interpret(self, code: Code):
+        try:
+            self.run(code, [None] * code.slot_count, [])
+        except RuntimeError as error:
+            self.output.write_line(f"Runtime error: {error}")
+            self.had_runtime_error = True
+        finally:
+            self.output.flush()
+
+    def call_closure(self, closure: Closure, receiver: Any, arguments: List[Any]) -> Any:
+        code = closure.code
+        if len(arguments) != code.arity:
+            raise RuntimeError(f"Expected {code.arity} arguments but got {len(arguments)}.")
+        slots = [receiver]
+        slots += arguments
+        slots += code.padding
+        for slot in code.cell_params:
+            slots[slot] = Cell(slots[slot])
+        return self.run(code, slots, closure.cells)
+
+    def call_value(self, callee: Any, arguments: List[Any]) -> Any:
+        if type(callee) is Closure:
+            return self.call_closure(callee, None, arguments)
+        if type(callee) is BoundMethod:
+            return self.call_closure(callee.method, callee.receiver, arguments)
+        if type(callee) is MinLangClass:
+            instance = MinLangInstance(callee)
+            initializer = callee.find_method("init")
+            if initializer is not None:
+                self.call_closure(initializer, instance, arguments)
+            elif len(arguments) != 0:
+                raise RuntimeError(f"Expected 0 arguments but got {len(arguments)}.")
+            return instance
+        if isinstance(callee, MinLangCallable):
+            if callee.arity() >= 0 and len(arguments) != callee.arity():
+                raise RuntimeError(f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+            return callee.call(self, arguments)
+        raise RuntimeError("Can only call functions and classes.")
+
+    def prepare_call(self, callee: Any, frame: List[Any]) -> Optional[Closure]:
+        # Returns the closure a CALL enters, with slot 0 of `frame` set to
+        # its receiver. Anything else is called here and its result left
+        # in slot 0, and None returned.
+        if type(callee) is BoundMethod:
+            frame[0] = callee.receiver
+            return callee.method
+        if type(callee) is MinLangClass:
+            frame[0] = MinLangInstance(callee)
+            initializer = callee.find_method("init")
+            if initializer is not None:
+                return initializer
+            if len(frame) != 1:
+                raise RuntimeError(f"Expected 0 arguments but got {len(frame) - 1}.")
+            return None
+        frame[0] = self.call_value(callee, frame[1:])
+        return None
+
+    def run(self, code: Code, slots: List[Any], cells: List[Cell]) -> Any:
+        # MinLang calls do not recurse into run: the caller's state is saved
+        # on `frames` and the loop switches to the callee, so call depth is
+        # bounded by max_depth rather than by Python's recursion limit.
+        instructions = code.code
+        constants = code.constants
+        globals = self.globals
+        max_depth = self.max_depth
+        frames: List[Tuple[List[int], List[Any], List[Any], List[Cell], List[Any], int]] = []
+        stack: List[Any] = []
+        push = stack.append
+        pop = stack.pop
+        ip = 0
+
+        while True:
+            op = instructions[ip]
+            arg = instructions[ip + 1]
+            ip += 2
+
+            if op == LOAD_LOCAL:
+                push(slots[arg])
+            elif op == CONSTANT:
+                push(constants[arg])
+            elif op == LOAD_GLOBAL:
+                name = constants[arg]
+                if name not in globals:
+                    raise RuntimeError(f"Undefined variable '{name}'.")
+                push(globals[name])
+            elif op == STORE_LOCAL:
+                slots[arg] = stack[-1]
+            elif op == POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = arg
+            elif op == JUMP:
+                ip = arg
+            elif op == POP:
+                pop()
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+                    stack[-1] = left + right
+                elif isinstance(left, str) and isinstance(right, str):
+                    stack[-1] = left + right
+                else:
+                    raise RuntimeError("Operands must be two numbers or two strings.")
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                self.check_number_operands(left, right)
+                stack[-1] = left - right
+            elif op == LESS:
+                right = pop()
+                left = stack[-1]
+                self.check_number_operands(left, right)
+                stack[-1] = left < right
+            elif op == CALL:
+                # The callee and its arguments become the new frame's
+                # leading slots without copying them into a fresh list.
+                frame = stack[-arg - 1:]
+                del stack[-arg - 1:]
+                callee = frame[0]
+                if type(callee) is not Closure:
+                    callee = self.prepare_call(callee, frame)
+                    if callee is None:
+                        push(frame[0])
+                        continue
+                callee_code = callee.code
+                if callee_code.arity != arg:
+                    raise RuntimeError(f"Expected {callee_code.arity} arguments but got {arg}.")
+                frame += callee_code.padding
+                for slot in callee_code.cell_params:
+                    frame[slot] = Cell(frame[slot])
+                if len(frames) >= max_depth:
+                    raise RuntimeError("Stack overflow.")
+                frames.append((instructions, constants, slots, cells, stack, ip))
+                stack = []
+                push = stack.append
+                pop = stack.pop
+                instructions = callee_code.code
+                constants = callee_code.constants
+                slots = frame
+                cells = callee.cells
+                ip = 0
+            elif op == LOAD_METHOD:
+                # Leaves [method, receiver] for CALL_METHOD, or [None, value]
+                # when a field shadows the method.
+                obj = stack[-1]
+                if not isinstance(obj, MinLangInstance):
+                    raise RuntimeError("Only instances have properties.")
+                cache = constants[arg]
+                name = cache.name
+                index = obj.shape.slots.get(name)
+                if index is not None:
+                    stack[-1] = None
+                    push(obj.values[index])
+                else:
+                    table = obj.klass.method_table
+                    if table is not cache.table:
+                        method = table.get(name)
+                        if method is None:
+                            raise RuntimeError(f"Undefined property '{name}'.")
+                        cache.table = table
+                        cache.method = method
+                    stack[-1] = cache.method
+                    push(obj)
+            elif op == CALL_METHOD:
+                method = stack[-arg - 2]
+                frame = stack[-arg - 1:]
+                del stack[-arg - 2:]
+                if method is None:
+                    method = frame[0]
+                    if type(method) is not Closure:
+                        method = self.prepare_call(method, frame)
+                        if method is None:
+                            push(frame[0])
+                            continue
+                method_code = method.code
+                if method_code.arity != arg:
+                    raise RuntimeError(f"Expected {method_code.arity} arguments but got {arg}.")
+                frame += method_code.padding
+                for slot in method_code.cell_params:
+                    frame[slot] = Cell(frame[slot])
+                if len(frames) >= max_depth:
+                    raise RuntimeError("Stack overflow.")
+                frames.append((instructions, constants, slots, cells, stack, ip))
+                stack = []
+                push = stack.append
+                pop = stack.pop
+                instructions = method_code.code
+                constants = method_code.constants
+                slots = frame
+                cells = method.cells
+                ip = 0
+            elif op == RETURN:
+                value = pop()
+                if not frames:
+                    return value
+                instructions, constants, slots, cells, stack, ip = frames.pop()
+                push = stack.append
+                pop = stack.pop
+                push(value)
+            elif op == DEFINE_LOCAL:
+                slots[arg] = pop()
+            elif op == LOAD_CELL:
+                push(slots[arg].value)
+            elif op == STORE_CELL:
+                slots[arg].value = stack[-1]
+            elif op == DEFINE_CELL:
+                slots[arg] = Cell(pop())
+            elif op == NEW_CELL:
+                slots[arg] = Cell()
+            elif op == LOAD_FREE:
+                push(cells[arg].value)
+            elif op == STORE_FREE:
+                cells[arg].value = stack[-1]
+            elif op == STORE_GLOBAL:
+                name = constants[arg]
+                if name not in globals:
+                    raise RuntimeError(f"Undefined variable '{name}'.")
+                globals[name] = stack[-1]
+            elif op == DEFINE_GLOBAL:
+                globals[constants[arg]] = pop()
+            elif op == NIL:
+                push(None)
+            elif op == TRUE:
+                push(True)
+            elif op == FALSE:
+                push(False)
+            elif op == GET_PROPERTY:
+                obj = pop()
+                if not isinstance(obj, MinLangInstance):
+                    raise RuntimeError("Only instances have properties.")
+                cache = constants[arg]
+                shape = obj.shape
+                if shape is cache.shape:
+                    push(obj.values[cache.index])
+                elif cache.name in shape.slots:
+                    cache.shape = shape
+                    cache.index = shape.slots[cache.name]
+                    push(obj.values[cache.index])
+                else:
+                    name = cache.name
+                    table = obj.klass.method_table
+                    if table is not cache.table:
+                        method = table.get(name)
+                        if method is None:
+                            raise RuntimeError(f"Undefined property '{name}'.")
+                        cache.table = table
+                        cache.method = method
+                    push(BoundMethod(obj, cache.method))
+            elif op == SET_PROPERTY:
+                value = pop()
+                obj = pop()
+                if not isinstance(obj, MinLangInstance):
+                    raise RuntimeError("Only instances have fields.")
+                cache = constants[arg]
+                shape = obj.shape
+                if shape is not cache.shape:
+                    index = shape.slots.get(cache.name)
+                    cache.shape = shape
+                    if index is None:
+                        cache.transition = shape.with_field(cache.name)
+                    else:
+                        cache.index = index
+                        cache.transition = None
+                if cache.transition is None:
+                    obj.values[cache.index] = value
+                else:
+                    obj.shape = cache.transition
+                    obj.values.append(value)
+                push(value)
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                self.check_number_operands(left, right)
+                stack[-1] = left * right
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                self.check_number_operands(left, right)
+                stack[-1] = left / right
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = self.is_equal(stack[-1], right)
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = not self.is_equal(stack[-1], right)
+            elif op == GREATER:
+                right = pop()
+                left = stack[-1]
+                self.check_number_operands(left, right)
+                stack[-1] = left > right
+            elif op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                self.check_number_operands(left, right)
+                stack[-1] = left >= right
+            elif op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                self.check_number_operands(left, right)
+                stack[-1] = left <= right
+            elif op == NEGATE:
+                if not isinstance(stack[-1], (int, float)):
+                    raise RuntimeError("Operand must be a number.")
+                stack[-1] = -stack[-1]
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == JUMP_IF_FALSE_OR_POP:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = arg
+                else:
+                    pop()
+            elif op == JUMP_IF_TRUE_OR_POP:
+                value = stack[-1]
+                if value is None or value is False:
+                    pop()
+                else:
+                    ip = arg
+            elif op == PRINT:
+                self.output.write_line(stringify(pop()))
+            elif op == CLOSURE:
+                function = constants[arg]
+                push(Closure(function, [slots[index] if is_local else cells[index]
+                                        for is_local, index in function.free_refs]))
+            elif op == CLASS:
+                push(MinLangClass(constants[arg], None, {}))
+            elif op == SUBCLASS:
+                superclass = pop()
+                if not isinstance(superclass, MinLangClass):
+                    raise RuntimeError("Superclass must be a class.")
+                push(MinLangClass(constants[arg], superclass, {}))
+            elif op == METHOD:
+                method = pop()
+                stack[-1].add_method(constants[arg], method)
+            elif op == GET_SUPER:
+                superclass = pop()
+                receiver = pop()
+                name = constants[arg]
+                method = superclass.find_method(name)
+                if method is None:
+                    raise RuntimeError(f"Undefined property '{name}'.")
+                push(BoundMethod(receiver, method))
+            elif op == TAIL_CALL or op == TAIL_CALL_METHOD:
+                # `return f(...)`: a closure callee takes over the running
+                # frame instead of being pushed on top of it. Any other
+                # callee is called normally and the RETURN after this
+                # instruction hands its result back.
+                if op == TAIL_CALL:
+                    frame = stack[-arg - 1:]
+                    del stack[-arg - 1:]
+                    callee = frame[0]
+                else:
+                    callee = stack[-arg - 2]
+                    frame = stack[-arg - 1:]
+                    del stack[-arg - 2:]
+                    if callee is None:
+                        callee = frame[0]
+                if type(callee) is not Closure:
+                    callee = self.prepare_call(callee, frame)
+                    if callee is None:
+                        push(frame[0])
+                        continue
+                callee_code = callee.code
+                if callee_code.arity != arg:
+                    raise RuntimeError(f"Expected {callee_code.arity} arguments but got {arg}.")
+                frame += callee_code.padding
+                for slot in callee_code.cell_params:
+                    frame[slot] = Cell(frame[slot])
+                instructions = callee_code.code
+                constants = callee_code.constants
+                slots = frame
+                cells = callee.cells
+                ip = 0
+            elif op == NOP:
+                pass
+            else:
+                raise RuntimeError(f"Unknown opcode {op}.")
+
+    def check_number_operands(self, left: Any, right: Any):
+        if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+            return
+        raise RuntimeError("Operands must be numbers.")
+
+    def is_equal(self, a: Any, b: Any) -> bool:
+        if a is None and b is None:
+            return True
+        if a is None:
+            return False
+        return a == b
+
+
@@ -0,0 +1,270 @@
+import minlang
+from minlang import MemoryOutput
+
+# Scripts every engine must run with the same output, and the output they
+# print. Each engine's tests run them with and without the optimizer.
+
+SCRIPTS = {
+    "values": ("""
+print nil or "dflt";
+print 0 or 1;
+print "" and "x";
+print nil == false;
+print 1 == 1.0;
+print 1 + 2.5;
+print 7 / 2;
+print 6 / 3;
+print 0.1 + 0.2;
+print !nil;
+var s = "x";
+var i = 0;
+while (i < 3) { s = s + s; i = i + 1; }
+print s;
+var x = 3;
+var y = x = 4;
+print x + y;
+var z;
+print z;
+""", """dflt
+0
+x
+False
+True
+3.5
+3.5
+2
+0.30000000000000004
+True
+xxxxxxxx
+8
+nil
+"""),
+
+    # Integer literals stay integers, exactly, until they meet a float or
+    # a division.
+    "integers": ("""
+print 7 / 2;
+print 6 / 3;
+print 2 * 3.0;
+print 10000000000 * 10000000000;
+print 3 - 5;
+print 1 + 2 * 3 - 4 / 2;
+print 2.5 + 0.5;
+print 12.0 == 12;
+print 9007199254740993 + 0;
+print 9007199254740993 + 0.0;
+var i = 0;
+var total = 0;
+while (i < 5) { total = total + i; i = i + 1; }
+print total;
+print -7 / 2;
+""", """3.5
+2
+6
+100000000000000000000
+-2
+5
+3
+True
+9007199254740993
+9007199254740992
+10
+-3.5
+"""),
+
+    "recursion": ("""
+def fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+print fib(15);
+def deep(n) { if (n == 0) return 0; return 1 + deep(n - 1); }
+print deep(40);
+""", """610
+40
+"""),
+
+    "classes": ("""
+class A {
+  init(name) { this.name = name; }
+  greet() { return "A " + this.name; }
+  who() { return this.greet(); }
+}
+class B < A {
+  greet() { return "B " + super.greet(); }
+}
+var b = B("x");
+print b.who();
+var m = b.greet;
+print m();
+b.extra = 3;
+print b.extra;
+print B;
+print b;
+class P { init(v) { this.v = v; } get() { def g() { return this.v; } return g; } }
+print P(9).get()();
+class Q < P {
+  init(v) { super.init(v * 2); }
+  get() { def g() { def h() { return super.get()(); } return h(); } return g(); }
+}
+print Q(4).get();
+""", """B A x
+B A x
+3
+B
+B instance
+9
+8
+"""),
+
+    "superclass_in_loop": ("""
+class P { who() { return "P"; } }
+class Q { who() { return "Q"; } }
+var made = nil;
+var i = 0;
+var sup = P;
+while (i < 2) {
+  class C < sup { who() { return "C>" + super.who(); } }
+  if (made == nil) made = C();
+  print C().who();
+  sup = Q;
+  i = i + 1;
+}
+print made.who();
+""", """C>P
+C>Q
+C>P
+"""),
+
+    "counter": ("""
+def counter(start) {
+  var n = start;
+  def inc() { n = n + 1; start = start + 10; return n + start; }
+  return inc;
+}
+var c = counter(5);
+print c();
+print c();
+var d = counter(0);
+print d();
+print c();
+""", """21
+32
+11
+43
+"""),
+
+    # Every iteration of a loop gets a variable of its own, which the
+    # closures created in that iteration keep.
+    "loop_captures": ("""
+var fs = nil;
+def keep(f) { var prev = fs; def node(i) { if (i == 0) return f; return prev(i - 1); } fs = node; }
+var i = 0;
+while (i < 3) {
+  var j = i * 10;
+  def get() { return j; }
+  def bump() { j = j + 1; return j; }
+  keep(get);
+  print bump();
+  i = i + 1;
+}
+print fs(0)();
+print fs(1)();
+print fs(2)();
+def outer() {
+  var list = nil;
+  var k = 0;
+  while (k < 3) {
+    var v = k;
+    def mk() { def inner() { v = v + 100; return v; } return inner; }
+    var p = list;
+    def cons(x) { if (x == 0) return mk(); return p(x - 1); }
+    list = cons;
+    k = k + 1;
+  }
+  print list(0)();
+  print list(1)();
+  print list(2)();
+  print list(0)();
+}
+outer();
+""", """1
+11
+21
+21
+11
+1
+102
+101
+100
+202
+"""),
+
+    # Assignments to variables of enclosing functions, through blocks and
+    # shadowed names.
+    "nonlocal_scopes": ("""
+def outer() {
+  var x = 1;
+  def mid() { def deep() { x = x + 1; return x; } return deep; }
+  var d = mid();
+  d();
+  print d();
+  print x;
+  {
+    var x = "inner";
+    def show() { x = x + "!"; return x; }
+    print show();
+    print x;
+  }
+  print x;
+}
+outer();
+var total = 0;
+def bump() { total = total + 5; }
+bump();
+print total;
+{ var t = "blk"; def bf() { return t; } t = "blk2"; print bf(); }
+def late() { def f() { return y; } var y = 3; return f; }
+var y = "global y";
+print late()();
+var shadow = "g";
+{ var shadow = "l1"; { var shadow = "l2"; print shadow; } print shadow; }
+print shadow;
+""", """3
+3
+inner!
+inner!
+3
+5
+blk2
+global y
+l2
+l1
+g
+"""),
+
+    "runtime_error": ("""
+print "before";
+def f(a) { return a; }
+print f(1, 2);
+print "after";
+""", """before
+Runtime error: Expected 1 arguments but got 2.
+"""),
+
+    "undefined_variable": ("""
+print "before";
+print nope;
+""", """before
+Runtime error: Undefined variable 'nope'.
+"""),
+
+    "operand_types": ("""
+print "before";
+print 1 - "x";
+""", """before
+Runtime error: Operands must be numbers.
+"""),
+}
+
+def run(source: str, engine: str, optimize: bool) -> str:
+    output = MemoryOutput()
+    minlang.compile(source, engine, optimize).run(output=output)
+    return output.getvalue()
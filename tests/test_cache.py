@@ -0,0 +1,83 @@
+import os
+import pytest
+from minlang import CodeCache, Lexer, MemoryOutput, ParseCache, Parser, PythonInterpreter
+from minlang.__main__ import MinLang
+
+# A cache entry is only used for the exact source it was written for, and
+# a missing, stale, truncated or corrupt entry is treated as a miss.
+
+SOURCE = "def add(a, b) { return a + b; }\nprint add(1, 2);\n"
+
+def parse(source: str):
+    return Parser(Lexer(source).scan_tokens()).parse()
+
+def run_file(path, engine: str = "tree") -> MinLang:
+    minlang = MinLang(engine, output=MemoryOutput())
+    minlang.run_file(str(path))
+    return minlang
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "script.gkg"
+    path.write_text(SOURCE)
+    return path
+
+def test_parse_cache_hit(script):
+    cache = ParseCache()
+    assert cache.load(str(script), SOURCE) is None
+    cache.store(str(script), SOURCE, parse(SOURCE))
+    assert os.path.dirname(cache.path_for(str(script))) == str(script.parent / "__gkgcache__")
+    statements = cache.load(str(script), SOURCE)
+    assert [type(statement).__name__ for statement in statements] == ["Function", "Print"]
+
+def test_parse_cache_invalidated_by_edit(script):
+    cache = ParseCache()
+    cache.store(str(script), SOURCE, parse(SOURCE))
+    assert cache.load(str(script), SOURCE + "print 3;\n") is None
+
+@pytest.mark.parametrize("damage", ["truncate", "corrupt", "empty"])
+def test_parse_cache_recovers_from_damaged_entry(script, damage):
+    cache = ParseCache()
+    cache.store(str(script), SOURCE, parse(SOURCE))
+    path = cache.path_for(str(script))
+    with open(path, "rb") as file:
+        data = file.read()
+    key_size = len(cache.key(SOURCE))
+    if damage == "truncate":
+        data = data[:key_size + (len(data) - key_size) // 2]
+    elif damage == "corrupt":
+        data = data[:key_size] + bytes(len(data) - key_size)
+    else:
+        data = b""
+    with open(path, "wb") as file:
+        file.write(data)
+    assert cache.load(str(script), SOURCE) is None
+
+    # A run falls back to parsing and rewrites the entry.
+    assert run_file(script).output.getvalue() == "3\n"
+    assert cache.load(str(script), SOURCE) is not None
+
+def test_cached_run_skips_parsing(script, monkeypatch):
+    assert run_file(script).output.getvalue() == "3\n"
+    monkeypatch.setattr(MinLang, "parse", lambda self, source: pytest.fail("parsed again"))
+    assert run_file(script).output.getvalue() == "3\n"
+
+def test_code_cache_per_optimization_level(script):
+    interpreter = PythonInterpreter(MemoryOutput())
+    code = interpreter.compile(parse(SOURCE))
+    optimized, unoptimized = CodeCache(optimize=True), CodeCache(optimize=False)
+    optimized.store(str(script), SOURCE, code)
+    assert optimized.load(str(script), SOURCE) == code
+    assert unoptimized.load(str(script), SOURCE) is None
+    assert optimized.load(str(script), SOURCE.replace("1, 2", "2, 2")) is None
+
+def test_code_cache_recovers_from_truncated_entry(script):
+    assert run_file(script, "pyc").output.getvalue() == "3\n"
+    path = CodeCache().path_for(str(script))
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data[:-10])
+    assert CodeCache().load(str(script), SOURCE) is None
+    assert run_file(script, "pyc").output.getvalue() == "3\n"
+    assert CodeCache().load(str(script), SOURCE) is not None
@@ -0,0 +1,26 @@
+import pytest
+import minlang
+from minlang import MemoryOutput
+from samples import SCRIPTS, run
+
+@pytest.mark.parametrize("optimize", [True, False], ids=["O1", "O0"])
+@pytest.mark.parametrize("name", sorted(SCRIPTS))
+def test_closure_engine_output(name, optimize):
+    source, expected = SCRIPTS[name]
+    assert run(source, "closure", optimize) == expected
+
+def test_runtime_error_is_reported():
+    source, _ = SCRIPTS["runtime_error"]
+    interpreter = minlang.compile(source, "closure").run(output=MemoryOutput())
+    assert interpreter.had_runtime_error
+
+def test_functions_share_their_compiled_body():
+    interpreter = minlang.compile("""
+def make(n) { def get() { return n; } return get; }
+var a = make(1);
+var b = make(2);
+""", "closure").run(output=MemoryOutput())
+    a = interpreter.globals.values["a"]
+    b = interpreter.globals.values["b"]
+    assert a is not b
+    assert a.body is b.body
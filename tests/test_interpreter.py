@@ -0,0 +1,52 @@
+import pickle
+import minlang
+from minlang import MemoryOutput
+from minlang.interpreter import GENERIC, QUICKENED_BINARY
+from minlang.lexer import TokenType
+from minlang.parser import Binary
+
+# Quickening: the tree walker specializes each Binary node on the operand
+# types it first sees, falls back to the generic path for good when they
+# change, and keeps all of that out of the shared syntax tree.
+
+def binary_of(program) -> Binary:
+    return program.statements[-1].expression
+
+def test_quickens_on_first_evaluation():
+    program = minlang.compile("var a = 1; var b = 2; print a + b;")
+    interpreter = program.run(output=MemoryOutput())
+    assert interpreter.quickened[binary_of(program)] == (int, QUICKENED_BINARY[TokenType.PLUS, int])
+
+def test_deoptimizes_when_operand_types_change():
+    program = minlang.compile("""
+def add(a, b) { return a + b; }
+print add(1, 2);
+print add(1.5, 2.25);
+print add("a", "b");
+print add(1, 2);
+print add(1, "x");
+""")
+    output = MemoryOutput()
+    interpreter = program.run(output=output)
+    assert output.getvalue() == ("3\n3.75\nab\n3\n"
+                                 "Runtime error: Operands must be two numbers or two strings.\n")
+    function = program.statements[0]
+    assert interpreter.quickened[function.body[0].value] is GENERIC
+
+def test_mixed_operands_stay_generic():
+    program = minlang.compile("var a = 1; var b = 0.5; print a - b;")
+    output = MemoryOutput()
+    interpreter = program.run(output=output)
+    assert output.getvalue() == "0.5\n"
+    assert interpreter.quickened[binary_of(program)] is GENERIC
+
+def test_program_is_not_changed_by_running():
+    program = minlang.compile("print a + b;")
+    before = pickle.dumps(program.statements)
+    output = MemoryOutput()
+    program.run(globals={"a": 1, "b": 2}, output=output)
+    program.run(globals={"a": "x", "b": "y"}, output=output)
+    program.run(globals={"a": 3, "b": 4}, output=output)
+    assert output.getvalue() == "3\nxy\n7\n"
+    assert type(binary_of(program)) is Binary
+    assert pickle.dumps(program.statements) == before
@@ -0,0 +1,84 @@
+import io
+import pickle
+import pytest
+from minlang import Lexer, LexError, Parser
+
+# The character-at-a-time and regex scanners, and the chunked scanner used
+# by --stream, must produce the same tokens and raise the same errors.
+
+SOURCES = [
+    "",
+    "print 1;",
+    "var x = 1.5 + 2 * (3 - 4) / 5;",
+    "a == b != c <= d >= e < f > g = !h;",
+    "class A < B { init() { this.x = super.y; } }",
+    "def f(a, b) { if (a and b or nil) return true; else return false; }",
+    "while (i < 10) { i = i + 1; } // trailing comment",
+    "print \"multi\nline\nstring\";\nprint 12.;\nprint .5;",
+    "var café = \"ünîcøde\";",
+    "print 1;\r\n\tprint 2;\n\n\nprint 3;",
+    "x.y.z(1)(2).w;",
+    "123abc",
+    "var a1 = b2;",
+]
+
+ERRORS = [
+    "print \"unterminated;",
+    "var x = 1 # 2;",
+    "print 1;\nprint 2;\n@",
+    "var _a = 1;",
+]
+
+@pytest.mark.parametrize("mode", ["char", "regex"])
+def test_number_literals(mode):
+    tokens = Lexer("12 1.5 12.0 007 12.", mode).scan_tokens()
+    literals = [token.literal for token in tokens[:5]]
+    assert literals == [12, 1.5, 12.0, 7, 12]
+    assert [type(literal) for literal in literals] == [int, float, float, int, int]
+
+def token_tuples(tokens):
+    return [(token.type, token.lexeme, token.literal, token.line) for token in tokens]
+
+def scan(source: str, mode: str):
+    try:
+        return token_tuples(Lexer(source, mode).scan_tokens())
+    except LexError as error:
+        return str(error)
+
+@pytest.mark.parametrize("source", SOURCES + ERRORS)
+def test_char_and_regex_modes_agree(source):
+    assert scan(source, "char") == scan(source, "regex")
+
+@pytest.mark.parametrize("source", ERRORS)
+def test_errors_raise(source):
+    for mode in ("char", "regex"):
+        with pytest.raises(LexError):
+            Lexer(source, mode).scan_tokens()
+
+def test_regex_is_the_default():
+    assert Lexer("print 1;").mode == "regex"
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("source", SOURCES)
+def test_chunked_scanning_agrees(source, chunk_size):
+    tokens = token_tuples(Lexer(io.StringIO(source)).iter_tokens(chunk_size))
+    assert tokens == scan(source, "regex")
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_chunked_scanning_without_newlines(chunk_size):
+    source = "print 1; " * 2000 + "var s = \"" + "x" * 5000 + "\";"
+    tokens = token_tuples(Lexer(io.StringIO(source)).iter_tokens(chunk_size))
+    assert tokens == scan(source, "regex")
+
+@pytest.mark.parametrize("chunk_size", [1, 1 << 16])
+def test_chunked_errors_raise(chunk_size):
+    with pytest.raises(LexError):
+        list(Lexer(io.StringIO("print 1;\nprint \"open;")).iter_tokens(chunk_size))
+
+def test_parser_reads_streamed_tokens():
+    # The parser only looks one token ahead, so it parses a token stream
+    # into the same tree as a token list.
+    source = "class A < B { m(x) { return x.y(1, 2) + -3; } }\nvar a = A();\nprint a.m(a) or nil;"
+    streamed = Parser(Lexer(io.StringIO(source)).iter_tokens(5)).parse()
+    scanned = Parser(Lexer(source).scan_tokens()).parse()
+    assert pickle.dumps(streamed) == pickle.dumps(scanned)
@@ -0,0 +1,41 @@
+import io
+import pytest
+import minlang
+from minlang import StreamOutput
+from minlang.program import ENGINES
+
+def test_buffers_until_full():
+    stream = io.StringIO()
+    output = StreamOutput(stream, buffer_size=8)
+    output.write_line("abc")
+    output.write_line("def")
+    assert stream.getvalue() == ""
+    output.write_line("g")
+    assert stream.getvalue() == "abc\ndef\ng\n"
+
+def test_line_buffered_writes_every_line():
+    stream = io.StringIO()
+    output = StreamOutput(stream, line_buffered=True)
+    output.write_line("one")
+    assert stream.getvalue() == "one\n"
+    output.write_line("two")
+    assert stream.getvalue() == "one\ntwo\n"
+
+def test_writes_to_sys_stdout_when_flushed(capsys):
+    output = StreamOutput()
+    output.write_line("hi")
+    assert capsys.readouterr().out == ""
+    output.flush()
+    assert capsys.readouterr().out == "hi\n"
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_flushes_before_and_after_a_runtime_error(engine):
+    stream = io.StringIO()
+    minlang.compile("print 1; print 2; print nil + 1; print 3;", engine).run(output=StreamOutput(stream))
+    assert stream.getvalue() == "1\n2\nRuntime error: Operands must be two numbers or two strings.\n"
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_flushes_when_the_run_ends(engine):
+    stream = io.StringIO()
+    minlang.compile("var i = 0; while (i < 3) { print i; i = i + 1; }", engine).run(output=StreamOutput(stream))
+    assert stream.getvalue() == "0\n1\n2\n"
@@ -0,0 +1,77 @@
+import pytest
+from minlang import Lexer, Parser
+from minlang.parser import (Assign, Binary, Call, Get, Grouping, Literal, Logical, Set, Super, This,
+                            Unary, Variable)
+
+# The Pratt parser's precedence and associativity, shown as fully
+# parenthesized prefix forms.
+
+def show(expr) -> str:
+    if isinstance(expr, (Binary, Logical)):
+        return f"({expr.operator.lexeme} {show(expr.left)} {show(expr.right)})"
+    if isinstance(expr, Unary):
+        return f"({expr.operator.lexeme} {show(expr.right)})"
+    if isinstance(expr, Grouping):
+        return f"(group {show(expr.expression)})"
+    if isinstance(expr, Literal):
+        return "nil" if expr.value is None else repr(expr.value)
+    if isinstance(expr, Variable):
+        return expr.name.lexeme
+    if isinstance(expr, Assign):
+        return f"(= {expr.name.lexeme} {show(expr.value)})"
+    if isinstance(expr, Call):
+        return f"(call {' '.join(show(part) for part in [expr.callee] + expr.arguments)})"
+    if isinstance(expr, Get):
+        return f"(. {show(expr.obj)} {expr.name.lexeme})"
+    if isinstance(expr, Set):
+        return f"(.= {show(expr.obj)} {expr.name.lexeme} {show(expr.value)})"
+    if isinstance(expr, This):
+        return "this"
+    if isinstance(expr, Super):
+        return f"(super {expr.method.lexeme})"
+    raise TypeError(type(expr).__name__)
+
+def parse(source: str):
+    return Parser(Lexer(source).scan_tokens()).parse()
+
+def parse_expr(source: str) -> str:
+    return show(parse(source + ";")[0].expression)
+
+@pytest.mark.parametrize("source, expected", [
+    ("1 + 2 * 3", "(+ 1 (* 2 3))"),
+    ("1 * 2 + 3", "(+ (* 1 2) 3)"),
+    ("1 - 2 - 3", "(- (- 1 2) 3)"),
+    ("8 / 4 / 2", "(/ (/ 8 4) 2)"),
+    ("(1 + 2) * 3", "(* (group (+ 1 2)) 3)"),
+    ("-1 - -2", "(- (- 1) (- 2))"),
+    ("!a == b", "(== (! a) b)"),
+    ("!!a", "(! (! a))"),
+    ("1 < 2 == 3 >= 4", "(== (< 1 2) (>= 3 4))"),
+    ("a or b and c", "(or a (and b c))"),
+    ("a and b or c", "(or (and a b) c)"),
+    ("a == b and c != d", "(and (== a b) (!= c d))"),
+    ("a = b = 1 + 2", "(= a (= b (+ 1 2)))"),
+    ("a = b or c", "(= a (or b c))"),
+    ("a.b.c = d", "(.= (. a b) c d)"),
+    ("f(1)(2, x + 3)", "(call (call f 1) 2 (+ x 3))"),
+    ("-a.b(c)", "(- (call (. a b) c))"),
+    ("a.b(c).d", "(. (call (. a b) c) d)"),
+    ("nil or true", "(or nil True)"),
+])
+def test_precedence(source, expected):
+    assert parse_expr(source) == expected
+
+def test_this_and_super():
+    method = parse("class A < B { m() { return this.x + super.m(); } }")[0].methods[0]
+    assert show(method.body[0].value) == "(+ (. this x) (call (super m)))"
+
+@pytest.mark.parametrize("source", [
+    "1 + ;",
+    "print (1;",
+    "f(1,;",
+    "a.;",
+])
+def test_bad_statements_are_skipped(source):
+    statements = parse(source + "\nprint 1;")
+    assert show(statements[-1].expression) == "1"
+    assert statements[:-1] == [None]
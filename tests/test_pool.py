@@ -0,0 +1,56 @@
+import pytest
+import minlang
+from minlang import ScriptPool
+from minlang.pool import COMPILE_ERROR, OK, RUNTIME_ERROR, TIMEOUT
+
+@pytest.fixture(scope="module")
+def pool():
+    with ScriptPool(jobs=2, timeout=1) as pool:
+        yield pool
+
+@pytest.mark.parametrize("batch_size", [None, 1, 3, 100])
+def test_map_returns_results_in_order(pool, batch_size):
+    scripts = [f"print {n} * {n};" for n in range(10)]
+    results = pool.map(scripts, batch_size=batch_size)
+    assert [result.output for result in results] == [f"{n * n}\n" for n in range(10)]
+    assert [result.name for result in results] == [f"<script {n}>" for n in range(10)]
+    assert all(result.ok for result in results)
+
+def test_map_names_results(pool):
+    results = pool.map(["print 1;", "print 2;"], names=["a.gkg", "b.gkg"])
+    assert [(result.name, result.output) for result in results] == [("a.gkg", "1\n"), ("b.gkg", "2\n")]
+
+def test_jobs_see_only_their_own_globals(pool):
+    first, second = pool.map(["var shared = 1; print shared;", "print shared;"], batch_size=2)
+    assert first.output == "1\n"
+    assert second.status == RUNTIME_ERROR
+    assert second.error == "Runtime error: Undefined variable 'shared'."
+
+def test_errors_are_reported_in_results(pool):
+    compile_error, runtime_error = pool.map(["{ var a = a; }", "print 1; print nil + 1; print 2;"])
+    assert compile_error.status == COMPILE_ERROR
+    assert "Can't read local variable in its own initializer." in compile_error.error
+    assert compile_error.output == compile_error.error + "\n"
+    assert runtime_error.status == RUNTIME_ERROR
+    assert runtime_error.output == "1\nRuntime error: Operands must be two numbers or two strings.\n"
+
+def test_submit_defines_globals(pool):
+    result = pool.submit("print greeting + \" \" + name;", "greet",
+                         globals={"greeting": "hi", "name": "Ada"}).result()
+    assert (result.name, result.status, result.output) == ("greet", OK, "hi Ada\n")
+
+@pytest.mark.parametrize("engine", ["tree", "vm"])
+def test_program_runs_on_its_own_engine(pool, engine):
+    result = pool.submit(minlang.compile("print 7 / 2;", engine)).result()
+    assert result.output == "3.5\n"
+
+def test_infinite_loop_times_out(pool):
+    looping, after = pool.map(["print 1; while (true) {}", "print 2;"], batch_size=2)
+    assert looping.status == TIMEOUT
+    assert looping.output == "1\n"
+    assert looping.error == "timed out after 1 s"
+    assert after.output == "2\n"
+    result = pool.submit("while (true) {}", timeout=0.2).result()
+    assert result.status == TIMEOUT
+    assert result.error == "timed out after 0.2 s"
+    assert 0.2 <= result.elapsed < 5
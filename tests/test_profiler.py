@@ -0,0 +1,54 @@
+import io
+import itertools
+import minlang
+from minlang import MemoryOutput
+from minlang.profiler import Profiler, ProfilingInterpreter
+
+# A clock that advances one millisecond per reading, so each call's self
+# time is one millisecond plus one for every call it makes.
+
+SOURCE = """def fib(n) {
+  if (n < 2) return n;
+  return fib(n - 1) + fib(n - 2);
+}
+class Counter {
+  init() { this.count = 0; }
+  add(n) { this.count = this.count + n; }
+}
+var counter = Counter();
+counter.add(fib(3));
+print counter.count;
+"""
+
+def profile(source: str) -> Profiler:
+    ticks = itertools.count()
+    profiler = Profiler(clock=lambda: next(ticks) * 1e-3)
+    output = MemoryOutput()
+    profiler.start()
+    minlang.compile(source).run(interpreter=ProfilingInterpreter(profiler, output))
+    profiler.stop()
+    assert output.getvalue() == "2\n"
+    return profiler
+
+def test_counts_calls_per_function():
+    profiler = profile(SOURCE)
+    calls = {profiler.label(function): stats.calls for function, stats in profiler.functions.items()}
+    assert calls == {"fib:1": 5, "Counter.init:6": 1, "Counter.add:7": 1}
+
+def test_counts_statements_per_line():
+    profiler = profile(SOURCE)
+    # fib(3) makes five calls; the three that reach n < 2 also return on line 2.
+    assert profiler.lines[2] == 8
+    assert profiler.lines[3] == 2
+
+def test_writes_collapsed_stacks():
+    out = io.StringIO()
+    profile(SOURCE).write_collapsed(out)
+    assert sorted(out.getvalue().splitlines()) == [
+        "<script> 4000",
+        "<script>;Counter.add:7 1000",
+        "<script>;Counter.init:6 1000",
+        "<script>;fib:1 3000",
+        "<script>;fib:1;fib:1 4000",
+        "<script>;fib:1;fib:1;fib:1 2000",
+    ]
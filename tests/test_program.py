@@ -0,0 +1,68 @@
+import pickle
+import pytest
+import minlang
+from minlang import LexError, MemoryOutput, ProgramCache
+from minlang.program import ENGINES
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_program_runs_on_existing_interpreter(engine):
+    prelude = minlang.compile("var greeting = \"hi\"; def greet(name) { return greeting + \" \" + name; }", engine)
+    main = minlang.compile("print greet(name);", engine)
+    output = MemoryOutput()
+    interpreter = prelude.run(output=output)
+    main.run(globals={"name": "Ada"}, interpreter=interpreter)
+    main.run(globals={"name": "Alan"}, interpreter=interpreter)
+    assert output.getvalue() == "hi Ada\nhi Alan\n"
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_program_runs_again_on_fresh_interpreters(engine):
+    program = minlang.compile("def twice(x) { return x * 2; } print twice(n);", engine)
+    outputs = []
+    for n in (1, 2.5):
+        output = MemoryOutput()
+        program.run(globals={"n": n}, output=output)
+        outputs.append(output.getvalue())
+    assert outputs == ["2\n", "5\n"]
+
+def test_program_is_immutable():
+    program = minlang.compile("print 1;")
+    with pytest.raises(AttributeError):
+        program.statements = ()
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_program_pickles_by_recompiling(engine):
+    program = pickle.loads(pickle.dumps(minlang.compile("print 1 + 2;", engine, optimize=False)))
+    assert (program.engine, program.optimize) == (engine, False)
+    output = MemoryOutput()
+    program.run(output=output)
+    assert output.getvalue() == "3\n"
+
+def test_compile_errors_raise():
+    with pytest.raises(ValueError):
+        minlang.compile("print 1;", "jit")
+    with pytest.raises(LexError):
+        minlang.compile("print \"open;")
+    with pytest.raises(RuntimeError, match="Can't read local variable in its own initializer."):
+        minlang.compile("{ var a = a; }")
+
+def test_cache_counts_hits_and_misses():
+    cache = ProgramCache()
+    first = cache.compile("print 1;")
+    assert cache.compile("print 1;") is first
+    assert cache.compile("print 1;", "vm") is not first
+    assert cache.compile("print 1;", optimize=False) is not first
+    assert (cache.hits, cache.misses, len(cache)) == (1, 3, 3)
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+def test_cache_evicts_least_recently_used():
+    cache = ProgramCache(maxsize=2)
+    a = cache.compile("print 1;")
+    cache.compile("print 2;")
+    assert cache.compile("print 1;") is a
+    cache.compile("print 3;")
+    assert len(cache) == 2
+    assert cache.compile("print 1;") is a
+    misses = cache.misses
+    cache.compile("print 2;")
+    assert cache.misses == misses + 1
@@ -0,0 +1,70 @@
+import pytest
+import minlang
+from minlang import Interpreter, Lexer, MemoryOutput, Parser, Resolver
+from samples import SCRIPTS, run
+
+# The resolver records, for every local variable reference, how many scopes
+# out its declaration is; the tree walker's scoping depends on nothing else.
+
+def resolve(source: str):
+    statements = Parser(Lexer(source).scan_tokens()).parse()
+    interpreter = Interpreter(MemoryOutput())
+    Resolver(interpreter).resolve(statements)
+    return statements, interpreter
+
+def test_distances():
+    statements, interpreter = resolve("""
+{ var a = 1; { var b = 2; print a; print b; a = b; } }
+""")
+    inner = statements[0].statements[1].statements
+    assert interpreter.locals[inner[1].expression] == 1
+    assert interpreter.locals[inner[2].expression] == 0
+    assign = inner[3].expression
+    assert interpreter.locals[assign] == 1
+    assert interpreter.locals[assign.value] == 0
+
+def test_globals_stay_unresolved():
+    statements, interpreter = resolve("var g = 1; def f(x) { return g + x; } print g;")
+    body = statements[1].body[0].value
+    assert body.left not in interpreter.locals
+    assert interpreter.locals[body.right] == 0
+    assert statements[2].expression not in interpreter.locals
+
+def test_function_parameters_and_closures():
+    # Parameters share the scope of the function body.
+    statements, interpreter = resolve("""
+def outer(a) { var b = a; def inner(c) { { return a + b + c; } } return inner; }
+""")
+    inner = statements[0].body[1]
+    value = inner.body[0].statements[0].value
+    assert interpreter.locals[value.left.left] == 2
+    assert interpreter.locals[value.left.right] == 2
+    assert interpreter.locals[value.right] == 1
+
+@pytest.mark.parametrize("source, message", [
+    ("return 1;", "Can't return from top-level code."),
+    ("class A { init() { return 1; } }", "Can't return a value from an initializer."),
+    ("class A < A {}", "A class can't inherit from itself."),
+    ("{ var a = a; }", "Can't read local variable in its own initializer."),
+    ("print this;", "Can't use 'this' outside of a class."),
+    ("print super.x;", "Can't use 'super' outside of a class."),
+    ("class A { m() { return super.m(); } }", "Can't use 'super' in a class with no superclass."),
+    ("{ var a = 1; var a = 2; }", "Already a variable with this name in this scope."),
+])
+def test_errors(source, message):
+    with pytest.raises(RuntimeError, match=message.replace(".", r"\.")):
+        resolve(source)
+
+def test_global_redeclaration_is_allowed():
+    assert run("var a = 1; var a = a + 1; print a;", "tree", True) == "2\n"
+
+@pytest.mark.parametrize("optimize", [True, False], ids=["O1", "O0"])
+@pytest.mark.parametrize("name", sorted(SCRIPTS))
+def test_tree_output(name, optimize):
+    source, expected = SCRIPTS[name]
+    assert run(source, "tree", optimize) == expected
+
+def test_runtime_error_is_reported():
+    source, _ = SCRIPTS["runtime_error"]
+    interpreter = minlang.compile(source, "tree").run(output=MemoryOutput())
+    assert interpreter.had_runtime_error
@@ -0,0 +1,57 @@
+import pytest
+import minlang
+from minlang import MemoryOutput, load_snapshot, save_snapshot
+
+PRELUDE = """
+class Shape { init(name) { this.name = name; } describe() { return "a " + this.name; } }
+class Square < Shape { init() { super.init("square"); } describe() { return super.describe() + "!"; } }
+def counter() { var n = 0; def inc() { n = n + 1; return n; } return inc; }
+var next = counter();
+next();
+var unit = Square();
+"""
+
+MAIN = """
+print unit.describe();
+print next();
+print Square().describe();
+"""
+
+def save_prelude(path):
+    interpreter = minlang.compile(PRELUDE).run(output=MemoryOutput())
+    save_snapshot(interpreter, str(path))
+
+def test_snapshot_restores_globals(tmp_path):
+    path = tmp_path / "prelude.snap"
+    save_prelude(path)
+    output = MemoryOutput()
+    interpreter = load_snapshot(str(path), output=output)
+    minlang.compile(MAIN).run(interpreter=interpreter)
+    assert output.getvalue() == "a square!\n2\na square!\n"
+
+def test_truncated_snapshot_is_rejected(tmp_path):
+    path = tmp_path / "prelude.snap"
+    save_prelude(path)
+    data = path.read_bytes()
+    for size in (len(data) // 4, len(data) // 2, len(data) - 1):
+        path.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            load_snapshot(str(path))
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "script.gkg"
+    path.write_text("print 1;")
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
+
+def test_snapshot_leaves_out_finished_statements(tmp_path):
+    path = tmp_path / "prelude.snap"
+    source = PRELUDE + "{ var i = 0; while (i < 3) { var k = i; i = i + k + 1; } }\n" * 50
+    interpreter = minlang.compile(source).run(output=MemoryOutput())
+    save_snapshot(interpreter, str(path))
+    output = MemoryOutput()
+    restored = load_snapshot(str(path), output=output)
+    assert 0 < len(restored.locals) < 20 < len(interpreter.locals)
+    assert len(restored.layouts) == len(interpreter.layouts)
+    minlang.compile(MAIN).run(interpreter=restored)
+    assert output.getvalue() == "a square!\n2\na square!\n"
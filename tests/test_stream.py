@@ -0,0 +1,73 @@
+import io
+import pytest
+from minlang import MemoryOutput
+from minlang.__main__ import MinLang
+from minlang.program import ENGINES
+from samples import SCRIPTS
+
+# --stream runs one top-level declaration at a time and must print what a
+# whole-script run prints, stopping at the first error just the same.
+
+def run_stream(source: str, engine: str, optimize: bool = True) -> MinLang:
+    minlang = MinLang(engine, stream=True, use_cache=False, optimize=optimize, output=MemoryOutput())
+    minlang.run_stream(io.StringIO(source))
+    return minlang
+
+@pytest.mark.parametrize("optimize", [True, False], ids=["O1", "O0"])
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", sorted(SCRIPTS))
+def test_stream_output(name, engine, optimize):
+    source, expected = SCRIPTS[name]
+    assert run_stream(source, engine, optimize).output.getvalue() == expected
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_stream_stops_at_resolver_error(engine, capsys):
+    minlang = run_stream("print 1;\n{ var a = a; }\nprint 2;", engine)
+    assert minlang.output.getvalue() == "1\n"
+    assert minlang.had_error
+    assert "Can't read local variable in its own initializer." in capsys.readouterr().out
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_stream_stops_at_lex_error(engine, capsys):
+    minlang = run_stream("print 1;\nprint 2;\nprint \"open;\nprint 3;", engine)
+    assert minlang.output.getvalue() == "1\n2\n"
+    assert minlang.had_error
+    assert "Unterminated string" in capsys.readouterr().out
+
+def table_sizes(interpreter) -> tuple:
+    return (len(interpreter.locals), len(interpreter.cells), len(interpreter.receivers),
+            len(interpreter.layouts), len(interpreter.captured), len(interpreter.quickened))
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_stream_keeps_side_tables_bounded(engine):
+    source = "var i = 0;\n" + "{ var a = i; def f() { return a + 1; } i = f(); }\n" * 2000 + "print i;"
+    minlang = run_stream(source, engine)
+    assert minlang.output.getvalue() == "2000\n"
+    assert sum(table_sizes(minlang.interpreter)) < 10
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_stream_keeps_entries_of_functions_still_reachable(engine):
+    source = """
+def make(n) { var total = n; def add(k) { total = total + k; return total; } return add; }
+var add = make(10);
+{ var base = 100; var inner = add; def over() { return base + inner(1); } add = over; }
+class Shape { init(side) { this.side = side; } area() { return this.side * this.side; } }
+class Square < Shape { area() { return super.area() + 0; } }
+var square = Square(3);
+print add();
+print make(1)(2);
+print square.area();
+"""
+    minlang = run_stream(source, engine)
+    assert minlang.output.getvalue() == "111\n3\n9\n"
+    tables = table_sizes(minlang.interpreter)
+    if engine == "tree":
+        assert sum(tables) > 0
+    else:
+        assert sum(tables) == 0
+
+def test_profiled_stream_keeps_statement_lines_bounded():
+    minlang = MinLang(stream=True, use_cache=False, profile=True, output=MemoryOutput())
+    minlang.run_stream(io.StringIO("var i = 0;\n" + "{ i = i + 1; }\n" * 500 + "print i;"))
+    assert minlang.output.getvalue() == "500\n"
+    assert len(minlang.interpreter.statement_lines) < 5
@@ -0,0 +1,27 @@
+import pytest
+import minlang
+from minlang import Lexer, MemoryOutput, Parser, PythonInterpreter, Resolver, Transpiler
+from samples import SCRIPTS, run
+
+# The transpiled Python must print exactly what the tree-walking interpreter
+# prints, with and without the optimizer.
+
+@pytest.mark.parametrize("optimize", [True, False], ids=["O1", "O0"])
+@pytest.mark.parametrize("name", sorted(SCRIPTS))
+def test_pyc_output(name, optimize):
+    source, expected = SCRIPTS[name]
+    assert run(source, "pyc", optimize) == expected
+
+def test_runtime_error_is_reported():
+    source, _ = SCRIPTS["runtime_error"]
+    interpreter = minlang.compile(source, "pyc").run(output=MemoryOutput())
+    assert interpreter.had_runtime_error
+
+def test_assigned_captures_become_nonlocal():
+    statements = Parser(Lexer("""
+def outer() { var x = 1; def bump() { x = x + 1; return x; } return bump; }
+""").scan_tokens()).parse()
+    interpreter = PythonInterpreter()
+    Resolver(interpreter).resolve(statements)
+    source, _ = Transpiler(interpreter.locals).transpile(statements)
+    assert "nonlocal x_1" in source
@@ -0,0 +1,43 @@
+import pytest
+from minlang import Compiler, Lexer, MemoryOutput, Parser, VM
+from samples import SCRIPTS, run
+
+def compile_code(source: str):
+    return Compiler().compile(Parser(Lexer(source).scan_tokens()).parse())
+
+@pytest.mark.parametrize("optimize", [True, False], ids=["O1", "O0"])
+@pytest.mark.parametrize("name", sorted(SCRIPTS))
+def test_vm_output(name, optimize):
+    source, expected = SCRIPTS[name]
+    assert run(source, "vm", optimize) == expected
+
+def test_disassemble():
+    listing = compile_code("var a = 1; print a + 2;").disassemble().splitlines()
+    assert listing[0] == "== <script> =="
+    assert [line.split()[1] for line in listing[1:]] == [
+        "CONSTANT", "DEFINE_GLOBAL", "LOAD_GLOBAL", "CONSTANT", "ADD", "PRINT", "NIL", "RETURN"]
+
+def test_globals_survive_a_runtime_error():
+    output = MemoryOutput()
+    vm = VM(output=output)
+    vm.interpret(compile_code("var total = 1; print total + nil;"))
+    assert vm.had_runtime_error
+    vm.interpret(compile_code("print total;"))
+    assert output.getvalue() == "Runtime error: Operands must be two numbers or two strings.\n1\n"
+
+def run_vm(source: str, max_depth: int) -> str:
+    output = MemoryOutput()
+    VM(max_depth=max_depth, output=output).interpret(compile_code(source))
+    return output.getvalue()
+
+def test_deep_recursion_overflows():
+    source = "def depth(n) { if (n == 0) return 0; return 1 + depth(n - 1); } print depth(50);"
+    assert run_vm(source, 100) == "50\n"
+    assert run_vm(source, 40) == "Runtime error: Stack overflow.\n"
+
+def test_tail_calls_do_not_count_against_max_depth():
+    source = """
+def count(n, total) { if (n == 0) return total; return count(n - 1, total + 1); }
+print count(100000, 0);
+"""
+    assert run_vm(source, 10) == "100000\n"